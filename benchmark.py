@@ -0,0 +1,120 @@
+# Logging
+import os
+import wandb
+from tensorboardX import SummaryWriter
+
+# Config system
+import hydra
+from omegaconf import OmegaConf, DictConfig
+
+# Utils
+from tqdm import tqdm
+import datetime
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# ML libraries
+import random
+import numpy as np
+
+# Project imports
+from boardgames.utils import try_get_seed
+from boardgames.hydra_utils import register_resolvers
+from boardgames.tournament import (
+    get_chunk_seeds,
+    get_empty_results,
+    get_results_metrics,
+    merge_results,
+    play_games_chunk,
+)
+
+# Register the resolvers
+register_resolvers()
+
+
+@hydra.main(config_path="configs", config_name="config_benchmark.yaml")
+def main(config: DictConfig):
+    print("Configuration used :")
+    print(OmegaConf.to_yaml(config))
+    config = OmegaConf.to_container(config, resolve=True)
+
+    # Get the config values from the config object.
+    agents_name: str = config["agents"]["name"]
+    game_name: str = config["game"]["name"]
+    n_games: int = config["n_games"]
+    n_games_per_chunk: int = config["n_games_per_chunk"]
+    n_workers: int = config["n_workers"] or os.cpu_count()
+    do_wandb: bool = config["do_wandb"]
+    do_tb: bool = config["do_tb"]
+    do_tqdm: bool = config["do_tqdm"]
+
+    # Set the seeds
+    seed = try_get_seed(config)
+    random.seed(seed)
+    np.random.seed(seed)
+    print(f"Using seed: {seed}")
+
+    # Initialize loggers
+    run_name = f"[benchmark]_[{agents_name}]_[{game_name}]_{datetime.datetime.now().strftime('%dth%mmo_%Hh%Mmin%Ss')}_seed{seed}"
+    config["run_name"] = run_name
+    os.makedirs("logs", exist_ok=True)
+    print(f"\nStarting run {run_name}")
+    if do_wandb:
+        run = wandb.init(
+            name=run_name,
+            config=config,
+            **config["wandb_config"],
+        )
+    if do_tb:
+        tb_writer = SummaryWriter(log_dir=f"tensorboard/{run_name}")
+
+    # Shard the games in chunks, each chunk having its own deterministic seed
+    n_chunks = (n_games + n_games_per_chunk - 1) // n_games_per_chunk
+    list_n_games_chunks = [n_games_per_chunk] * (n_chunks - 1) + [
+        n_games - n_games_per_chunk * (n_chunks - 1)
+    ]
+    chunk_seeds = get_chunk_seeds(seed, n_chunks)
+
+    # Play the chunks in a pool of processes and merge the results in this process
+    print(
+        f"\nPlaying {n_games} games in {n_chunks} chunks over {n_workers} worker processes..."
+    )
+    results = get_empty_results()
+    time_start = perf_counter()
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(
+                play_games_chunk,
+                config,
+                idx_chunk,
+                chunk_seeds[idx_chunk],
+                list_n_games_chunks[idx_chunk],
+            )
+            for idx_chunk in range(n_chunks)
+        ]
+        for future in tqdm(
+            as_completed(futures), total=n_chunks, disable=not do_tqdm
+        ):
+            merge_results(results, future.result())
+    runtime_wall = perf_counter() - time_start
+
+    # Log the results
+    metrics = get_results_metrics(results)
+    metrics["tournament/runtime_wall"] = runtime_wall
+    metrics["tournament/games_per_second"] = results["n_games"] / runtime_wall
+    metrics["tournament/parallel_speedup"] = results["runtime_games"] / runtime_wall
+    print("\nResults :")
+    for metric_name, value in metrics.items():
+        print(f"{metric_name}: {value}")
+    print(f"Results by game outcome : {dict(results['result_to_n_games'])}")
+    if do_tb:
+        for metric_name, value in metrics.items():
+            tb_writer.add_scalar(metric_name, value, global_step=results["n_games"])
+        tb_writer.close()
+    if do_wandb:
+        wandb.log(metrics)
+        run.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,102 @@
 from abc import ABC, abstractmethod
+import ast
+import difflib
 from enum import Enum
+from functools import lru_cache
+from math import comb
 import random
-from typing import Dict, Iterable, List, Optional, Tuple, Union
+import re
+import string
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
 from boardgames.types import Observation, Action, State, AgentID
+from boardgames.utils import str_to_literal
+
+
+def normalize_action_text(text: str) -> str:
+    """Return a canonical text of an action, so that different writings of the same action are equal :
+    surrounding spaces, quotes and punctuation are removed, case is ignored and literals are normalized as by str_to_literal (e.g. "(1,2)" and "( 1, 2 )").
+    """
+    text = str(text).strip().strip("'\"`*.,;:!? ").strip()
+    literal = str_to_literal(text)
+    if isinstance(literal, (int, tuple)):
+        return str(literal)
+    return text.lower()
+
+
+def get_action_matching_text(text: str, actions: List[Action], cutoff: float = 0.8) -> Optional[Action]:
+    """Return the action among actions that the text designates, or None if there is none or it is ambiguous.
+    In order : exact match, match of the normalized texts, unique action appearing as a whole word in the text (e.g. "I vote for player 3"),
+    and closest action by similarity of the texts if it is above cutoff and has the same numbers as the text.
+
+    Args:
+        text (str): the text, e.g. extracted from the answer of an LLM
+        actions (List[Action]): the actions
+        cutoff (float, optional): the minimum similarity (between 0 and 1) of the closest action. Defaults to 0.8.
+
+    Returns:
+        Optional[Action]: the action, as it is in actions
+    """
+    if text in actions:
+        return text
+    text_normalized = normalize_action_text(text)
+    normalized_to_actions: Dict[str, List[Action]] = {}
+    for action in actions:
+        normalized_to_actions.setdefault(normalize_action_text(action), []).append(action)
+    if text_normalized in normalized_to_actions:
+        return normalized_to_actions[text_normalized][0]
+    # Actions mentioned in the text as whole words
+    actions_mentioned = [
+        action
+        for action_normalized, actions_normalized in normalized_to_actions.items()
+        if action_normalized != ""
+        and re.search(rf"(?<!\w){re.escape(action_normalized)}(?!\w)", text_normalized)
+        for action in actions_normalized[:1]
+    ]
+    if len(actions_mentioned) == 1:
+        return actions_mentioned[0]
+    # Closest action, among the actions with the same numbers (e.g. player ids) as the text, so that a typo never changes the target
+    numbers_text = re.findall(r"\d+", text_normalized)
+    candidates = [
+        action_normalized
+        for action_normalized in normalized_to_actions
+        if re.findall(r"\d+", action_normalized) == numbers_text
+    ]
+    closest = difflib.get_close_matches(text_normalized, candidates, n=1, cutoff=cutoff)
+    if len(closest) == 1:
+        return normalized_to_actions[closest[0]][0]
+    return None
+
+
+@lru_cache(maxsize=None)
+def get_actions_player_ids(n_players: int, as_str: bool = True) -> Tuple[Action, ...]:
+    """Return the ids of the players of a game, as actions (e.g. ("0", "1", ...)).
+    The tuple is cached, so it can be used as the stable index space (all_actions) of the action spaces targeting players,
+    and indexing it avoids converting ids to strings at each step.
+
+    Args:
+        n_players (int): the number of players
+        as_str (bool, optional): whether the ids are strings rather than ints. Defaults to True.
+
+    Returns:
+        Tuple[Action, ...]: the id of each player
+    """
+    return tuple(str(i) if as_str else i for i in range(n_players))
+
+
+@lru_cache(maxsize=256)
+def get_action_to_index(all_actions: Tuple[Action, ...]) -> Dict[Action, int]:
+    """Return the mapping of each action of an index space to its index, cached for the index spaces shared between steps.
+
+    Args:
+        all_actions (Tuple[Action, ...]): the actions of the index space
+
+    Returns:
+        Dict[Action, int]: the index of each action
+    """
+    return {action: idx for idx, action in enumerate(all_actions)}
 
 
 class ActionsSpace:
@@ -20,6 +114,41 @@ class ActionsSpace:
         """Check if an action is in the action space."""
         return True
 
+    def get_n_actions(self) -> int:
+        """Return the size of the index space of the action space, i.e. of the legal masks."""
+        raise NotImplementedError(f"{type(self).__name__} has no finite index space.")
+
+    def get_action_index(self, action: Action) -> int:
+        """Return the index of an action in the index space."""
+        raise NotImplementedError(f"{type(self).__name__} has no finite index space.")
+
+    def get_action_from_index(self, index: int) -> Action:
+        """Return the action of an index of the index space."""
+        raise NotImplementedError(f"{type(self).__name__} has no finite index space.")
+
+    def get_legal_mask(self) -> np.ndarray:
+        """Return the boolean mask of the legal actions over the index space, of shape (get_n_actions(),)."""
+        raise NotImplementedError(f"{type(self).__name__} has no finite index space.")
+
+    @abstractmethod
+    def sample(self, rng: Optional[random.Random] = None) -> Action:
+        """Return a random action of the action space, drawn with rng or with the global random module if None."""
+        raise NotImplementedError(f"Sampling is not supported by {type(self).__name__}.")
+
+    def parse_text(self, text: str) -> Optional[Action]:
+        """Return the action of the action space that a text (e.g. from an LLM) designates, or None if it designates none."""
+        return text if text in self else None
+
+    def get_json_schema(self) -> Dict[str, Any]:
+        """Return the JSON schema of the actions of the action space, for models with structured outputs."""
+        return {"type": "string"}
+
+    def parse_json(self, value: Any) -> Optional[Action]:
+        """Return the action of the action space that a value decoded from a JSON answer designates, or None if it designates none."""
+        if value in self:
+            return value
+        return self.parse_text(str(value))
+
 
 class JointActionSpace(List[ActionsSpace]):
     def __contains__(self, joint_action: List[Action]) -> bool:
@@ -27,37 +156,194 @@ class JointActionSpace(List[ActionsSpace]):
 
 
 class FiniteActionSpace(ActionsSpace):
+    """A finite list of legal actions.
 
-    def __init__(self, actions: Iterable[Action]):
+    The index space is all_actions if it is given, else the legal actions themselves.
+    Giving all_actions (e.g. get_actions_player_ids(n_players) for actions targeting players) makes the indexes stable between steps,
+    whatever the legal actions are, so that learned agents get fixed-size masks.
+    """
+
+    def __init__(self, actions: Iterable[Action], all_actions: Optional[Sequence[Action]] = None):
         assert len(actions) > 0, "The list of actions must not be empty."
         self.actions = actions
+        self.set_actions = frozenset(actions)
+        self.all_actions = all_actions if all_actions is not None else actions
+        self.action_to_index: Optional[Dict[Action, int]] = None  # built at the first use
+        self.legal_mask: Optional[np.ndarray] = None  # built at the first use
 
     def get_textual_restrictions(self):
         return "Only the following actions are allowed: " + str(self.actions)
 
     def __contains__(self, action: Action):
-        return action in self.actions
+        try:
+            return action in self.set_actions
+        except TypeError:  # unhashable, e.g. a list
+            return False
+
+    def get_n_actions(self) -> int:
+        return len(self.all_actions)
+
+    def get_action_to_index(self) -> Dict[Action, int]:
+        if self.action_to_index is None:
+            self.action_to_index = (
+                get_action_to_index(self.all_actions)
+                if isinstance(self.all_actions, tuple)
+                else {action: idx for idx, action in enumerate(self.all_actions)}
+            )
+        return self.action_to_index
+
+    def get_action_index(self, action: Action) -> int:
+        return self.get_action_to_index()[action]
+
+    def get_action_from_index(self, index: int) -> Action:
+        return self.all_actions[index]
+
+    def get_legal_mask(self) -> np.ndarray:
+        if self.legal_mask is None:
+            action_to_index = self.get_action_to_index()
+            self.legal_mask = np.zeros(len(self.all_actions), dtype=bool)
+            self.legal_mask[[action_to_index[action] for action in self.actions]] = True
+        return self.legal_mask
+
+    def sample(self, rng: Optional[random.Random] = None) -> Action:
+        return (rng or random).choice(self.actions)
+
+    def parse_text(self, text: str) -> Optional[Action]:
+        return get_action_matching_text(text, self.actions)
+
+    def get_json_schema(self) -> Dict[str, Any]:
+        return {"enum": list(self.actions)}
 
 
 class K_AmongFiniteActionSpace(ActionsSpace):
+    """Lists of k distinct actions among a finite list of actions.
+
+    The index space is the one of the items, i.e. all_actions if it is given, else the actions themselves :
+    the legal mask tells which items can be part of an action.
+    The k-subsets themselves are ranked from 0 to get_n_combinations() - 1, in the order of itertools.combinations(actions, k),
+    so that agents can enumerate or sample them by integer with get_combination_from_index.
+    """
 
-    def __init__(self, actions: Iterable[Action], k: int):
+    def __init__(self, actions: Iterable[Action], k: int, all_actions: Optional[Sequence[Action]] = None):
         self.actions = actions
         self.k = k
         assert 0 < k <= len(actions)
+        self.items_space = FiniteActionSpace(actions, all_actions=all_actions)
+        self.action_to_position = {action: idx for idx, action in enumerate(actions)}
+        self.n_combinations = comb(len(actions), k)
+        self.textual_restrictions: Optional[str] = None  # built at the first use
 
     def get_textual_restrictions(self):
-        return (
-            f"Return {self.k} non identical actions among the following: {self.actions}, e.g. '{' '.join(str(a) for a in self.actions[:self.k])}'"
-        )
+        if self.textual_restrictions is None:
+            self.textual_restrictions = f"Return {self.k} non identical actions among the following: {self.actions}, e.g. '{' '.join(str(a) for a in self.actions[:self.k])}'"
+        return self.textual_restrictions
 
     def __contains__(self, action: Action):
-        return (
-            isinstance(action, list)
-            and len(action) == self.k
-            and all(a in self.actions for a in action)
-            and len(set(action)) == self.k
-        )
+        if not isinstance(action, list) or len(action) != self.k:
+            return False
+        try:
+            positions = {self.action_to_position[a] for a in action}
+        except (KeyError, TypeError):  # illegal or unhashable item
+            return False
+        return len(positions) == self.k
+
+    def get_n_combinations(self) -> int:
+        """Return the number of legal actions, i.e. of k-subsets of the actions."""
+        return self.n_combinations
+
+    def get_combination_index(self, action: Action) -> int:
+        """Return the rank of a legal action among the k-subsets, whatever the order of its items.
+
+        Args:
+            action (Action): a list of k distinct actions of the space
+
+        Returns:
+            int: the rank, between 0 and get_n_combinations() - 1
+        """
+        n = len(self.actions)
+        index = 0
+        position_next = 0
+        for idx_item, position in enumerate(sorted(self.action_to_position[a] for a in action)):
+            # Skip the k-subsets starting (after the previous items) with a lower position
+            for position_skipped in range(position_next, position):
+                index += comb(n - position_skipped - 1, self.k - idx_item - 1)
+            position_next = position + 1
+        return index
+
+    def get_combination_from_index(self, index: int) -> Action:
+        """Return the k-subset of a rank, its items in the order of the actions.
+
+        Args:
+            index (int): the rank, between 0 and get_n_combinations() - 1
+
+        Returns:
+            Action: the list of k distinct actions
+        """
+        assert (
+            0 <= index < self.n_combinations
+        ), f"Index {index} out of range for {self.n_combinations} combinations."
+        n = len(self.actions)
+        combination = []
+        position = 0
+        for k_left in range(self.k, 0, -1):
+            n_with_position = comb(n - position - 1, k_left - 1)
+            while index >= n_with_position:
+                index -= n_with_position
+                position += 1
+                n_with_position = comb(n - position - 1, k_left - 1)
+            combination.append(self.actions[position])
+            position += 1
+        return combination
+
+    def sample_combination_index(self, rng: Optional[random.Random] = None) -> int:
+        """Return the rank of a uniformly random legal action, drawn with rng or with the global random module if None."""
+        return (rng or random).randrange(self.n_combinations)
+
+    def get_n_actions(self) -> int:
+        return self.items_space.get_n_actions()
+
+    def get_action_index(self, action: Action) -> int:
+        return self.items_space.get_action_index(action)
+
+    def get_action_from_index(self, index: int) -> Action:
+        return self.items_space.get_action_from_index(index)
+
+    def get_legal_mask(self) -> np.ndarray:
+        return self.items_space.get_legal_mask()
+
+    def sample(self, rng: Optional[random.Random] = None) -> Action:
+        return (rng or random).sample(self.actions, self.k)
+
+    def parse_text(self, text: str) -> Optional[Action]:
+        text = text.strip()
+        # A list literal, e.g. "['1', '3']", or actions separated by commas, spaces or "and", e.g. "1, 3" or "1 and 3"
+        try:
+            items = ast.literal_eval(text)
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            items = None
+        if not isinstance(items, (list, tuple)):
+            items = [
+                item
+                for item in re.split(r"\s*(?:,|;|\band\b|\s)\s*", text.strip("[](){} "))
+                if item != ""
+            ]
+        return self.parse_json(list(items))
+
+    def get_json_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "array",
+            "items": {"enum": list(self.actions)},
+            "minItems": self.k,
+            "maxItems": self.k,
+            "uniqueItems": True,
+        }
+
+    def parse_json(self, value: Any) -> Optional[Action]:
+        if not isinstance(value, (list, tuple)):
+            return self.parse_text(str(value))
+        action = [get_action_matching_text(item, self.actions) for item in value]
+        action = list(dict.fromkeys(item for item in action if item is not None))
+        return action if action in self else None
 
 
 class TextualActionSpace(ActionsSpace):
@@ -70,3 +356,14 @@ class TextualActionSpace(ActionsSpace):
 
     def __contains__(self, action: Action):
         return isinstance(action, str)
+
+    def sample(self, rng: Optional[random.Random] = None) -> Action:
+        # A random string of 4 to 10 letters and digits
+        rng = rng or random
+        length = rng.randint(4, 10)
+        characters = string.ascii_letters + string.digits
+        return "".join(rng.choice(characters) for _ in range(length))
+
+    def parse_text(self, text: str) -> Optional[Action]:
+        text = text.strip()
+        return text if text != "" else None
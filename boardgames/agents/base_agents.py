@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import asyncio
 from typing import Dict, List
 
 import numpy as np
@@ -15,10 +16,75 @@ from boardgames.action_spaces import ActionsSpace
 
 class BaseAgent(ABC):
 
+    # Whether act_async can run concurrently for several seats on the same instance. Agents keeping a conversation or any state
+    # updated by act (e.g. OpenAI_Agent's messages) must leave it False, so that the seats they play act one after the other.
+    can_act_concurrently: bool = False
+
     @abstractmethod
     def act(self, observation: Observation, action_space: ActionsSpace) -> Action:
         pass
 
+    async def act_async(self, observation: Observation, action_space: ActionsSpace) -> Action:
+        """Asynchronous version of act, used to gather the actions of several players concurrently (see boardgames.agents.joint_act).
+        By default, it simply calls act. Agents waiting on I/O (e.g. API calls) should override it so that they await instead of blocking.
+
+        Args:
+            observation (Observation): the observation of the agent
+            action_space (ActionsSpace): the action space of the agent
+
+        Returns:
+            Action: the action to play
+        """
+        return self.act(observation=observation, action_space=action_space)
+
+    def act_batch(
+        self, observations: List[Observation], action_spaces: List[ActionsSpace]
+    ) -> List[Action]:
+        """Return the actions of several players controlled by this agent, e.g. in one forward pass of a batched policy.
+        The game loops call it with all the playing seats sharing this agent instance (in one game, or in all the games of a VectorGameRunner).
+        By default, it calls act on each element of the batch.
+
+        Args:
+            observations (List[Observation]): the observation of each element of the batch
+            action_spaces (List[ActionsSpace]): the action space of each element of the batch
+
+        Returns:
+            List[Action]: the action of each element of the batch
+        """
+        return [
+            self.act(observation=observation, action_space=action_space)
+            for observation, action_space in zip(observations, action_spaces)
+        ]
+
+    async def act_batch_async(
+        self, observations: List[Observation], action_spaces: List[ActionsSpace]
+    ) -> List[Action]:
+        """Asynchronous version of act_batch. By default, if the agent overrides act_async, it awaits act_async on each element of the batch,
+        concurrently if can_act_concurrently and one after the other otherwise. Else it calls act_batch.
+
+        Args:
+            observations (List[Observation]): the observation of each element of the batch
+            action_spaces (List[ActionsSpace]): the action space of each element of the batch
+
+        Returns:
+            List[Action]: the action of each element of the batch
+        """
+        if type(self).act_async is BaseAgent.act_async:
+            return self.act_batch(observations=observations, action_spaces=action_spaces)
+        if self.can_act_concurrently:
+            return list(
+                await asyncio.gather(
+                    *[
+                        self.act_async(observation=observation, action_space=action_space)
+                        for observation, action_space in zip(observations, action_spaces)
+                    ]
+                )
+            )
+        return [
+            await self.act_async(observation=observation, action_space=action_space)
+            for observation, action_space in zip(observations, action_spaces)
+        ]
+
     @abstractmethod
     def learn(
         self,
@@ -0,0 +1,41 @@
+from abc import abstractmethod
+from typing import List
+
+from boardgames.agents.base_agents import BaseAgent
+from boardgames.action_spaces import ActionsSpace
+from boardgames.games.base_game import BaseGame
+from boardgames.types import State
+
+
+class BasePlanningAgent(BaseAgent):
+    """
+    Base class for an agent that plans by simulating the game.
+    Such an agent is given access to the game and to the current state before each action, and is responsible
+    for only using the information its player is allowed to know (e.g. with BaseGame.sample_determinization).
+    """
+
+    @abstractmethod
+    def set_game(self, game: BaseGame, idx_player: int) -> None:
+        """Give the agent the game it plays and the index of its player.
+
+        Args:
+            game (BaseGame): the game
+            idx_player (int): the index of the player controlled by the agent
+        """
+        pass
+
+    @abstractmethod
+    def observe_state(
+        self,
+        state: State,
+        list_is_playing: List[bool],
+        list_action_spaces: List[ActionsSpace],
+    ) -> None:
+        """Give the agent the current state of the game, before it acts.
+
+        Args:
+            state (State): the current state of the game
+            list_is_playing (List[bool]): the list of players playing at this step
+            list_action_spaces (List[ActionsSpace]): the action space of each player at this step
+        """
+        pass
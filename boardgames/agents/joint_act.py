@@ -0,0 +1,227 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+from boardgames.agents.base_agents import BaseAgent
+from boardgames.action_spaces import ActionsSpace
+from boardgames.time_measure import RuntimeMeter
+from boardgames.types import Action, Observation
+
+
+def is_acting_asynchronously(agent: BaseAgent) -> bool:
+    """Return whether the agent overrides BaseAgent.act_async, i.e. whether it can wait concurrently with other agents."""
+    return type(agent).act_async is not BaseAgent.act_async
+
+
+def group_seats_by_agent(
+    agents: List[BaseAgent], list_idx_seats: List[int]
+) -> List[Tuple[BaseAgent, List[int]]]:
+    """Group seats by the agent instance playing them, in order of first appearance.
+
+    Args:
+        agents (List[BaseAgent]): the agent of each seat
+        list_idx_seats (List[int]): the indexes of the seats to group, e.g. the playing ones
+
+    Returns:
+        List[Tuple[BaseAgent, List[int]]]: the distinct agents and the indexes of the seats they play
+    """
+    id_agent_to_group: Dict[int, Tuple[BaseAgent, List[int]]] = {}
+    for idx_seat in list_idx_seats:
+        agent = agents[idx_seat]
+        if id(agent) not in id_agent_to_group:
+            id_agent_to_group[id(agent)] = (agent, [])
+        id_agent_to_group[id(agent)][1].append(idx_seat)
+    return list(id_agent_to_group.values())
+
+
+def act_jointly(
+    agents: List[BaseAgent],
+    list_is_playing: List[bool],
+    list_obs: List[Observation],
+    list_action_spaces: List[ActionsSpace],
+) -> List[Action]:
+    """Return the joint action of the seats, None for the seats that are not playing, acting sequentially.
+    The playing seats sharing an agent instance are given to that agent in a single act_batch call.
+
+    Args:
+        agents (List[BaseAgent]): the agent of each seat
+        list_is_playing (List[bool]): whether each seat is playing
+        list_obs (List[Observation]): the observation of each seat
+        list_action_spaces (List[ActionsSpace]): the action space of each seat
+
+    Returns:
+        List[Action]: the action of each seat
+    """
+    list_idx_playing = [idx for idx, is_playing in enumerate(list_is_playing) if is_playing]
+    list_actions: List[Action] = [None] * len(agents)
+    for agent, list_idx_seats in group_seats_by_agent(agents, list_idx_playing):
+        with RuntimeMeter("agent.act"):
+            if len(list_idx_seats) == 1:
+                actions = [
+                    agent.act(
+                        observation=list_obs[list_idx_seats[0]],
+                        action_space=list_action_spaces[list_idx_seats[0]],
+                    )
+                ]
+            else:
+                actions = agent.act_batch(
+                    observations=[list_obs[idx] for idx in list_idx_seats],
+                    action_spaces=[list_action_spaces[idx] for idx in list_idx_seats],
+                )
+        assert len(actions) == len(
+            list_idx_seats
+        ), f"act_batch of {agent} returned {len(actions)} actions for {len(list_idx_seats)} observations."
+        for idx_seat, action in zip(list_idx_seats, actions):
+            list_actions[idx_seat] = action
+    return list_actions
+
+
+class JointActor:
+    """Gather the actions of all the players playing at a step concurrently, with act_async.
+
+    In phases where several players act simultaneously (votes, announcements...), agents waiting on I/O (e.g. LLM API calls)
+    then wait at the same time, so the step costs roughly one round trip instead of one per player.
+    The playing seats sharing an agent instance are given to that agent in a single act_batch (or act_batch_async) call.
+    At most max_concurrent_acts agents act at the same time. Agents that don't override act_async act one after the other, as in the sequential loop,
+    and if no playing agent overrides it the event loop is not used at all, so that fast agents don't pay its overhead.
+
+    joint_actor = JointActor(max_concurrent_acts=8)
+    list_actions = joint_actor.act(agents, list_is_playing, list_obs, list_action_spaces)
+    joint_actor.close()
+    """
+
+    n_max_threads: int = 32  # size of the thread pool if there is no concurrency cap
+
+    def __init__(self, max_concurrent_acts: Optional[int] = None) -> None:
+        """Initialize the actor and its event loop.
+
+        Args:
+            max_concurrent_acts (Optional[int], optional): the maximum number of agents acting at the same time. Defaults to None (no limit, but at most n_max_threads agents run their blocking act in threads).
+        """
+        assert (
+            max_concurrent_acts is None or max_concurrent_acts >= 1
+        ), f"max_concurrent_acts must be None or at least 1, but is {max_concurrent_acts}."
+        self.max_concurrent_acts = max_concurrent_acts
+        # The loop is kept between steps, creating one per step would cost more than acting for fast agents
+        self.loop = asyncio.new_event_loop()
+        # Agents running their blocking act in a thread (asyncio.to_thread) use this executor, sized to the concurrency cap
+        self.loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=max_concurrent_acts or self.n_max_threads)
+        )
+
+    def act(
+        self,
+        agents: List[BaseAgent],
+        list_is_playing: List[bool],
+        list_obs: List[Observation],
+        list_action_spaces: List[ActionsSpace],
+    ) -> List[Action]:
+        """Return the joint action of the players, None for the players that are not playing.
+
+        Args:
+            agents (List[BaseAgent]): the agent of each player
+            list_is_playing (List[bool]): whether each player is playing
+            list_obs (List[Observation]): the observation of each player
+            list_action_spaces (List[ActionsSpace]): the action space of each player
+
+        Returns:
+            List[Action]: the action of each player
+        """
+        list_idx_playing = [idx for idx, is_playing in enumerate(list_is_playing) if is_playing]
+        groups = group_seats_by_agent(agents, list_idx_playing)
+        if len(groups) <= 1 or not any(is_acting_asynchronously(agent) for agent, _ in groups):
+            # No concurrency possible, skip the event loop
+            return act_jointly(agents, list_is_playing, list_obs, list_action_spaces)
+        list_actions_groups = self.loop.run_until_complete(
+            self.gather_actions(
+                [agent for agent, _ in groups],
+                [[list_obs[idx] for idx in list_idx_seats] for _, list_idx_seats in groups],
+                [[list_action_spaces[idx] for idx in list_idx_seats] for _, list_idx_seats in groups],
+            )
+        )
+        list_actions: List[Action] = [None] * len(agents)
+        for (agent, list_idx_seats), actions in zip(groups, list_actions_groups):
+            assert len(actions) == len(
+                list_idx_seats
+            ), f"act_batch_async of {agent} returned {len(actions)} actions for {len(list_idx_seats)} observations."
+            for idx_seat, action in zip(list_idx_seats, actions):
+                list_actions[idx_seat] = action
+        return list_actions
+
+    async def gather_actions(
+        self,
+        agents: List[BaseAgent],
+        list_batch_obs: List[List[Observation]],
+        list_batch_action_spaces: List[List[ActionsSpace]],
+    ) -> List[List[Action]]:
+        """Run the acts of distinct agents concurrently, with at most max_concurrent_acts requests at the same time.
+        Each agent acts on its batch of seats with act_batch_async, which is one request. If the agent doesn't override act_batch_async
+        but overrides act_async, each seat is instead a request of its own (taking its own slot), awaited concurrently if the agent
+        can_act_concurrently and one after the other otherwise.
+        If an agent raises, the other pending acts are cancelled and the exception is raised.
+
+        Args:
+            agents (List[BaseAgent]): the distinct agents that are playing
+            list_batch_obs (List[List[Observation]]): the observations of the seats of each agent
+            list_batch_action_spaces (List[List[ActionsSpace]]): the action spaces of the seats of each agent
+
+        Returns:
+            List[List[Action]]: the actions of the seats of each agent, in the same order
+        """
+        semaphore = (
+            asyncio.Semaphore(self.max_concurrent_acts)
+            if self.max_concurrent_acts is not None
+            else None
+        )
+
+        async def run_measured(request: Awaitable[Any]) -> Any:
+            if semaphore is None:
+                with RuntimeMeter("agent.act"):
+                    return await request
+            async with semaphore:
+                with RuntimeMeter("agent.act"):
+                    return await request
+
+        async def act_agent_measured(
+            agent: BaseAgent, batch_obs: List[Observation], batch_action_spaces: List[ActionsSpace]
+        ) -> List[Action]:
+            is_request_per_seat = len(batch_obs) == 1 or (
+                type(agent).act_batch_async is BaseAgent.act_batch_async
+                and is_acting_asynchronously(agent)
+            )
+            if not is_request_per_seat:
+                return await run_measured(
+                    agent.act_batch_async(observations=batch_obs, action_spaces=batch_action_spaces)
+                )
+            if agent.can_act_concurrently:
+                return list(
+                    await asyncio.gather(
+                        *[
+                            run_measured(agent.act_async(observation=observation, action_space=action_space))
+                            for observation, action_space in zip(batch_obs, batch_action_spaces)
+                        ]
+                    )
+                )
+            return [
+                await run_measured(agent.act_async(observation=observation, action_space=action_space))
+                for observation, action_space in zip(batch_obs, batch_action_spaces)
+            ]
+
+        tasks = [
+            asyncio.ensure_future(act_agent_measured(agent, batch_obs, batch_action_spaces))
+            for agent, batch_obs, batch_action_spaces in zip(
+                agents, list_batch_obs, list_batch_action_spaces
+            )
+        ]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def close(self) -> None:
+        """Close the event loop and its executor."""
+        if not self.loop.is_closed():
+            self.loop.run_until_complete(self.loop.shutdown_default_executor())
+            self.loop.close()
@@ -0,0 +1,165 @@
+from abc import ABC, abstractmethod
+import ast
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from openai import AsyncOpenAI
+
+from boardgames.agents.llm_history import Message
+
+
+class TransientLLMError(Exception):
+    """An error of a backend after which the request can be retried (rate limit, server error...)."""
+
+    pass
+
+
+class LLMBackend(ABC):
+    """The service answering the requests of a text agent : a chat completion model, behind an API or simulated."""
+
+    @abstractmethod
+    async def complete(self, model: str, messages: List[Message], params: Dict[str, Any]) -> str:
+        """Return the answer of the model to the messages.
+        Transient failures should raise TransientLLMError (or the retryable errors of the openai package), so that the agent retries.
+
+        Args:
+            model (str): the name of the model
+            messages (List[Message]): the messages
+            params (Dict[str, Any]): the additional parameters of the request (temperature...)
+
+        Returns:
+            str: the answer
+        """
+        pass
+
+
+class OpenAIBackend(LLMBackend):
+    """The OpenAI API, or any server implementing it (given base_url), through an AsyncOpenAI client.
+    The backends with the same base_url share the same client, so that they share its pool of HTTP connections.
+    """
+
+    base_url_to_client: Dict[Optional[str], AsyncOpenAI] = {}
+    lock_clients = threading.Lock()
+
+    def __init__(self, base_url: Optional[str] = None) -> None:
+        """Initialize the backend and connect to the API.
+
+        Args:
+            base_url (Optional[str], optional): the URL of the API, e.g. of a local server. Defaults to None (OpenAI's API, which requires the OPENAI_API_KEY environment variable).
+        """
+        self.base_url = base_url
+        self.client = self.get_client(base_url)
+
+    @staticmethod
+    def get_client(base_url: Optional[str]) -> AsyncOpenAI:
+        with OpenAIBackend.lock_clients:
+            if base_url not in OpenAIBackend.base_url_to_client:
+                print(f"Connecting to {base_url or 'OpenAI'}'s API...")
+                OpenAIBackend.base_url_to_client[base_url] = AsyncOpenAI(
+                    api_key=(
+                        os.environ["OPENAI_API_KEY"]
+                        if base_url is None
+                        else os.environ.get("OPENAI_API_KEY", "no-key")
+                    ),
+                    base_url=base_url,
+                    max_retries=0,  # retries are done by the agent, with backoff and a deadline per request
+                )
+                print(f"Connected to {base_url or 'OpenAI'}'s API !")
+            return OpenAIBackend.base_url_to_client[base_url]
+
+    async def complete(self, model: str, messages: List[Message], params: Dict[str, Any]) -> str:
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            **params,
+        )
+        return response.choices[0].message.content
+
+
+class MockBackend(LLMBackend):
+    """A local stand-in for a model, to test and load-test text agents offline and for free.
+
+    After a random latency, it answers 'Reasoning : ...\\nAction: <action>' with an action chosen randomly among the ones listed in
+    the action restrictions of the last user message, or fails with a TransientLLMError with probability error_rate.
+    The latency is drawn from a lognormal distribution (heavy tailed, like the latency of real APIs) of median latency_median_s,
+    or is constant if latency_sigma is 0.
+    With probability answer_noise_rate, the action is written loosely like models often do (e.g. "Action: I vote for player 3."),
+    to test the parsing of the answers. If a JSON response_format is requested, the answer is a JSON object {"reasoning": ..., "action": ...}.
+    """
+
+    def __init__(
+        self,
+        latency_median_s: float = 0.5,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0,
+        answer_noise_rate: float = 0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Initialize the backend.
+
+        Args:
+            latency_median_s (float, optional): the median latency of a request, in seconds. Defaults to 0.5.
+            latency_sigma (float, optional): the standard deviation of the log of the latency. Defaults to 0.5.
+            error_rate (float, optional): the probability that a request fails. Defaults to 0.
+            answer_noise_rate (float, optional): the probability that the action is written loosely. Defaults to 0.
+            seed (Optional[int], optional): the seed of the random generator of the backend, separate from the one of the games. Defaults to None.
+        """
+        assert 0 <= error_rate <= 1, f"error_rate must be between 0 and 1, but is {error_rate}."
+        self.latency_median_s = latency_median_s
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.answer_noise_rate = answer_noise_rate
+        self.rng = random.Random(seed)
+
+    def get_latency(self) -> float:
+        """Sample the latency of a request, in seconds."""
+        if self.latency_sigma == 0:
+            return self.latency_median_s
+        return self.latency_median_s * self.rng.lognormvariate(0, self.latency_sigma)
+
+    async def complete(self, model: str, messages: List[Message], params: Dict[str, Any]) -> str:
+        await asyncio.sleep(self.get_latency())
+        if self.rng.random() < self.error_rate:
+            raise TransientLLMError("Simulated error of the mock backend.")
+        return self.get_answer(messages, params)
+
+    def get_answer(self, messages: List[Message], params: Dict[str, Any] = {}) -> str:
+        """Return an answer to the messages, with an action respecting the restrictions of the last user message if they list the allowed actions.
+
+        Args:
+            messages (List[Message]): the messages
+            params (Dict[str, Any], optional): the parameters of the request. Defaults to {}.
+
+        Returns:
+            str: the answer
+        """
+        content = next(
+            (message["content"] for message in reversed(messages) if message["role"] == "user"),
+            "",
+        )
+        action = "I pass."
+        match_actions = re.search(r"(among the following|actions are allowed): (\[.*?\])", content)
+        if match_actions is not None:
+            try:
+                actions = ast.literal_eval(match_actions.group(2))
+            except (ValueError, SyntaxError):
+                actions = []
+            if len(actions) > 0:
+                match_k = re.search(r"Return (\d+) non identical actions", content)
+                if match_k is not None:
+                    action = self.rng.sample(actions, min(int(match_k.group(1)), len(actions)))
+                else:
+                    action = self.rng.choice(actions)
+        if params.get("response_format", {}).get("type") in ["json_object", "json_schema"]:
+            return json.dumps({"reasoning": "This is a mock answer.", "action": action})
+        if self.rng.random() < self.answer_noise_rate:
+            if isinstance(action, list):
+                action = " and ".join(str(item) for item in action)
+            else:
+                action = self.rng.choice(["I choose {}.", "'{}'", "Player {}", "{} !"]).format(action)
+        return f"Reasoning : this is a mock answer.\nAction: {action}"
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class CompletionCache:
+    """A disk-backed cache of the answers of LLMs, in a SQLite database.
+
+    The answers are content-addressed : the key of an answer is the hash of the model, the messages and the sampling parameters of the request,
+    so replaying a seed or re-running a config sends no request for the conversations already seen.
+    Entries are evicted in least-recently-used order when the cache has more than max_entries entries or weighs more than max_size_mb.
+    The database can be shared by several processes (e.g. the workers of a benchmark).
+    Reads don't write to the database : the times of last access of the entries read are kept in memory and written in one transaction
+    every n_accesses_per_flush reads, before an eviction and at close. The methods are blocking (SQLite waits up to 30s for a lock
+    held by another process), so asynchronous code should call them in a thread (e.g. with asyncio.to_thread).
+
+    cache = CompletionCache.get_cache("logs/llm_cache.sqlite")
+    key = cache.get_key(model, messages, params)
+    answer = cache.get(key)
+    if answer is None:
+        answer = request(...)
+        cache.put(key, answer)
+    """
+
+    path_to_cache: Dict[str, "CompletionCache"] = {}
+    lock_caches = threading.Lock()
+    n_accesses_per_flush: int = 100
+
+    @staticmethod
+    def get_cache(
+        path: str,
+        max_entries: Optional[int] = None,
+        max_size_mb: Optional[float] = None,
+    ) -> "CompletionCache":
+        """Return the cache of the database at path, opening it at the first call. Agents using the same path share the same cache.
+
+        Args:
+            path (str): the path of the database
+            max_entries (Optional[int], optional): the maximum number of entries. Defaults to None (no limit).
+            max_size_mb (Optional[float], optional): the maximum total size of the answers, in MB. Defaults to None (no limit).
+
+        Returns:
+            CompletionCache: the cache
+        """
+        with CompletionCache.lock_caches:
+            if path not in CompletionCache.path_to_cache:
+                CompletionCache.path_to_cache[path] = CompletionCache(path, max_entries, max_size_mb)
+            return CompletionCache.path_to_cache[path]
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: Optional[int] = None,
+        max_size_mb: Optional[float] = None,
+    ) -> None:
+        """Open (or create) the cache. Prefer CompletionCache.get_cache, so that a database is opened once per process.
+
+        Args:
+            path (str): the path of the database
+            max_entries (Optional[int], optional): the maximum number of entries. Defaults to None (no limit).
+            max_size_mb (Optional[float], optional): the maximum total size of the answers, in MB. Defaults to None (no limit).
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_size_bytes = max_size_mb * 1e6 if max_size_mb is not None else None
+        if os.path.dirname(path) != "":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # The connection is used by the thread of the clients' event loop, but also possibly by others : access is serialized by a lock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")  # readers don't block the writer of another process
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, answer TEXT, size INTEGER, time_last_access REAL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_time_last_access ON completions (time_last_access)"
+        )
+        self.connection.commit()
+        self.n_entries, self.size_bytes = self.get_n_entries_and_size()
+        self.n_hits = 0
+        self.n_misses = 0
+        self.key_to_time_last_access: Dict[str, float] = {}  # the accesses not written to the database yet
+
+    @staticmethod
+    def get_key(model: str, messages: List[Dict[str, str]], params: Dict[str, Any] = {}) -> str:
+        """Return the key of a request : the SHA-256 of its model, messages and sampling parameters.
+
+        Args:
+            model (str): the model
+            messages (List[Dict[str, str]]): the messages
+            params (Dict[str, Any], optional): the sampling parameters (temperature...). Defaults to {}.
+
+        Returns:
+            str: the key
+        """
+        content = json.dumps(
+            {"model": model, "messages": messages, "params": params},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached answer of a key, or None if it is not in the cache.
+
+        Args:
+            key (str): the key of the request
+
+        Returns:
+            Optional[str]: the answer, or None
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT answer FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.n_misses += 1
+                return None
+            self.n_hits += 1
+            self.key_to_time_last_access[key] = time.time()
+            if len(self.key_to_time_last_access) >= self.n_accesses_per_flush:
+                self.flush_accesses()
+            return row[0]
+
+    def flush_accesses(self) -> None:
+        """Write the times of last access kept in memory to the database, in one transaction. Must be called with the lock held."""
+        if len(self.key_to_time_last_access) == 0:
+            return
+        self.connection.executemany(
+            "UPDATE completions SET time_last_access = ? WHERE key = ?",
+            [(time_access, key) for key, time_access in self.key_to_time_last_access.items()],
+        )
+        self.connection.commit()
+        self.key_to_time_last_access = {}
+
+    def put(self, key: str, answer: str) -> None:
+        """Store the answer of a key, evicting the least recently used entries if the cache exceeds its limits.
+
+        Args:
+            key (str): the key of the request
+            answer (str): the answer
+        """
+        size = len(answer.encode("utf-8"))
+        with self.lock:
+            is_new = (
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO completions VALUES (?, ?, ?, ?)",
+                    (key, answer, size, time.time()),
+                ).rowcount
+                == 1
+            )
+            self.connection.commit()
+            if is_new:
+                self.n_entries += 1
+                self.size_bytes += size
+            if self.is_over_limits():
+                self.evict()
+
+    def is_over_limits(self) -> bool:
+        return (self.max_entries is not None and self.n_entries > self.max_entries) or (
+            self.max_size_bytes is not None and self.size_bytes > self.max_size_bytes
+        )
+
+    def evict(self) -> None:
+        """Delete the least recently used entries until the cache is within its limits. Must be called with the lock held."""
+        # The recent accesses are written first so that they count in the order of eviction,
+        # and other processes may have written to the database, so the totals are recomputed
+        self.flush_accesses()
+        self.n_entries, self.size_bytes = self.get_n_entries_and_size()
+        while self.is_over_limits() and self.n_entries > 0:
+            # Evict at least 10% of the entries at once, so that a full cache doesn't evict at each put
+            n_entries_evicted = max(1, self.n_entries // 10)
+            if self.max_entries is not None:
+                n_entries_evicted = max(n_entries_evicted, self.n_entries - self.max_entries)
+            self.connection.execute(
+                "DELETE FROM completions WHERE key IN (SELECT key FROM completions ORDER BY time_last_access ASC LIMIT ?)",
+                (n_entries_evicted,),
+            )
+            self.connection.commit()
+            self.n_entries, self.size_bytes = self.get_n_entries_and_size()
+
+    def get_n_entries_and_size(self) -> Tuple[int, int]:
+        n_entries, size_bytes = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+        ).fetchone()
+        return n_entries, size_bytes
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Return the metrics of the cache, since it was opened in this process.
+
+        Returns:
+            Dict[str, float]: a dictionnary mapping metric names to values
+        """
+        n_requests = self.n_hits + self.n_misses
+        return {
+            "llm_cache/n_hits": self.n_hits,
+            "llm_cache/n_misses": self.n_misses,
+            "llm_cache/hit_rate": self.n_hits / n_requests if n_requests > 0 else 0,
+            "llm_cache/n_entries": self.n_entries,
+            "llm_cache/size_mb": self.size_bytes / 1e6,
+        }
+
+    def close(self) -> None:
+        with self.lock:
+            self.flush_accesses()
+            self.connection.close()
+
+
+def get_caches_metrics() -> Dict[str, float]:
+    """Return the metrics of all the caches opened in this process, summed over the caches (the hit rate being recomputed).
+
+    Returns:
+        Dict[str, float]: a dictionnary mapping metric names to values, empty if no cache is opened
+    """
+    metrics: Dict[str, float] = {}
+    for cache in list(CompletionCache.path_to_cache.values()):
+        for metric_name, value in cache.get_metrics().items():
+            metrics[metric_name] = metrics.get(metric_name, 0) + value
+    if len(metrics) > 0:
+        n_requests = metrics["llm_cache/n_hits"] + metrics["llm_cache/n_misses"]
+        metrics["llm_cache/hit_rate"] = metrics["llm_cache/n_hits"] / n_requests if n_requests > 0 else 0
+    return metrics
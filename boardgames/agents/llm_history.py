@@ -0,0 +1,152 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+# A message of a chat completion conversation, e.g. {"role": "user", "content": "..."}
+Message = Dict[str, str]
+
+n_chars_per_token: float = 4  # usual average for English text with OpenAI's tokenizers
+n_tokens_per_message: int = 4  # overhead of the role and delimiters of a message
+
+
+def estimate_n_tokens(messages: List[Message]) -> int:
+    """Estimate the number of tokens of a list of messages, without a tokenizer (about 4 characters per token).
+
+    Args:
+        messages (List[Message]): the messages
+
+    Returns:
+        int: the estimated number of tokens
+    """
+    return sum(
+        n_tokens_per_message + int(len(message["content"]) / n_chars_per_token + 1)
+        for message in messages
+    )
+
+
+class HistoryPolicy(ABC):
+    """A policy deciding which part of the conversation of an LLM agent is kept, and therefore sent at each request.
+
+    The first n_messages_pinned messages (the game context given by set_game_context) are always kept as they are.
+    """
+
+    is_blocking: bool = False  # whether compact may wait on I/O (e.g. a request to a model), in which case agents run it in a thread
+
+    @abstractmethod
+    def compact(self, messages: List[Message], n_messages_pinned: int) -> List[Message]:
+        """Return the messages to keep in the conversation.
+
+        Args:
+            messages (List[Message]): the conversation, beginning with the pinned messages
+            n_messages_pinned (int): the number of pinned messages at the beginning of the conversation
+
+        Returns:
+            List[Message]: the compacted conversation, beginning with the same pinned messages
+        """
+        pass
+
+
+class FullHistory(HistoryPolicy):
+    """Keep the whole conversation. The payload of the requests grows with the length of the game."""
+
+    def compact(self, messages: List[Message], n_messages_pinned: int) -> List[Message]:
+        return messages
+
+
+class SlidingWindowHistory(HistoryPolicy):
+    """Keep the pinned messages and the most recent messages fitting in a budget of tokens (and of messages).
+    The last message is always kept.
+    """
+
+    def __init__(self, max_tokens: int = 8000, max_messages: Optional[int] = None) -> None:
+        """Initialize the policy.
+
+        Args:
+            max_tokens (int, optional): the maximum estimated number of tokens of the non-pinned messages kept. Defaults to 8000.
+            max_messages (Optional[int], optional): the maximum number of non-pinned messages kept. Defaults to None (no limit).
+        """
+        self.max_tokens = max_tokens
+        self.max_messages = max_messages
+
+    def compact(self, messages: List[Message], n_messages_pinned: int) -> List[Message]:
+        idx_first_kept = get_idx_first_recent_message(
+            messages, n_messages_pinned, self.max_tokens, self.max_messages
+        )
+        if idx_first_kept == n_messages_pinned:
+            return messages
+        return messages[:n_messages_pinned] + messages[idx_first_kept:]
+
+
+class SummarizingHistory(HistoryPolicy):
+    """When the conversation exceeds a budget of tokens, replace its older messages by a summary of them.
+    The summary is a system message placed right after the pinned messages, and is itself summarized with the older messages next time.
+    """
+
+    is_blocking: bool = True
+
+    def __init__(
+        self,
+        summarizer: Optional[Callable[[List[Message]], str]] = None,
+        max_tokens: int = 8000,
+        max_tokens_recent: int = 2000,
+    ) -> None:
+        """Initialize the policy.
+
+        Args:
+            summarizer (Optional[Callable[[List[Message]], str]], optional): a function returning a summary of messages.
+                Defaults to None, in which case the agent using the policy provides it (e.g. OpenAI_Agent.summarize, which asks its own model).
+            max_tokens (int, optional): the estimated number of tokens of the non-pinned messages above which the conversation is summarized. Defaults to 8000.
+            max_tokens_recent (int, optional): the maximum estimated number of tokens of the recent messages kept as they are when summarizing. Defaults to 2000.
+        """
+        assert max_tokens_recent < max_tokens, "max_tokens_recent must be lower than max_tokens."
+        self.summarizer = summarizer
+        self.max_tokens = max_tokens
+        self.max_tokens_recent = max_tokens_recent
+
+    def compact(self, messages: List[Message], n_messages_pinned: int) -> List[Message]:
+        if estimate_n_tokens(messages[n_messages_pinned:]) <= self.max_tokens:
+            return messages
+        assert self.summarizer is not None, "SummarizingHistory needs a summarizer."
+        idx_first_kept = get_idx_first_recent_message(
+            messages, n_messages_pinned, self.max_tokens_recent
+        )
+        if idx_first_kept == n_messages_pinned:
+            # The recent messages alone are over the budget : there is nothing older to summarize
+            return messages
+        summary = self.summarizer(messages[n_messages_pinned:idx_first_kept])
+        message_summary = {
+            "role": "system",
+            "content": f"Summary of the previous turns of the game : {summary}",
+        }
+        return messages[:n_messages_pinned] + [message_summary] + messages[idx_first_kept:]
+
+
+def get_idx_first_recent_message(
+    messages: List[Message],
+    n_messages_pinned: int,
+    max_tokens: int,
+    max_messages: Optional[int] = None,
+) -> int:
+    """Return the index of the oldest message such that the messages from it to the end fit in the budgets.
+    The last message is always included, and the pinned messages never are.
+
+    Args:
+        messages (List[Message]): the conversation
+        n_messages_pinned (int): the number of pinned messages at the beginning of the conversation
+        max_tokens (int): the budget of estimated tokens
+        max_messages (Optional[int], optional): the budget of messages. Defaults to None (no limit).
+
+    Returns:
+        int: the index of the first recent message
+    """
+    idx_first_kept = len(messages)
+    n_tokens = 0
+    while idx_first_kept > n_messages_pinned:
+        n_tokens += estimate_n_tokens([messages[idx_first_kept - 1]])
+        n_messages = len(messages) - idx_first_kept + 1
+        is_over_budget = n_tokens > max_tokens or (
+            max_messages is not None and n_messages > max_messages
+        )
+        if is_over_budget and idx_first_kept < len(messages):
+            break
+        idx_first_kept -= 1
+    return idx_first_kept
@@ -0,0 +1,123 @@
+"""A local server implementing the chat completion endpoint of the OpenAI API with a MockBackend,
+to load-test text agents end-to-end (HTTP connections, concurrency, retries, cache) offline.
+
+python -m boardgames.agents.mock_llm_server --port 8000 --latency_median_s 0.5 --error_rate 0.05
+
+Then use OpenAI_Agent with base_url: http://127.0.0.1:8000/v1
+Failed requests of the backend are answered with a 429 (rate limit) error.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+from boardgames.agents.llm_backends import MockBackend, TransientLLMError
+
+
+class MockLLMServer:
+    """A minimal HTTP/1.1 server (with keep-alive) answering POST /v1/chat/completions with a MockBackend."""
+
+    def __init__(self, backend: MockBackend, host: str = "127.0.0.1", port: int = 8000) -> None:
+        self.backend = backend
+        self.host = host
+        self.port = port
+        self.n_requests = 0
+        self.n_errors = 0
+
+    async def serve(self) -> None:
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        print(f"Mock LLM server listening on http://{self.host}:{self.port}/v1")
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, value = line.decode("latin-1").split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, response = await self.get_response(method, path, body)
+                writer.write(self.format_response(status, response))
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def get_response(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        if method != "POST" or not path.rstrip("/").endswith("/chat/completions"):
+            return 404, {"error": {"message": f"Unknown endpoint {method} {path}", "type": "not_found"}}
+        self.n_requests += 1
+        request = json.loads(body)
+        try:
+            answer = await self.backend.complete(
+                request.get("model", "mock"), request.get("messages", []), {}
+            )
+        except TransientLLMError as error:
+            self.n_errors += 1
+            return 429, {"error": {"message": str(error), "type": "rate_limit_exceeded"}}
+        return 200, {
+            "id": f"chatcmpl-mock-{self.n_requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": answer},
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    @staticmethod
+    def format_response(status: int, response: Dict) -> bytes:
+        body = json.dumps(response).encode("utf-8")
+        reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests"}[status]
+        head = (
+            f"HTTP/1.1 {status} {reason}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        return head.encode("latin-1") + body
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency_median_s", type=float, default=0.5)
+    parser.add_argument("--latency_sigma", type=float, default=0.5)
+    parser.add_argument("--error_rate", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(args)
+    backend = MockBackend(
+        latency_median_s=args.latency_median_s,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    server = MockLLMServer(backend, host=args.host, port=args.port)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print(f"\nServed {server.n_requests} requests ({server.n_errors} simulated errors).")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,168 @@
-import os
+import asyncio
+import json
 import re
-from typing import Dict, List, Union
+import threading
+from typing import Dict, List, Optional, Union
 
 import numpy as np
 from boardgames.agents.base_agents import BaseAgent
 from boardgames.agents.base_text_agents import BaseTextAgent
+from boardgames.agents.llm_backends import LLMBackend, OpenAIBackend, TransientLLMError
+from boardgames.agents.llm_cache import CompletionCache
+from boardgames.agents.llm_history import (
+    FullHistory,
+    HistoryPolicy,
+    Message,
+    SummarizingHistory,
+    estimate_n_tokens,
+)
+from boardgames.utils import instantiate_class, str_to_literal
 from boardgames.types import Observation, Action, State, AgentID
-from boardgames.action_spaces import ActionsSpace
+from boardgames.action_spaces import ActionsSpace, TextualActionSpace
 
 import random
-from openai import OpenAI
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+
+# Errors after which a request is retried, with exponential backoff
+RETRYABLE_ERRORS = (
+    RateLimitError,
+    APITimeoutError,
+    APIConnectionError,
+    InternalServerError,
+    TransientLLMError,
+    asyncio.TimeoutError,
+)
 
 
 class OpenAI_Agent(BaseTextAgent):
-    is_active: bool = False
-    client: OpenAI = None
+    """An agent querying a chat completion model through a backend : by default the OpenAI API (or any server implementing it, given base_url),
+    or any LLMBackend, e.g. a MockBackend to run games offline (see boardgames.agents.llm_backends).
+
+    The requests of all the agents are run in an event loop in a background thread, where the clients of the backends live
+    (one AsyncOpenAI client per base_url, so that the agents share its pool of HTTP connections) :
+    act_async awaits the request without blocking the caller's event loop, so that the requests of several agents are concurrent
+    (see JointActor), and act simply waits for it. Cancelling act_async cancels the request.
+    Each request has a deadline of timeout seconds and is retried with exponential backoff on rate limits, timeouts and server errors.
+    The part of the conversation sent at each request is decided by a history policy (see boardgames.agents.llm_history),
+    the game context given by set_game_context being always kept.
+    If cache_config is given, the answers are cached on disk by (model, messages, completion_params) (see CompletionCache),
+    so identical requests, e.g. when replaying a seed, are answered without calling the API.
+    The action is parsed from the answer by the action space (see ActionsSpace.parse_text), which tolerates usual variations
+    (quotes, "Player 3", "(1,2)", lists...), so that the model is asked again only if its answer designates no valid action.
+    With output_format "json", the model is asked for a JSON object constrained by the JSON schema of the action space (structured outputs).
+    """
+
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    lock_loop = threading.Lock()
+    # Random generator of the backoff jitter, separate from the global one used (and seeded) by the games
+    rng_backoff = random.Random()
+
+    def __init__(
+        self,
+        model: str,
+        do_print_answer_assistant: bool = False,
+        base_url: Optional[str] = None,
+        timeout: float = 60,
+        n_max_retries: int = 5,
+        backoff_initial: float = 1,
+        backoff_max: float = 30,
+        n_max_invalid_actions: int = 10,
+        history_policy: Union[HistoryPolicy, Dict, None] = None,
+        completion_params: Optional[Dict] = None,
+        cache_config: Optional[Dict] = None,
+        backend: Union[LLMBackend, Dict, None] = None,
+        output_format: str = "text",
+    ):
+        """Initialize the agent.
 
-    def __init__(self, model: str, do_print_answer_assistant: bool = False):
-        self.try_connect()
+        Args:
+            model (str): the name of the model
+            do_print_answer_assistant (bool, optional): whether to print the answers of the model. Defaults to False.
+            base_url (Optional[str], optional): the URL of the API, e.g. of a local server, if backend is None. Defaults to None (OpenAI's API).
+            timeout (float, optional): the deadline of a request, in seconds. Defaults to 60.
+            n_max_retries (int, optional): the maximum number of retries of a failed request. Defaults to 5.
+            backoff_initial (float, optional): the delay before the first retry, in seconds, doubled at each retry. Defaults to 1.
+            backoff_max (float, optional): the maximum delay between two retries, in seconds. Defaults to 30.
+            n_max_invalid_actions (int, optional): the number of times the model is asked again after an invalid action. Defaults to 10.
+            history_policy (Union[HistoryPolicy, Dict, None], optional): the history policy, or its config (with a class_string). Defaults to None (the whole conversation is kept).
+            completion_params (Optional[Dict], optional): additional parameters of the requests, e.g. {"temperature": 0}. Defaults to None.
+            cache_config (Optional[Dict], optional): the config of the cache of the answers, with keys "path", and optionally "max_entries" and "max_size_mb". Defaults to None (no cache).
+            backend (Union[LLMBackend, Dict, None], optional): the backend, or its config (with a class_string). Defaults to None (an OpenAIBackend at base_url).
+            output_format (str, optional): "text" ('Reasoning : ...\nAction: ...' answers) or "json" (structured outputs). Defaults to "text".
+        """
+        assert output_format in [
+            "text",
+            "json",
+        ], f"output_format must be 'text' or 'json', but is {output_format}."
         self.model = model
         self.do_print_answer_assistant = do_print_answer_assistant
-        self.messages: List[Dict[str, str]] = []
+        self.base_url = base_url
+        self.timeout = timeout
+        self.n_max_retries = n_max_retries
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.n_max_invalid_actions = n_max_invalid_actions
+        self.output_format = output_format
+        self.n_invalid_answers = 0  # number of answers with no valid action, i.e. of re-asks
+        self.completion_params = completion_params if completion_params is not None else {}
+        self.start_loop()
+        if backend is None:
+            backend = OpenAIBackend(base_url=base_url)
+        elif isinstance(backend, dict):
+            backend = instantiate_class(**backend)
+        self.backend: LLMBackend = backend
+        self.cache = (
+            CompletionCache.get_cache(**cache_config) if cache_config is not None else None
+        )
+        self.messages: List[Message] = []
+        self.n_messages_pinned = 0  # the messages of the game context, never compacted
+        self.n_tokens_last_request = 0  # estimated
+        if history_policy is None:
+            history_policy = FullHistory()
+        elif isinstance(history_policy, dict):
+            history_policy = instantiate_class(**history_policy)
+        if isinstance(history_policy, SummarizingHistory) and history_policy.summarizer is None:
+            history_policy.summarizer = self.summarize
+        self.history_policy: HistoryPolicy = history_policy
 
     def act(self, observation: Observation, action_space: ActionsSpace) -> Action:
+        future = asyncio.run_coroutine_threadsafe(
+            self.act_in_client_loop(observation, action_space), OpenAI_Agent.loop
+        )
+        return future.result()
+
+    async def act_async(self, observation: Observation, action_space: ActionsSpace) -> Action:
+        # The request runs in the loop of the client, the caller's loop only waits for it (and cancels it if it is cancelled)
+        future = asyncio.run_coroutine_threadsafe(
+            self.act_in_client_loop(observation, action_space), OpenAI_Agent.loop
+        )
+        return await asyncio.wrap_future(future)
+
+    async def act_in_client_loop(self, observation: Observation, action_space: ActionsSpace) -> Action:
         # Add the observation (plus available actions) to the messages
         content = f"{observation}\n\nAction restrictions: {action_space.get_textual_restrictions()}"
+        if self.output_format == "json":
+            content += '\n\nAnswer with a JSON object {"reasoning": <your reasoning>, "action": <your action>}.'
         self.messages.append({"role": "user", "content": content})
+        params_request = self.get_params_request(action_space)
 
-        # Get the assistant's answer
-        answer_assistant = (
-            self.client.chat.completions.create(
-                model=self.model,
-                messages=self.messages,
+        # Compact the conversation. Summarizing is blocking, so it is done in a thread to not block the requests of the other agents
+        if self.history_policy.is_blocking:
+            self.messages = await asyncio.to_thread(
+                self.history_policy.compact, self.messages, self.n_messages_pinned
             )
-            .choices[0]
-            .message.content
-        )
-        if self.do_print_answer_assistant:
-            print(f"ASSISTANT ANSWER: {answer_assistant}")
-        
+        else:
+            self.messages = self.history_policy.compact(self.messages, self.n_messages_pinned)
+
+        # Get the assistant's answer
+        answer_assistant = await self.get_answer_assistant(params_request)
+
         # Add the assistant's answer to the messages
         self.messages.append(
             {"role": "assistant", "content": answer_assistant}
@@ -50,37 +174,111 @@ class OpenAI_Agent(BaseTextAgent):
             return action
 
         # Loop until the assistant provides a valid action
-        for _ in range(10):
+        for _ in range(self.n_max_invalid_actions):
             print(f"Warning : the assistant provided an invalid action.")
+            self.n_invalid_answers += 1
+            if self.output_format == "json":
+                format_answer = 'a JSON object {"reasoning": <your reasoning>, "action": <your action>}'
+            else:
+                format_answer = (
+                    "the following format: 'Reasoning : <your reasoning>\nAction: <your action>'\n\n"
+                    "For example: 'Reasoning : I think that ... and I should vote player 3\nAction: 3'"
+                )
             self.messages.append(
                 {
                     "role": "system",
                     "content": (
-                        f"You chose an invalid action: {action}. "
+                        f"Your answer does not contain a valid action. "
                         f"Please respect these restrictions: {action_space.get_textual_restrictions()} "
-                        "and answer in the following format: 'Reasoning : <your reasoning>\nAction: <your action>'\n\n"
-                        "For example: 'Reasoning : I think that ... and I should vote player 3\nAction: 3'"
+                        f"and answer with {format_answer}"
                     )
                 }
             )
-            answer_assistant = (
-                self.client.chat.completions.create(
-                    model=self.model,
-                    messages=self.messages,
-                )
-                .choices[0]
-                .message.content
-            )
-            if self.do_print_answer_assistant:
-                print(f"ASSISTANT ANSWER: {answer_assistant}")
+            answer_assistant = await self.get_answer_assistant(params_request)
+            self.messages.append({"role": "assistant", "content": answer_assistant})
             action = self.extract_action(answer_assistant, action_space)
             if action is not None:
                 print("Solved : the assistant corrected itself and provided a valid action.")
                 return action
 
-        raise ValueError(f"Assistant provided an invalid action 10 times in a row : \n\n{answer_assistant=}, \n\n{action_space=}, \n\n{self.messages=}")
-            
-            
+        raise ValueError(f"Assistant provided an invalid action {self.n_max_invalid_actions} times in a row : \n\n{answer_assistant=}, \n\n{action_space=}, \n\n{self.messages=}")
+
+    async def get_answer_assistant(self, params_request: Optional[Dict] = None) -> str:
+        """Request the answer of the model to the conversation.
+
+        Args:
+            params_request (Optional[Dict], optional): parameters of the request, added to completion_params. Defaults to None.
+
+        Returns:
+            str: the answer of the model
+        """
+        self.n_tokens_last_request = estimate_n_tokens(self.messages)
+        answer_assistant = await self.request_completion(self.messages, params_request)
+        if self.do_print_answer_assistant:
+            print(f"ASSISTANT ANSWER: {answer_assistant}")
+        return answer_assistant
+
+    async def request_completion(self, messages: List[Message], params_request: Optional[Dict] = None) -> str:
+        """Request the answer of the model to messages, retrying with exponential backoff on transient errors.
+
+        Args:
+            messages (List[Message]): the messages
+            params_request (Optional[Dict], optional): parameters of the request, added to completion_params. Defaults to None.
+
+        Returns:
+            str: the answer of the model
+        """
+        params = {**self.completion_params, **(params_request or {})}
+        if self.cache is not None:
+            key_cache = CompletionCache.get_key(self.model, messages, params)
+            # The cache is a SQLite database, possibly locked by another process : it is accessed in a thread so that the loop isn't blocked
+            answer = await asyncio.to_thread(self.cache.get, key_cache)
+            if answer is not None:
+                return answer
+        for idx_try in range(self.n_max_retries + 1):
+            try:
+                answer = await asyncio.wait_for(
+                    self.backend.complete(self.model, messages, params),
+                    timeout=self.timeout,
+                )
+                break
+            except RETRYABLE_ERRORS as error:
+                if idx_try == self.n_max_retries:
+                    raise
+                delay = min(self.backoff_max, self.backoff_initial * 2**idx_try)
+                delay *= OpenAI_Agent.rng_backoff.uniform(0.5, 1)  # jitter, so that agents rate-limited together don't retry together
+                print(f"Warning : request failed ({type(error).__name__}), retrying in {delay:.1f}s.")
+                await asyncio.sleep(delay)
+        if self.cache is not None and answer is not None:
+            await asyncio.to_thread(self.cache.put, key_cache, answer)
+        return answer
+
+    def summarize(self, messages: List[Message]) -> str:
+        """Ask the model for a summary of messages of the conversation. This is the default summarizer of SummarizingHistory.
+        It blocks until the answer is received, so it must not be called from the event loop of the clients.
+
+        Args:
+            messages (List[Message]): the messages to summarize
+
+        Returns:
+            str: the summary
+        """
+        conversation = "\n\n".join(f"{message['role']}: {message['content']}" for message in messages)
+        messages_summary = [
+            {
+                "role": "system",
+                "content": (
+                    "Summarize the following part of a game you are playing, from your point of view. "
+                    "Keep every fact that may be useful to win the game (roles, claims, votes, deaths...) and be concise."
+                ),
+            },
+            {"role": "user", "content": conversation},
+        ]
+        future = asyncio.run_coroutine_threadsafe(
+            self.request_completion(messages_summary), OpenAI_Agent.loop
+        )
+        return future.result()
+
     def learn(
         self,
         is_playing: bool,
@@ -97,31 +295,86 @@ class OpenAI_Agent(BaseTextAgent):
 
     def set_game_context(self, game_context: str):
         self.messages.append({"role": "system", "content": game_context})
+        self.n_messages_pinned = len(self.messages)
+
+    @staticmethod
+    def start_loop() -> None:
+        """Start the event loop in which the requests of all the agents are run, if it is not started yet."""
+        with OpenAI_Agent.lock_loop:
+            if OpenAI_Agent.loop is None:
+                OpenAI_Agent.loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=OpenAI_Agent.loop.run_forever,
+                    name="OpenAI_Agent loop",
+                    daemon=True,
+                ).start()
 
-    def try_connect(self):
-        if not OpenAI_Agent.is_active:
-            print("Connecting to OpenAI's API...")
-            OpenAI_Agent.client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
-            OpenAI_Agent.is_active = True
-            print("Connected to OpenAI API !")
+    def get_params_request(self, action_space: ActionsSpace) -> Dict:
+        """Return the parameters of the requests for an action in action_space : the JSON schema of the answer if output_format is "json".
+
+        Args:
+            action_space (ActionsSpace): the action space
+
+        Returns:
+            Dict: the parameters, added to completion_params
+        """
+        if self.output_format != "json":
+            return {}
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "answer",
+                    "strict": True,
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "reasoning": {"type": "string"},
+                            "action": action_space.get_json_schema(),
+                        },
+                        "required": ["reasoning", "action"],
+                        "additionalProperties": False,
+                    },
+                },
+            }
+        }
 
     def extract_action(
         self, answer_assistant: str, action_space: ActionsSpace
-    ) -> Action:
+    ) -> Optional[Action]:
         """Extract the action from the assistant's answer.
 
         Args:
             answer_assistant (str): the assistant's answer
             action_space (ActionsSpace): the action space
-            
+
         Returns:
-            Action: the action to play
+            Optional[Action]: the action to play, or None if the answer designates no valid action
         """
-        action_match = re.search(r"Action:\s*(.+)", answer_assistant)
-        if not action_match:
+        if answer_assistant is None:
+            return None
+        if self.output_format == "json":
+            match_json = re.search(r"\{.*\}", answer_assistant, flags=re.DOTALL)
+            try:
+                answer_json = json.loads(match_json.group(0)) if match_json is not None else None
+            except json.JSONDecodeError:
+                answer_json = None
+            if isinstance(answer_json, dict) and "action" in answer_json:
+                return action_space.parse_json(answer_json["action"])
+        # The action is what follows the last "Action:", or the last line if there is none
+        parts = re.split(r"action\s*:", answer_assistant, flags=re.IGNORECASE)
+        if len(parts) > 1:
+            text_action = parts[-1].strip()
+        else:
             print(f"Warning : no action found in the assistant's answer.")
-            return None  # No action found : return None to signal the error
-        action = action_match.group(1) # .strip() ?
-        if not action in action_space:
-            return None  # Action not in action space : return None to signal the error 
-        return action
+            text_action = answer_assistant.strip()
+            text_action = text_action.splitlines()[-1] if text_action != "" else ""
+            if not isinstance(action_space, TextualActionSpace):
+                # Without an explicit action, free text (e.g. "I won't kill 3") is not parsed loosely : only an exact action is accepted, else the agent re-asks
+                for action in (text_action, str_to_literal(text_action)):
+                    if action in action_space:
+                        return action
+                return None
+        if not isinstance(action_space, TextualActionSpace):
+            text_action = text_action.splitlines()[0] if text_action != "" else ""
+        return action_space.parse_text(text_action)
@@ -0,0 +1,304 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import random
+from time import perf_counter
+from typing import Any, List, Optional, Tuple
+
+from boardgames.agents.base_planning_agents import BasePlanningAgent
+from boardgames.agents.random import RandomAgent
+from boardgames.action_spaces import (
+    ActionsSpace,
+    FiniteActionSpace,
+    K_AmongFiniteActionSpace,
+    TextualActionSpace,
+)
+from boardgames.games.base_game import BaseGame
+from boardgames.types import Action, Observation, State
+
+
+# ======================== Rollouts ========================
+
+random_agent = RandomAgent()
+
+
+def get_random_action(action_space: Any) -> Action:
+    """Sample a uniformly random action from an action space (or from a list of actions, as used by SecretHitler)."""
+    if isinstance(action_space, ActionsSpace):
+        return random_agent.act(observation=None, action_space=action_space)
+    return random.choice(action_space)
+
+
+def play_rollout(
+    game: BaseGame,
+    state: State,
+    idx_player: int,
+    action: Action,
+    list_is_playing: List[bool],
+    list_action_spaces: List[Any],
+    max_rollout_steps: int,
+) -> float:
+    """Play the action of the player in the state, then play the game randomly until the end.
+
+    Args:
+        game (BaseGame): the game
+        state (State): the (cloned) state, modified in place
+        idx_player (int): the index of the player evaluating the action
+        action (Action): the action to evaluate
+        list_is_playing (List[bool]): the list of players playing in the state
+        list_action_spaces (List[Any]): the action space of each player in the state
+        max_rollout_steps (int): the maximum number of steps of the rollout
+
+    Returns:
+        float: the sum of the rewards of the player during the rollout
+    """
+    n_players = game.get_n_players()
+    list_actions = [
+        (
+            action
+            if idx == idx_player
+            else (get_random_action(list_action_spaces[idx]) if list_is_playing[idx] else None)
+        )
+        for idx in range(n_players)
+    ]
+    return_player = 0.0
+    for _ in range(max_rollout_steps):
+        rewards, state, list_is_playing, _, list_action_spaces, done, _ = game.step(
+            state, list_actions
+        )
+        return_player += rewards[idx_player]
+        if done:
+            break
+        list_actions = [
+            get_random_action(list_action_spaces[idx]) if list_is_playing[idx] else None
+            for idx in range(n_players)
+        ]
+    return return_player
+
+
+def run_rollouts(
+    game: BaseGame,
+    state: State,
+    idx_player: int,
+    list_candidate_actions: List[Action],
+    list_is_playing: List[bool],
+    list_action_spaces: List[Any],
+    budget_ms: float,
+    max_rollout_steps: int,
+    seed: Optional[int] = None,
+) -> Tuple[List[float], List[int]]:
+    """Evaluate the candidate actions in a round-robin fashion until the time budget is exhausted.
+    Each rollout is played on a new determinization of the state, sampled from the point of view of the player.
+    Each candidate action is evaluated at least once.
+
+    Args:
+        game (BaseGame): the game
+        state (State): the current state, not modified
+        idx_player (int): the index of the player
+        list_candidate_actions (List[Action]): the actions to evaluate
+        list_is_playing (List[bool]): the list of players playing in the state
+        list_action_spaces (List[Any]): the action space of each player in the state
+        budget_ms (float): the time budget, in milliseconds
+        max_rollout_steps (int): the maximum number of steps of a rollout
+        seed (Optional[int], optional): if not None, the random module is seeded with it (used in worker processes). Defaults to None.
+
+    Returns:
+        List[float]: the sum of the returns of each candidate action
+        List[int]: the number of rollouts of each candidate action
+    """
+    if seed is not None:
+        random.seed(seed)
+    n_candidates = len(list_candidate_actions)
+    list_sum_returns = [0.0] * n_candidates
+    list_n_rollouts = [0] * n_candidates
+    time_end = perf_counter() + budget_ms / 1000
+    idx_rollout = 0
+    while idx_rollout < n_candidates or perf_counter() < time_end:
+        idx_candidate = idx_rollout % n_candidates
+        state_simulated = game.sample_determinization(state, idx_player)
+        list_sum_returns[idx_candidate] += play_rollout(
+            game=game,
+            state=state_simulated,
+            idx_player=idx_player,
+            action=list_candidate_actions[idx_candidate],
+            list_is_playing=list_is_playing,
+            list_action_spaces=list_action_spaces,
+            max_rollout_steps=max_rollout_steps,
+        )
+        list_n_rollouts[idx_candidate] += 1
+        idx_rollout += 1
+    return list_sum_returns, list_n_rollouts
+
+
+# Game used by the rollouts of a worker process, set once when the process pool is created
+game_worker: Optional[BaseGame] = None
+
+
+def initialize_worker(game: BaseGame) -> None:
+    global game_worker
+    game_worker = game
+
+
+def run_rollouts_in_worker(*args, **kwargs) -> Tuple[List[float], List[int]]:
+    return run_rollouts(game_worker, *args, **kwargs)
+
+
+# ======================== Agent ========================
+
+
+class DeterminizedRolloutAgent(BasePlanningAgent):
+    """An agent that evaluates each of its candidate actions by averaging the returns of random playouts,
+    each played on a determinization of the current state : a clone of the state where the information hidden to the player
+    is resampled consistently with what the player knows (see BaseGame.sample_determinization).
+
+    The rollouts are played until the time budget is exhausted, so the strength of the agent scales with rollout_budget_ms and n_workers.
+    With n_workers > 1, each worker plays rollouts for all candidate actions with the whole budget and the results are merged
+    (root parallelization). Use the "process" backend for actual parallelism, the "thread" backend being limited by the GIL.
+    Textual actions can't be enumerated, so the agent acts randomly in textual action spaces.
+    """
+
+    def __init__(
+        self,
+        rollout_budget_ms: float = 100,
+        max_rollout_steps: int = 1000,
+        n_max_candidate_actions: int = 20,
+        n_workers: int = 1,
+        parallel_backend: str = "process",
+    ):
+        """Initialize the agent.
+
+        Args:
+            rollout_budget_ms (float, optional): the time budget of an action, in milliseconds. Defaults to 100.
+            max_rollout_steps (int, optional): the maximum number of steps of a rollout. Defaults to 1000.
+            n_max_candidate_actions (int, optional): the maximum number of candidate actions evaluated, for combinatorial action spaces. Defaults to 20.
+            n_workers (int, optional): the number of workers playing rollouts in parallel. Defaults to 1 (rollouts are played in the current thread).
+            parallel_backend (str, optional): "process" or "thread", the kind of pool used if n_workers > 1. Defaults to "process".
+        """
+        assert parallel_backend in [
+            "process",
+            "thread",
+        ], f"parallel_backend must be 'process' or 'thread', but is {parallel_backend}."
+        self.rollout_budget_ms = rollout_budget_ms
+        self.max_rollout_steps = max_rollout_steps
+        self.n_max_candidate_actions = n_max_candidate_actions
+        self.n_workers = n_workers
+        self.parallel_backend = parallel_backend
+        self.game: BaseGame = None
+        self.idx_player: int = None
+        self.executor: Optional[Executor] = None
+        self.state: State = None
+        self.list_is_playing: List[bool] = None
+        self.list_action_spaces: List[Any] = None
+        self.n_rollouts_last_action: int = 0
+
+    def set_game(self, game: BaseGame, idx_player: int) -> None:
+        # The rollouts are played on a copy of the game, so that they don't affect the metrics and the games of the game played
+        self.game = game.get_simulation_game()
+        self.idx_player = idx_player
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.n_workers > 1:
+            if self.parallel_backend == "process":
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.n_workers,
+                    initializer=initialize_worker,
+                    initargs=(self.game,),
+                )
+            else:
+                self.executor = ThreadPoolExecutor(max_workers=self.n_workers)
+
+    def observe_state(
+        self,
+        state: State,
+        list_is_playing: List[bool],
+        list_action_spaces: List[ActionsSpace],
+    ) -> None:
+        self.state = state
+        self.list_is_playing = list_is_playing
+        self.list_action_spaces = list_action_spaces
+
+    def act(self, observation: Observation, action_space: ActionsSpace) -> Action:
+        assert (
+            self.game is not None and self.state is not None
+        ), "The game and the state must be given to the agent with set_game() and observe_state() before acting."
+        list_candidate_actions = self.get_candidate_actions(action_space)
+        if len(list_candidate_actions) == 0:
+            return get_random_action(action_space)
+        if len(list_candidate_actions) == 1:
+            return list_candidate_actions[0]
+
+        # Play the rollouts
+        kwargs_rollouts = dict(
+            state=self.state,
+            idx_player=self.idx_player,
+            list_candidate_actions=list_candidate_actions,
+            list_is_playing=self.list_is_playing,
+            list_action_spaces=self.list_action_spaces,
+            budget_ms=self.rollout_budget_ms,
+            max_rollout_steps=self.max_rollout_steps,
+        )
+        if self.executor is None:
+            list_results = [run_rollouts(self.game, **kwargs_rollouts)]
+        else:
+            if self.parallel_backend == "process":
+                function_rollouts = run_rollouts_in_worker
+            else:
+                function_rollouts = lambda **kwargs: run_rollouts(self.game, **kwargs)
+            futures = [
+                self.executor.submit(
+                    function_rollouts,
+                    **kwargs_rollouts,
+                    seed=(random.getrandbits(32) if self.parallel_backend == "process" else None),
+                )
+                for _ in range(self.n_workers)
+            ]
+            list_results = [future.result() for future in futures]
+
+        # Pick the action with the best average return
+        list_sum_returns = [sum(values) for values in zip(*[r[0] for r in list_results])]
+        list_n_rollouts = [sum(values) for values in zip(*[r[1] for r in list_results])]
+        self.n_rollouts_last_action = sum(list_n_rollouts)
+        list_avg_returns = [
+            sum_returns / n_rollouts
+            for sum_returns, n_rollouts in zip(list_sum_returns, list_n_rollouts)
+        ]
+        idx_best = max(range(len(list_candidate_actions)), key=lambda idx: list_avg_returns[idx])
+        return list_candidate_actions[idx_best]
+
+    def get_candidate_actions(self, action_space: Any) -> List[Action]:
+        """Return the actions to evaluate, or an empty list if they can't be enumerated.
+
+        Args:
+            action_space (Any): the action space of the player
+
+        Returns:
+            List[Action]: the candidate actions
+        """
+        if isinstance(action_space, FiniteActionSpace):
+            return list(action_space.actions)
+        elif isinstance(action_space, K_AmongFiniteActionSpace):
+            list_candidate_actions = []
+            for _ in range(self.n_max_candidate_actions):
+                action = action_space.sample()
+                if action not in list_candidate_actions:
+                    list_candidate_actions.append(action)
+            return list_candidate_actions
+        elif isinstance(action_space, TextualActionSpace):
+            return []
+        elif isinstance(action_space, list):
+            return list(action_space)
+        else:
+            raise NotImplementedError(f"Action space {action_space} not supported.")
+
+    def learn(
+        self,
+        is_playing: bool,
+        action_space: ActionsSpace,
+        observation: Observation,
+        action: Action,
+        reward: float,
+        next_is_playing: bool,
+        next_observation: Observation,
+        next_action_space: ActionsSpace,
+        done: bool,
+    ):
+        pass
@@ -1,9 +1,109 @@
+import atexit
 import os
+import queue
+import threading
 from typing import Dict, List, Optional, Tuple, Union
 import logging
+from logging.handlers import QueueHandler, QueueListener
+
+from boardgames.event_log import EventLog
+
+
+class BatchedFileHandler(logging.FileHandler):
+    """A FileHandler that flushes the file every batch_size records instead of after each record. The file is flushed when closed."""
+
+    def __init__(self, filename: str, batch_size: int) -> None:
+        super().__init__(filename)
+        self.batch_size = batch_size
+        self.n_records_unflushed = 0
+
+    def flush(self) -> None:
+        # Called by emit() after each record
+        self.n_records_unflushed += 1
+        if self.n_records_unflushed >= self.batch_size:
+            self.n_records_unflushed = 0
+            super().flush()
+
+
+class RecordQueueHandler(QueueHandler):
+    """A QueueHandler that enqueues each record unformatted, together with the handlers that will write it (see DispatchingQueueListener),
+    so that the records are formatted by the background thread instead of the game loop.
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, handlers_target: List[logging.Handler]) -> None:
+        super().__init__(log_queue)
+        self.handlers_target = handlers_target
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait((self.handlers_target, record))
+
+
+class DispatchingQueueListener(QueueListener):
+    """A QueueListener whose queue contains (handlers, record) pairs, so that a single background thread writes the records of all the games.
+    A threading.Event instead of a record asks the thread to close the handlers, the event being set once they are closed.
+    """
+
+    def handle(self, item: Tuple[List[logging.Handler], Union[logging.LogRecord, threading.Event]]) -> None:
+        handlers, record = item
+        if isinstance(record, threading.Event):
+            for handler in handlers:
+                handler.close()
+            record.set()
+            return
+        for handler in handlers:
+            handler.handle(record)
+
+
+class AsyncLogWriter:
+    """The background thread writing the log files of all the games logging in "async" mode. There is one per process, started at its first use."""
+
+    listener: Optional[DispatchingQueueListener] = None
+    pid: Optional[int] = None  # the process in which the listener was started (a forked process starts its own)
+    lock = threading.Lock()
+
+    @classmethod
+    def get_queue(cls) -> queue.SimpleQueue:
+        """Return the queue of the background thread, starting it if it is not running in this process."""
+        with cls.lock:
+            if cls.listener is None or cls.pid != os.getpid():
+                cls.listener = DispatchingQueueListener(queue.SimpleQueue())
+                cls.listener.start()
+                cls.pid = os.getpid()
+                atexit.register(cls.stop)
+            return cls.listener.queue
+
+    @classmethod
+    def is_running(cls) -> bool:
+        """Return whether the background thread is running in this process."""
+        return cls.listener is not None and cls.pid == os.getpid()
+
+    @classmethod
+    def stop(cls) -> None:
+        """Write the records remaining in the queue and stop the background thread, if it is running in this process."""
+        with cls.lock:
+            if cls.is_running():
+                cls.listener.stop()
+            cls.listener = None
+            cls.pid = None
 
 
 class CommonObs(list):
+    """The observations of all players, as a list of n_players strings.
+
+    Messages are stored once in an EventLog with the set of players that can see them, so memory is O(messages) instead of O(players x messages).
+    The observation of a player is built from the events since its cursor only when it is actually read (with obs[idx_player]),
+    and resetting the observation of a player only moves its cursor.
+
+    Logging to the log files is configured by config_log["log_mode"] :
+        - "sync" : records are written to the files by the calling thread (default)
+        - "async" : records are put in a queue, unformatted, and formatted and written by a background thread shared by all the games of the process.
+        The files are flushed every config_log["log_batch_size"] records.
+        - "off" : nothing is logged. do_log_messages and do_log_infos are False, so callers guarding their log calls with them don't even format the text.
+    """
+
     def __init__(
         self,
         text: Optional[str] = "",
@@ -12,12 +112,22 @@ class CommonObs(list):
         config_log : Dict[str, Union[str, int]] = {},
     ) -> None:
         self.n_players = n_players
+        self.log_handlers: List[logging.Handler] = []
+        self.logger_handlers_attached: List[logging.Handler] = []
+        self.log_queue: Optional[queue.SimpleQueue] = None  # the queue of the background thread, in async mode
         # Initialize the logger if logging is enabled
-        if list_log_files is not None:
+        log_mode = config_log.get("log_mode", "sync")
+        assert log_mode in [
+            "sync",
+            "async",
+            "off",
+        ], f"log_mode must be 'sync', 'async' or 'off', but is {log_mode}."
+        if list_log_files is not None and log_mode != "off":
             self.do_log_messages = config_log.get("do_log_messages", False)
             self.do_log_infos = config_log.get("do_log_infos", False)
-            self.logger = logging.getLogger("Game Logger")
-            self.logger.setLevel(logging.DEBUG)
+            # Each game has its own logger, not registered in the logging module, so that handlers of previous games are never shared
+            self.logger = logging.Logger("Game Logger", level=logging.DEBUG)
+            self.logger.propagate = False
             assert isinstance(
                 list_log_files, list
             ), "log_files must be a list of strings or None if no logging is desired"
@@ -27,24 +137,36 @@ class CommonObs(list):
                 if os.path.exists(log_file):
                     os.remove(log_file)
                 os.makedirs(os.path.dirname(log_file), exist_ok=True)
-                file_handler = logging.FileHandler(log_file)
+                if log_mode == "async":
+                    file_handler = BatchedFileHandler(log_file, batch_size=config_log.get("log_batch_size", 100))
+                else:
+                    file_handler = logging.FileHandler(log_file)
                 file_handler.setLevel(logging.DEBUG)
                 file_handler.setFormatter(
                     logging.Formatter(config_log.get("log_format", "%(asctime)s - %(message)s\n"))
                 )
-                self.logger.addHandler(file_handler)
+                self.log_handlers.append(file_handler)
+            if log_mode == "async":
+                # The game loop only enqueues the records, the background thread formats and writes them
+                self.log_queue = AsyncLogWriter.get_queue()
+                self.logger_handlers_attached = [RecordQueueHandler(self.log_queue, self.log_handlers)]
+            else:
+                self.logger_handlers_attached = list(self.log_handlers)
+            for handler in self.logger_handlers_attached:
+                self.logger.addHandler(handler)
+            atexit.register(self.close)
         else:
             self.logger = None
             self.do_log_messages = False
             self.do_log_infos = False
-        super().__init__([text for _ in range(n_players)])
+        self.event_log = EventLog(n_players=n_players)
+        if text not in ["", None]:
+            self.event_log.append(text)
+        super().__init__([None] * n_players)
 
     def add_message(self, text: str, idx_player: int, do_log: bool = True):
         """Add a message to the observation of a player."""
-        if self[idx_player] in ["", None]:
-            self[idx_player] = text
-        else:
-            self[idx_player] += f"\n{text}"
+        self.event_log.append(text, frozenset((idx_player,)))
         # Log the message
         if self.do_log_messages and do_log:
             self.logger.info(f"[MESSAGE] Message to player {idx_player} : {text}")
@@ -58,8 +180,7 @@ class CommonObs(list):
     ):
         """Add a message to the observation of specific players."""
         list_idx_player = self.exclude_except(list_idx_player, except_idx)
-        for idx_player in list_idx_player:
-            self.add_message(text, idx_player, do_log=False)
+        self.event_log.append(text, frozenset(list_idx_player))
         # Log the message
         if self.do_log_messages and do_log:
             self.logger.info(f"[MESSAGE] Message specific to {list_idx_player} : {text}")
@@ -68,27 +189,46 @@ class CommonObs(list):
         self, text: str, except_idx: Union[None, int, List[int]] = None, do_log: bool = True
     ):
         """Add a message to the observation of all players (eventually except some)"""
-        except_list = self.exclude_except(list(range(self.n_players)), except_idx)
-        for idx_player in except_list:
-            self.add_message(text, idx_player, do_log=False)
-        # Log the message
-        if self.do_log_messages and do_log:
-            if except_idx is None or (
-                isinstance(except_idx, list) and len(except_idx) == 0
-            ):
+        if except_idx is None or (isinstance(except_idx, list) and len(except_idx) == 0):
+            self.event_log.append(text)
+            # Log the message
+            if self.do_log_messages and do_log:
                 self.logger.info(f"[MESSAGE] Message global : {text}")
-            else:
+        else:
+            except_list = self.exclude_except(list(range(self.n_players)), except_idx)
+            self.event_log.append(text, frozenset(except_list))
+            # Log the message
+            if self.do_log_messages and do_log:
                 self.logger.info(f"[MESSAGE] Message global except {except_list} : {text}")
 
     def reset(self, idx_player: int):
         """Reset to empty the observation of a player."""
-        self[idx_player] = ""
+        self.event_log.reset(idx_player)
 
     def reset_global(self):
         """Reset to empty the observation of all players."""
         for i in range(self.n_players):
             self.reset(i)
 
+    # ==== List interface ====
+    def get_obs(self, idx_player: int) -> str:
+        """Return the observation of a player as a string, i.e. the messages it received since its last reset."""
+        return self.event_log.get_text(idx_player)
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(idx, slice):
+            return [self.get_obs(i) for i in range(self.n_players)[idx]]
+        return self.get_obs(range(self.n_players)[idx])
+
+    def __setitem__(self, idx: int, text: Optional[str]) -> None:
+        self.event_log.reset(idx)
+        if text not in ["", None]:
+            self.event_log.append(text, frozenset((idx,)))
+
+    def __iter__(self):
+        for idx_player in range(self.n_players):
+            yield self.get_obs(idx_player)
+
     # ==== Helper methods ====
     def __repr__(self) -> str:
         list_obs = [f"Player {i} obs: \n{self[i]}" for i in range(self.n_players)]
@@ -108,9 +248,58 @@ class CommonObs(list):
 
     def log(self, text: str, indicator : str = "INFO"):
         """Log a message to the logger if logging is enabled.
+        In hot paths, guard the call with `if common_obs.do_log_infos:` so that the text is not even formatted when logging is disabled.
 
         Args:
             text (str): The message to log.
         """
         if self.do_log_infos:
-            self.logger.info(f"[{indicator}] {text}")
\ No newline at end of file
+            self.logger.info(f"[{indicator}] {text}")
+
+    def clone(self) -> "CommonObs":
+        """Return a copy of the observations that can be modified independently, e.g. for simulating a game in a search agent.
+        The copy does not log anything.
+        """
+        clone = self.__class__.__new__(self.__class__)
+        list.__init__(clone, [None] * self.n_players)
+        clone.__dict__.update(self.__dict__)
+        clone.event_log = self.event_log.clone()
+        clone.log_handlers = []
+        clone.logger_handlers_attached = []
+        clone.log_queue = None
+        clone.logger = None
+        clone.do_log_messages = False
+        clone.do_log_infos = False
+        return clone
+
+    def __getstate__(self) -> Dict[str, object]:
+        # Loggers and file handlers can't be pickled (e.g. to send a state to a worker process), so the logger is dropped
+        return self.clone().__dict__
+
+    def __deepcopy__(self, memo: Dict[int, object]) -> "CommonObs":
+        # Loggers and file handlers can't be deep-copied, so deep copies of the states use clone()
+        clone = self.clone()
+        memo[id(self)] = clone
+        return clone
+
+    def close(self):
+        """Stop logging : write the pending records to the log files and close them. Does nothing if logging is disabled or already closed.
+        This should be called by the game when the game is over.
+        """
+        if self.logger is None:
+            return
+        for handler in self.logger_handlers_attached:
+            self.logger.removeHandler(handler)
+        if self.log_queue is not None and AsyncLogWriter.is_running():
+            # The background thread closes the file handlers once it has written the records of the game remaining in the queue
+            event_closed = threading.Event()
+            self.log_queue.put_nowait((self.log_handlers, event_closed))
+            event_closed.wait()
+        else:
+            for handler in self.log_handlers:
+                handler.close()
+        self.log_queue = None
+        self.logger = None
+        self.do_log_messages = False
+        self.do_log_infos = False
+        atexit.unregister(self.close)
\ No newline at end of file
@@ -0,0 +1,131 @@
+from typing import FrozenSet, List, NamedTuple, Optional
+
+
+class Event(NamedTuple):
+    """An event of the log : a message, visible by a set of players (or by all players if visibility is None)."""
+
+    id_event: int
+    text: str
+    visibility: Optional[FrozenSet[int]]
+
+
+class EventLog:
+    """An append-only store of events shared by all players, with a read cursor per player.
+
+    Each message is stored once, whatever the number of players that can see it.
+    The observation of a player is the text of the events since its cursor that are visible by this player.
+    It is built incrementally : only the events appended since the last read of the player are scanned, and their texts are appended
+    to the list of chunks of the player, which is joined into a string only when read after a change (the joined text is cached).
+    Moving the cursor of a player (reset) is O(1). Events that are behind the cursors of all players are dropped from time to time.
+    """
+
+    n_events_min_before_compaction: int = 1024
+
+    def __init__(self, n_players: int) -> None:
+        self.n_players = n_players
+        self.events: List[Event] = []
+        self.id_first_event: int = 0  # id of self.events[0], increased when the log is compacted
+        self.n_events_before_compaction = self.n_events_min_before_compaction
+        # Per player read state
+        self.cursors: List[int] = [0] * n_players
+        self.ids_next_event_to_scan: List[int] = [0] * n_players
+        self.chunks: List[List[str]] = [[] for _ in range(n_players)]  # the texts of the events visible since the cursor
+        self.texts: List[Optional[str]] = [""] * n_players  # the joined chunks, or None if they changed since the last join
+
+    def append(self, text: str, visibility: Optional[FrozenSet[int]] = None) -> int:
+        """Append an event to the log.
+
+        Args:
+            text (str): the text of the event
+            visibility (Optional[FrozenSet[int]], optional): the players that can see the event, or None for all players. Defaults to None.
+
+        Returns:
+            int: the id of the event
+        """
+        id_event = self.get_id_next_event()
+        self.events.append(Event(id_event, text, visibility))
+        if len(self.events) >= self.n_events_before_compaction:
+            self.compact()
+        return id_event
+
+    def reset(self, idx_player: int) -> None:
+        """Move the cursor of a player to the end of the log, so that its observation becomes empty.
+
+        Args:
+            idx_player (int): the player
+        """
+        id_next_event = self.get_id_next_event()
+        self.cursors[idx_player] = id_next_event
+        self.ids_next_event_to_scan[idx_player] = id_next_event
+        self.chunks[idx_player] = []
+        self.texts[idx_player] = ""
+
+    def get_text(self, idx_player: int) -> str:
+        """Return the text of the events visible by a player since its cursor, separated by new lines.
+
+        Args:
+            idx_player (int): the player
+
+        Returns:
+            str: the observation of the player
+        """
+        id_next_event = self.get_id_next_event()
+        id_next_event_to_scan = self.ids_next_event_to_scan[idx_player]
+        if id_next_event_to_scan < id_next_event:
+            n_chunks = len(self.chunks[idx_player])
+            self.chunks[idx_player].extend(
+                event.text
+                for event in self.events[id_next_event_to_scan - self.id_first_event :]
+                if event.visibility is None or idx_player in event.visibility
+            )
+            if len(self.chunks[idx_player]) > n_chunks:
+                self.texts[idx_player] = None
+            self.ids_next_event_to_scan[idx_player] = id_next_event
+        if self.texts[idx_player] is None:
+            self.texts[idx_player] = "\n".join(self.chunks[idx_player])
+        return self.texts[idx_player]
+
+    def get_events_since_cursor(self, idx_player: int) -> List[Event]:
+        """Return the events visible by a player since its cursor.
+
+        Args:
+            idx_player (int): the player
+
+        Returns:
+            List[Event]: the events visible by the player
+        """
+        return [
+            event
+            for event in self.events[self.cursors[idx_player] - self.id_first_event :]
+            if event.visibility is None or idx_player in event.visibility
+        ]
+
+    def compact(self) -> None:
+        """Drop the events that are behind the cursors of all players, as no observation can include them anymore."""
+        id_min_cursor = min(self.cursors)
+        if id_min_cursor > self.id_first_event:
+            del self.events[: id_min_cursor - self.id_first_event]
+            self.id_first_event = id_min_cursor
+        self.n_events_before_compaction = max(
+            self.n_events_min_before_compaction, 2 * len(self.events)
+        )
+
+    def clone(self) -> "EventLog":
+        """Return a copy of the log that can be appended to and read independently. Events themselves are immutable and shared."""
+        clone = EventLog.__new__(EventLog)
+        clone.n_players = self.n_players
+        clone.events = list(self.events)
+        clone.id_first_event = self.id_first_event
+        clone.n_events_before_compaction = self.n_events_before_compaction
+        clone.cursors = list(self.cursors)
+        clone.ids_next_event_to_scan = list(self.ids_next_event_to_scan)
+        clone.chunks = [list(chunks) for chunks in self.chunks]
+        clone.texts = list(self.texts)
+        return clone
+
+    def get_id_next_event(self) -> int:
+        """Return the id the next appended event will have."""
+        return self.id_first_event + len(self.events)
+
+    def __len__(self) -> int:
+        return len(self.events)
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from copy import copy, deepcopy
 from typing import Any, Dict, List, Tuple, Union
 import numpy as np
 from boardgames.types import Observation, Action, State, AgentID
@@ -67,6 +68,106 @@ class BaseGame(ABC):
         """
         pass
 
+    def get_players_factions(self, state: State) -> List[str]:
+        """Return the name of the faction (team, role...) of each player, used to aggregate statistics over many games.
+        By default, each player is its own faction.
+
+        Args:
+            state (State): the current state of the game
+
+        Returns:
+            List[str]: the faction of each player
+        """
+        return [f"Player {i}" for i in range(self.get_n_players())]
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Return the metrics of the game engine accumulated over the games played, for logging. By default, there are none.
+
+        Returns:
+            Dict[str, float]: a dictionnary mapping metric names to values
+        """
+        return {}
+
+    # ======================== State cloning ========================
+
+    def clone_state(self, state: State) -> State:
+        """Return an independent copy of the state, that can be stepped without modifying the original state (e.g. by search agents).
+        The copy does not log anything.
+        By default, the state is deep-copied. Games should override this with a copy of their mutable game data only.
+
+        Args:
+            state (State): the state to copy
+
+        Returns:
+            State: the copy of the state
+        """
+        return deepcopy(state)
+
+    def sample_determinization(self, state: State, idx_player: int) -> State:
+        """Return a copy of the state in which the information hidden to a player (e.g. roles of the other players, order of the deck)
+        is resampled consistently with what this player knows. This is used by search agents to simulate the game without cheating.
+        By default, nothing is resampled (the game is considered as a perfect information game).
+
+        Args:
+            state (State): the current state of the game
+            idx_player (int): the player from whose point of view the state is resampled
+
+        Returns:
+            State: the determinized copy of the state
+        """
+        return self.clone_state(state)
+
+    def get_simulation_game(self) -> "BaseGame":
+        """Return a copy of the game to simulate games with (e.g. the rollouts of a search agent), so that simulated steps
+        have no side effect on this game object (metrics, management of the games played...).
+        By default, the game is shallow-copied. Games whose step() has such side effects should override this to disable them in the copy.
+
+        Returns:
+            BaseGame: the game to simulate games with
+        """
+        return copy(self)
+
+    def snapshot(self, state: State) -> State:
+        """Save a state, so that it can be restored later with restore() even if the state is stepped in the meantime.
+
+        Args:
+            state (State): the state to save
+
+        Returns:
+            State: the snapshot of the state
+        """
+        return self.clone_state(state)
+
+    def restore(self, snapshot: State) -> State:
+        """Return a new state equal to the state saved with snapshot(). A snapshot can be restored several times.
+
+        Args:
+            snapshot (State): the snapshot, as returned by snapshot()
+
+        Returns:
+            State: the restored state
+        """
+        return self.clone_state(snapshot)
+
     # ======================== Helper functions ========================
 
-    
+    def empty_list_except(
+        self, idx: Union[int, List[int]], value: Any, fill: Any = None
+    ) -> List[Any]:
+        """Create a list of size n_players with all elements set to fill except the one at idx set to value.
+
+        Args:
+            idx (Union[int, List[int]]): the index or list of indices to set to
+            value (Any): the value to set at index idx
+            fill (Any, optional): the fill value. Defaults to None.
+
+        Returns:
+            List[Any]: the list of n_players elements
+        """
+        if isinstance(idx, int):
+            idx = [idx]
+        list = [fill for _ in range(self.n_players)]
+        for i in idx:
+            list[i] = value
+        return list
+
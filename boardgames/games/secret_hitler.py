@@ -2,8 +2,10 @@ from boardgames.games.base_game import BaseGame
 from boardgames.types import Action, AgentID, Observation, State
 from typing import Any, List, Optional, Tuple, Union, Dict
 from boardgames.action_spaces import ActionsSpace
+from boardgames.common_obs import CommonObs
 
 import random
+from copy import copy
 
 
 CARD_LIBERAL = "Liberal Card"
@@ -20,28 +22,9 @@ POWER_BULLET_SHOT = "Bullet Shot"
 POWER_FASCIST_WIN = "Fascist Win"
 
 
-class CommonObservationsSH(list):
+class CommonObservationsSH(CommonObs):
     def __init__(self, text: Optional[str] = "", n_players: int = 5) -> None:
-        self.n_players = n_players
-        super().__init__([text for _ in range(n_players)])
-
-    def add_message(self, text: str, idx_player: int):
-        if self[idx_player] in ["", None]:
-            self[idx_player] = text
-        else:
-            self[idx_player] += f"\n{text}"
-
-    def add_global_message(self, text: str, except_idx: Optional[int] = None):
-        for i in range(self.n_players):
-            if i != except_idx:
-                self.add_message(text, i)
-
-    def reset(self, idx_player: int):
-        self[idx_player] = ""
-
-    def reset_global(self):
-        for i in range(self.n_players):
-            self.reset(i)
+        super().__init__(text=text, n_players=n_players)
 
     def __repr__(self) -> str:
         list_obs = [f"Player {i}: \n{self[i]}" for i in range(self.n_players)]
@@ -259,6 +242,20 @@ class StateSH(State):
         list_actions[self.idx_player_playing] = self.actions_available
         return list_actions
 
+    def clone(self) -> "StateSH":
+        """Return a copy of the state that can be stepped independently.
+        Only the mutable game data (deck, discard, alive players, votes...) is copied, the rest is shared with the original state.
+        """
+        clone = copy(self)
+        clone.policy_deck = list(self.policy_deck)
+        clone.policy_discard = list(self.policy_discard)
+        clone.is_alive = list(self.is_alive)
+        clone.votes = list(self.votes)
+        if self.cards_drawn is not None:
+            clone.cards_drawn = list(self.cards_drawn)
+        clone.common_obs = self.common_obs.clone()
+        return clone
+
 
 class SecretHitlerGame(BaseGame):
 
@@ -633,6 +630,34 @@ class SecretHitlerGame(BaseGame):
     def get_list_actions_available(self, state: StateSH) -> List[List[Action]]:
         return state.get_actions_available()
 
+    def clone_state(self, state: StateSH) -> StateSH:
+        return state.clone()
+
+    def sample_determinization(self, state: StateSH, idx_player: int) -> StateSH:
+        """Reshuffle the policy deck, and if the player is liberal, the roles of the other alive players (fascists know all roles)."""
+        state = state.clone()
+        if state.roles[idx_player] == ROLE_LIBERAL:
+            list_idx_others = [
+                i for i in range(self.n_players) if i != idx_player and state.is_alive[i]
+            ]
+            roles_others = [state.roles[i] for i in list_idx_others]
+            random.shuffle(roles_others)
+            state.roles = list(state.roles)
+            for i, role in zip(list_idx_others, roles_others):
+                state.roles[i] = role
+            state.id_hitler = state.roles.index(ROLE_HITLER)
+            state.ids_fascists = [
+                i for i, role in enumerate(state.roles) if role == ROLE_FASCIST
+            ]
+            state.ids_liberals = [
+                i for i, role in enumerate(state.roles) if role == ROLE_LIBERAL
+            ]
+        random.shuffle(state.policy_deck)
+        return state
+
+    def get_players_factions(self, state: StateSH) -> List[str]:
+        return list(state.roles)
+
     def render(self, state: StateSH) -> None:
         if self.config["print_common_obs"]:
             print(state.common_obs)
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
+from copy import copy
 from enum import Enum
 import random
 from typing import Dict, List, Optional, Tuple, Union
 import numpy as np
-from boardgames.action_spaces import FiniteActionSpace
+from boardgames.action_spaces import FiniteActionSpace, get_actions_player_ids
 from boardgames.games.base_game import BaseGame
 from boardgames.games.base_text_game import BaseTextBasedGame
 from boardgames.types import Observation, Action, State, AgentID
@@ -102,6 +103,25 @@ class StateTimesBomb(State):
         self.hands: List[List[CardTimesBomb]] = None
         self.hands_revealed: List[List[CardTimesBomb]] = None
 
+    def clone(self) -> "StateTimesBomb":
+        """Return a copy of the state that can be stepped independently.
+        Only the mutable game data (deck, hands, announcements...) is copied, the rest is shared with the original state.
+        """
+        clone = copy(self)
+        clone.roles = list(self.roles)
+        clone.deck = list(self.deck)
+        clone.cards_revealed = list(self.cards_revealed)
+        if self.hands is not None:
+            clone.hands = [list(hand) for hand in self.hands]
+            clone.hands_revealed = [list(hand) for hand in self.hands_revealed]
+        if self.list_is_playing_defusers is not None:
+            clone.list_is_playing_defusers = list(self.list_is_playing_defusers)
+        if hasattr(self, "announcement"):
+            clone.announcement = list(self.announcement)
+        if hasattr(self, "common_obs"):
+            clone.common_obs = self.common_obs.clone()
+        return clone
+
     def reset(self) -> Tuple[
         State,
         List[bool],
@@ -157,6 +177,7 @@ class StateTimesBomb(State):
         Dict,
     ]:
         self.game_phase = PhaseTimesBomb.CUT
+        ids_players_as_str = get_actions_player_ids(self.n_players)
         action_available_for_cutter = []
         for idx_player in range(self.n_players):
             if idx_player == self.player_cutter:  # The cutter cannot cut his own wire
@@ -170,9 +191,9 @@ class StateTimesBomb(State):
                 len(self.hands[idx_player]) == 0
             ):  # The cutter cannot cut the wire of a player with no cards
                 continue
-            action_available_for_cutter.append(str(idx_player))
+            action_available_for_cutter.append(ids_players_as_str[idx_player])
         action_spaces_for_cutter = FiniteActionSpace(
-            actions=action_available_for_cutter
+            actions=action_available_for_cutter, all_actions=ids_players_as_str
         )
         list_action_spaces = self.game.empty_list_except(
             self.player_cutter, action_spaces_for_cutter
@@ -499,6 +520,29 @@ Good luck!
         """
         return self.n_players
 
+    def get_players_factions(self, state: StateTimesBomb) -> List[str]:
+        return [role.value for role in state.roles]
+
+    def clone_state(self, state: StateTimesBomb) -> StateTimesBomb:
+        return state.clone()
+
+    def sample_determinization(self, state: StateTimesBomb, idx_player: int) -> StateTimesBomb:
+        """Resample the roles of the other players and the cards in their hands (the player only knows its own role and hand)."""
+        state = state.clone()
+        list_idx_others = [i for i in range(self.n_players) if i != idx_player]
+        roles_others = [state.roles[i] for i in list_idx_others]
+        random.shuffle(roles_others)
+        for i, role in zip(list_idx_others, roles_others):
+            state.roles[i] = role
+        if state.hands is not None:
+            cards_hidden = [card for i in list_idx_others for card in state.hands[i]]
+            random.shuffle(cards_hidden)
+            for i in list_idx_others:
+                n_cards = len(state.hands[i])
+                state.hands[i] = cards_hidden[:n_cards]
+                del cards_hidden[:n_cards]
+        return state
+
     def render(self, state: StateTimesBomb) -> None:
         """Render the current state of the game.
 
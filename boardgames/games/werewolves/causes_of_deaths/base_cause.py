@@ -1,10 +1,34 @@
 from abc import ABC, abstractmethod
+from copy import deepcopy
 from enum import Enum
+from typing import Dict, Type
 
 from boardgames.types import State
 
 
+# The unique instance of each class of cause of death
+DICT_CAUSE_CLASS_TO_INSTANCE: Dict[Type["CauseOfDeath"], "CauseOfDeath"] = {}
+
+
 class CauseOfDeath(ABC):
+    """A cause of death. Causes of death that don't define __init__ are stateless : they are interned,
+    i.e. CauseWolfAttack() always returns the same instance, so that creating one to attack or compare doesn't allocate.
+    """
+
+    is_interned: bool = False
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.is_interned = cls.__init__ is object.__init__
+
+    def __new__(cls, *args, **kwargs) -> "CauseOfDeath":
+        if not cls.is_interned:
+            return super().__new__(cls)
+        instance = DICT_CAUSE_CLASS_TO_INSTANCE.get(cls)
+        if instance is None:
+            instance = super().__new__(cls)
+            DICT_CAUSE_CLASS_TO_INSTANCE[cls] = instance
+        return instance
 
     # ==== Interface methods to implement ====
     
@@ -78,11 +102,21 @@ class CauseOfDeath(ABC):
         """By default, two causes of death are equal if they have the same name.
         This method can be overriden if needed.
         """
-        return self.get_name() == other.get_name()
+        return self is other or self.get_name() == other.get_name()
     
     def __hash__(self) -> int:
         return hash(self.get_name())
 
+    def __deepcopy__(self, memo: Dict[int, object]) -> "CauseOfDeath":
+        """Interned causes of death are shared by all states, so copying a state doesn't copy them."""
+        if type(self).is_interned:
+            return self
+        clone = type(self).__new__(type(self))
+        memo[id(self)] = clone
+        for key, value in self.__dict__.items():
+            setattr(clone, key, deepcopy(value, memo))
+        return clone
+
     
 
 
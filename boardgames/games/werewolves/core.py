@@ -0,0 +1,233 @@
+from bisect import insort
+from typing import Dict, List
+
+import numpy as np
+
+from boardgames.games.werewolves.causes_of_deaths.base_cause import CauseOfDeath
+from boardgames.games.werewolves.factions import FactionsWW, DICT_FACTION_TO_ID
+
+
+# Registry of the causes of death : each cause (identified by its name) gets the index of its column in the attack matrix.
+# Causes of death are stateless, so the first instance registered is kept and returned for the whole process.
+DICT_NAME_CAUSE_TO_ID: Dict[str, int] = {}
+LIST_CAUSES_REGISTERED: List[CauseOfDeath] = []
+
+
+def get_id_cause(cause: CauseOfDeath) -> int:
+    """Return the id of a cause of death, registering it at its first use.
+
+    Args:
+        cause (CauseOfDeath): the cause of death
+
+    Returns:
+        int: the id of the cause, i.e. its column in the attack matrix
+    """
+    name = cause.get_name()
+    id_cause = DICT_NAME_CAUSE_TO_ID.get(name)
+    if id_cause is None:
+        id_cause = len(LIST_CAUSES_REGISTERED)
+        DICT_NAME_CAUSE_TO_ID[name] = id_cause
+        LIST_CAUSES_REGISTERED.append(cause)
+    return id_cause
+
+
+def get_cause(id_cause: int) -> CauseOfDeath:
+    """Return the (registered instance of the) cause of death of an id.
+
+    Args:
+        id_cause (int): the id of the cause
+
+    Returns:
+        CauseOfDeath: the cause of death
+    """
+    return LIST_CAUSES_REGISTERED[id_cause]
+
+
+class CoreWW:
+    """The array-backed core of the state of a Werewolves game : the per-player data that phases, roles and victory checks query the most,
+    as NumPy arrays, so that these queries are integer operations instead of loops over objects.
+    It contains :
+        - are_alive (np.ndarray of bool, shape (n_players,)) : whether each player is alive
+        - id_factions (np.ndarray of int8, shape (n_players,)) : the faction of each player, as its id in DICT_FACTION_TO_ID (lower ids have priority)
+        - night_attacks (np.ndarray of bool, shape (n_players, n_causes)) : whether each player is attacked this night by each cause of death,
+        the columns being the ids given by get_id_cause
+    as well as indexes maintained incrementally, so that the queries done at each step don't scan all players :
+        - list_ids_alive (List[int]) : the ids of the players alive, in increasing order
+        - n_alive_by_faction (List[int]) : the number of players alive of each faction, indexed by faction id
+        - n_factions_alive (int) : the number of factions having at least one player alive
+        - list_ids_wolves_alive (List[int]) : the ids of the wolves (players with the wolf status) alive, in increasing order
+
+    StateWW and Identity keep it up to date : roles read it, but should change the state through StateWW and Identity methods,
+    except for the night attacks that they add and remove with add_attack and remove_attack.
+    The alive players, factions and wolves are only changed by kill, set_faction, add_wolf and remove_wolf.
+    """
+
+    def __init__(self, n_players: int, factions: List[FactionsWW]) -> None:
+        """Initialize the core with all players alive.
+
+        Args:
+            n_players (int): the number of players
+            factions (List[FactionsWW]): the initial faction of each player
+        """
+        self.n_players = n_players
+        self.are_alive = np.ones(n_players, dtype=bool)
+        self.id_factions = np.array(
+            [DICT_FACTION_TO_ID[faction] for faction in factions], dtype=np.int8
+        )
+        self.night_attacks = np.zeros(
+            (n_players, max(len(LIST_CAUSES_REGISTERED), 4)), dtype=bool
+        )
+        self.list_ids_alive: List[int] = list(range(n_players))
+        self.n_alive_by_faction: List[int] = [0] * len(DICT_FACTION_TO_ID)
+        for id_faction in self.id_factions.tolist():
+            self.n_alive_by_faction[id_faction] += 1
+        self.n_factions_alive = sum(n_alive > 0 for n_alive in self.n_alive_by_faction)
+        self.list_ids_wolves_alive: List[int] = []
+
+    # ===== Players and factions =====
+
+    def get_ids_alive(self) -> List[int]:
+        """Return the ids of the players alive, in increasing order."""
+        return self.list_ids_alive.copy()
+
+    def get_ids_wolves_alive(self) -> List[int]:
+        """Return the ids of the wolves alive, in increasing order."""
+        return self.list_ids_wolves_alive.copy()
+
+    def get_ids_factions_alive(self) -> List[int]:
+        """Return the ids of the factions having at least one player alive, in increasing order (i.e. by priority)."""
+        return [
+            id_faction
+            for id_faction, n_alive in enumerate(self.n_alive_by_faction)
+            if n_alive > 0
+        ]
+
+    def get_n_factions_alive(self) -> int:
+        """Return the number of factions having at least one player alive."""
+        return self.n_factions_alive
+
+    def kill(self, id_player: int) -> None:
+        """Mark a player as dead, and remove it from the indexes of alive players.
+
+        Args:
+            id_player (int): the id of the player, who must be alive
+        """
+        assert self.are_alive[id_player], f"Player {id_player} is already dead."
+        self.are_alive[id_player] = False
+        self.list_ids_alive.remove(id_player)
+        if id_player in self.list_ids_wolves_alive:
+            self.list_ids_wolves_alive.remove(id_player)
+        self.change_n_alive_of_faction(int(self.id_factions[id_player]), -1)
+
+    def set_faction(self, id_player: int, id_faction: int) -> None:
+        """Change the faction of a player.
+
+        Args:
+            id_player (int): the id of the player
+            id_faction (int): the id of its new faction
+        """
+        id_faction_previous = int(self.id_factions[id_player])
+        if id_faction == id_faction_previous:
+            return
+        self.id_factions[id_player] = id_faction
+        if self.are_alive[id_player]:
+            self.change_n_alive_of_faction(id_faction_previous, -1)
+            self.change_n_alive_of_faction(id_faction, 1)
+
+    def add_wolf(self, id_player: int) -> None:
+        """Register a player alive as a wolf, if it isn't already.
+
+        Args:
+            id_player (int): the id of the player
+        """
+        if self.are_alive[id_player] and id_player not in self.list_ids_wolves_alive:
+            insort(self.list_ids_wolves_alive, id_player)
+
+    def remove_wolf(self, id_player: int) -> None:
+        """Unregister a player as a wolf, if it is registered (e.g. when the roles are reshuffled in a determinization of the state).
+
+        Args:
+            id_player (int): the id of the player
+        """
+        if id_player in self.list_ids_wolves_alive:
+            self.list_ids_wolves_alive.remove(id_player)
+
+    def change_n_alive_of_faction(self, id_faction: int, delta: int) -> None:
+        n_alive_previous = self.n_alive_by_faction[id_faction]
+        self.n_alive_by_faction[id_faction] = n_alive_previous + delta
+        if n_alive_previous == 0:
+            self.n_factions_alive += 1
+        elif n_alive_previous + delta == 0:
+            self.n_factions_alive -= 1
+
+    # ===== Votes =====
+
+    def count_votes(self, votes: List[int]) -> np.ndarray:
+        """Count the votes of the players.
+
+        Args:
+            votes (List[int]): the id of the target of each player, or -1 if the player did not vote
+
+        Returns:
+            np.ndarray: the number of votes against each player, of shape (n_players,)
+        """
+        votes = np.asarray(votes, dtype=np.int64)
+        return np.bincount(votes[votes >= 0], minlength=self.n_players)
+
+    def get_ids_most_voted(self, votes: List[int]) -> List[int]:
+        """Return the players having the most votes against them (several in case of a draw), or an empty list if no one voted.
+
+        Args:
+            votes (List[int]): the id of the target of each player, or -1 if the player did not vote
+
+        Returns:
+            List[int]: the ids of the most voted players, in increasing order
+        """
+        vote_count = self.count_votes(votes)
+        count_max = vote_count.max()
+        if count_max == 0:
+            return []
+        return np.flatnonzero(vote_count == count_max).tolist()
+
+    # ===== Night attacks =====
+
+    def add_attack(self, id_player: int, cause: CauseOfDeath) -> None:
+        """Register an attack of a cause of death against a player for this night."""
+        id_cause = get_id_cause(cause)
+        if id_cause >= self.night_attacks.shape[1]:
+            # A cause registered after the creation of the core, add columns
+            n_causes = max(len(LIST_CAUSES_REGISTERED), 2 * self.night_attacks.shape[1])
+            night_attacks = np.zeros((self.n_players, n_causes), dtype=bool)
+            night_attacks[:, : self.night_attacks.shape[1]] = self.night_attacks
+            self.night_attacks = night_attacks
+        self.night_attacks[id_player, id_cause] = True
+
+    def remove_attack(self, id_player: int, cause: CauseOfDeath) -> None:
+        """Remove the attack of a cause of death against a player, if any."""
+        id_cause = get_id_cause(cause)
+        if id_cause < self.night_attacks.shape[1]:
+            self.night_attacks[id_player, id_cause] = False
+
+    def is_attacked_by(self, id_player: int, cause: CauseOfDeath) -> bool:
+        """Return whether a player is attacked this night by a cause of death."""
+        id_cause = get_id_cause(cause)
+        return id_cause < self.night_attacks.shape[1] and bool(
+            self.night_attacks[id_player, id_cause]
+        )
+
+    def get_causes_attacks(self, id_player: int) -> List[CauseOfDeath]:
+        """Return the causes of death attacking a player this night."""
+        return [get_cause(id_cause) for id_cause in np.flatnonzero(self.night_attacks[id_player])]
+
+    def get_ids_attacked(self, cause: CauseOfDeath = None) -> List[int]:
+        """Return the players attacked this night by a cause of death, or by any cause if cause is None, in increasing order."""
+        if cause is None:
+            return np.flatnonzero(self.night_attacks.any(axis=1)).tolist()
+        id_cause = get_id_cause(cause)
+        if id_cause >= self.night_attacks.shape[1]:
+            return []
+        return np.flatnonzero(self.night_attacks[:, id_cause]).tolist()
+
+    def reset_attacks(self) -> None:
+        """Remove all the night attacks."""
+        self.night_attacks[:] = False
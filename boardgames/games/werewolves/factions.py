@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import List
+from typing import Dict, List
 
 
 class FactionsWW(Enum):
@@ -38,4 +38,9 @@ LIST_FACTIONS_BY_PRIORITY: List[FactionsWW] = [
     FactionsWW.MERCENARY,
     FactionsWW.ANGEL,
     FactionsWW.THIEF,
-]
\ No newline at end of file
+]
+
+# The id of a faction is its index in LIST_FACTIONS_BY_PRIORITY, so that a lower id means a higher priority
+DICT_FACTION_TO_ID: Dict[FactionsWW, int] = {
+    faction: id_faction for id_faction, faction in enumerate(LIST_FACTIONS_BY_PRIORITY)
+}
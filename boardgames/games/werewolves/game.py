@@ -1,15 +1,16 @@
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from copy import deepcopy
+from copy import copy, deepcopy
 from dataclasses import dataclass
 from enum import Enum
 import random
 from typing import Dict, List, Optional, Set, Tuple, Type, Union
 import numpy as np
+from boardgames.common_obs import CommonObs
 from boardgames.games.base_game import BaseGame
 from boardgames.games.base_text_game import BaseTextBasedGame
 from boardgames.games.werewolves.factions import FactionsWW
-from boardgames.games.werewolves.phase.base_phase import Phase
+from boardgames.games.werewolves.phase.base_phase import Phase, SKIP_PHASE
 from boardgames.types import (
     State,
     Observation,
@@ -32,7 +33,8 @@ from boardgames.action_spaces import (
     TextualActionSpace,
 )
 from boardgames.utils import str_to_literal
-from .state import StateWW
+from boardgames.time_measure import RuntimeMeter, NullRuntimeMeter, NULL_RUNTIME_METER
+from .state import StateWW, StatusIsWolf
 from .statutes.base_status import Status
 from .phase.base_phase import Phase
 from .identity import Identity
@@ -52,6 +54,12 @@ class WerewolvesGame(BaseTextBasedGame):
         self.n_players = n_players
         self.compo = compo
         self.config = kwargs
+        self.role_name_to_id_role: Dict[str, int] = {
+            role_name: id_role for id_role, role_name in enumerate(ROLES_CLASSES_WW)
+        }
+        self.common_obs_last_game: Optional[CommonObs] = None
+        self.n_skips_by_phase: Dict[str, int] = defaultdict(int)  # how many times each phase was skipped, over all the games played
+        self.is_simulation = False  # whether the game is a copy used to simulate games, see get_simulation_game
 
     def get_game_context(self) -> str:
         compo_listing = "See later"
@@ -160,19 +168,27 @@ Good luck!
                 list_roles[0],
             )
 
+        # Close the log files of the previous game, if it was not played until the end
+        if self.common_obs_last_game is not None:
+            self.common_obs_last_game.close()
+
         state = StateWW(
             n_players=self.n_players,
             list_roles=list_roles,
             identities=identities,
             compo=self.compo,
+            role_name_to_id_role=self.role_name_to_id_role,
             **self.config,
         )
-        state.common_obs.log(f"Roles : {list_roles}\n")
-        state.common_obs.log(f"Phases : {state.phase_manager}\n")
-        state.common_obs.log(f"Identities : {identities}\n")
+        self.common_obs_last_game = state.common_obs
+        if state.common_obs.do_log_infos:
+            state.common_obs.log(f"Roles : {list_roles}\n")
+            state.common_obs.log(f"Phases : {state.phase_manager}\n")
+            state.common_obs.log(f"Identities : {identities}\n")
 
         # Get initial compo listing
-        self.initial_compo_listing = state.get_compo_listing()
+        if state.do_text_obs:
+            self.initial_compo_listing = state.get_compo_listing()
 
         # Initialize role specific variables
         for identity in identities:
@@ -183,7 +199,8 @@ Good luck!
 
         # Get the returns of first state and extract the relevant information for reset() formalism
         phase = state.phase_manager.get_current_phase()
-        feedback = phase.return_feedback(state)
+        with self.measure_phase("return_feedback", phase):
+            feedback = phase.return_feedback(state)
         (
             rewards,  # should be vec(0) at reset
             list_is_playing,
@@ -210,34 +227,13 @@ Good luck!
                 state.common_obs.reset(idx_player=id_player)
 
         # Play the actions of the players which influence the state of the game
-        idx_begin_step = deepcopy(state.phase_manager.idx_current_phase)
+        idx_begin_step = state.phase_manager.get_current_position()
         self.step_play_action(state, joint_action)
-        idx_end_step = state.phase_manager.idx_current_phase
+        idx_end_step = state.phase_manager.get_current_position()
 
-        feedback = None
-        while feedback is None:
-            
-            # Check if the game is over, and if so, return the rewards
-            feedback_eventual_victory = state.get_feedback_eventual_victory()
-            if feedback_eventual_victory is not None:
-                feedback = feedback_eventual_victory
+        # Play the phases until one of them returns a feedback (or the game is over)
+        feedback = self.dispatch_phases(state, is_same_phase=idx_begin_step == idx_end_step)
 
-            # Else, play the next phase
-            else:
-                # Change the subphase index
-                if idx_begin_step == idx_end_step:
-                    state.idx_subphase += 1
-                else:
-                    state.idx_subphase = 0
-
-                # Get the feedback of the current phase
-                phase = state.phase_manager.get_current_phase()
-                feedback = phase.return_feedback(state)
-                assert(feedback is None or len(feedback) == 6), f"Feedback should have 6 elements, but has {len(feedback)} elements."
-                # If feedback is None, unsure the phase is advanced
-                if feedback is None:
-                    assert state.phase_manager.get_current_phase() != phase, f"If feedback is None, the phase should have been advanced during the return_feedback method, but it was not. Phase : {phase.get_name()}"                    
-        
         # Get the returns of current state and return it as well as the updated state
         (
             rewards,
@@ -247,6 +243,10 @@ Good luck!
             done,
             info,
         ) = feedback
+        # Close the log files of the game once it is over
+        if done and not self.is_simulation:
+            state.common_obs.close()
+            self.common_obs_last_game = None
 
         return (
             rewards,
@@ -258,6 +258,86 @@ Good luck!
             info,
         )
 
+    def dispatch_phases(self, state: StateWW, is_same_phase: bool) -> Tuple[
+        JointReward,
+        JointPlayingInformation,
+        JointObservation,
+        JointActionSpace,
+        TerminalSignal,
+        InfoDict,
+    ]:
+        """Play the return_feedback part of the phases until one of them returns a feedback to the agents, or the game is over.
+        This is the only loop over the phases : phases with nothing to ask to the agents advance the phase and return SKIP_PHASE,
+        instead of calling the return_feedback of the next phase themselves. The skips are counted in n_skips_by_phase, except in simulated games.
+
+        Args:
+            state (StateWW): the current state of the game
+            is_same_phase (bool): whether the current phase is the one in which the actions were played
+
+        Returns:
+            Tuple[JointReward, JointPlayingInformation, JointObservation, JointActionSpace, TerminalSignal, InfoDict]: the feedback
+        """
+        while True:
+            # Check if the game is over, and if so, return the rewards
+            feedback_eventual_victory = state.get_feedback_eventual_victory()
+            if feedback_eventual_victory is not None:
+                return feedback_eventual_victory
+
+            # Change the subphase index
+            if is_same_phase:
+                state.idx_subphase += 1
+            else:
+                state.idx_subphase = 0
+
+            # Get the feedback of the current phase
+            phase = state.phase_manager.get_current_phase()
+            with self.measure_phase("return_feedback", phase):
+                feedback = phase.return_feedback(state)
+            if feedback is not SKIP_PHASE:
+                assert feedback is not None and len(feedback) == 6, f"Feedback of phase {phase.get_name()} should have 6 elements or be SKIP_PHASE, but is {feedback}."
+                return feedback
+            # The phase was skipped : ensure it advanced the phase, then play the next one
+            assert state.phase_manager.get_current_phase() is not phase, f"If the phase is skipped, it should have been advanced during the return_feedback method, but it was not. Phase : {phase.get_name()}"
+            if not self.is_simulation:
+                self.n_skips_by_phase[phase.get_name()] += 1
+            is_same_phase = False
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Return how many times each phase was skipped (returned SKIP_PHASE), over all the games played by this game object.
+
+        Returns:
+            Dict[str, float]: a dictionnary mapping "phases/n_skips/<phase name>" to the number of skips
+        """
+        return {
+            f"phases/n_skips/{name_phase}": n_skips
+            for name_phase, n_skips in self.n_skips_by_phase.items()
+        }
+
+    def get_simulation_game(self) -> "WerewolvesGame":
+        """Return a copy of the game whose steps don't count the skips of the phases, don't measure the runtimes of the phases
+        and don't close the log files of the games, so that the metrics and the games of this game object are not affected by the simulated games.
+        Its steps don't modify the game object, so it can be used to simulate games from several threads at once.
+        """
+        game = copy(self)
+        game.is_simulation = True
+        game.n_skips_by_phase = defaultdict(int)
+        game.common_obs_last_game = None
+        return game
+
+    def measure_phase(self, name_method: str, phase: Phase) -> Union[RuntimeMeter, NullRuntimeMeter]:
+        """Return the context manager measuring the runtime of a method of a phase, or a no-op one in simulated games.
+
+        Args:
+            name_method (str): the name of the method of the phase ("play_action" or "return_feedback")
+            phase (Phase): the phase
+
+        Returns:
+            Union[RuntimeMeter, NullRuntimeMeter]: the context manager
+        """
+        if self.is_simulation:
+            return NULL_RUNTIME_METER
+        return RuntimeMeter(f"phase.{name_method}/{phase.get_name()}")
+
     def step_play_action(self, state: StateWW, joint_action: JointAction) -> StateWW:
         """Perform the actions of the players in the current phase of the game.
         This will update the state of the game, and possibly change the phase.
@@ -267,10 +347,12 @@ Good luck!
             joint_action (JointAction): the list of actions of the players
         """
         phase = state.phase_manager.get_current_phase()
-        state.common_obs.log(
-            f"Playing actions for phase {phase}.{state.idx_subphase} of turn {state.turn}..."
-        )
-        phase.play_action(state, joint_action)
+        if state.common_obs.do_log_infos:
+            state.common_obs.log(
+                f"Playing actions for phase {phase}.{state.idx_subphase} of turn {state.turn}..."
+            )
+        with self.measure_phase("play_action", phase):
+            phase.play_action(state, joint_action)
         return
       
     def turn_mercenary_into_villager(self, state: StateWW):
@@ -284,10 +366,11 @@ Good luck!
             raise ValueError("There should be at most one mercenary.")
         id_mercenary = list_ids_mercenary[0]
         # Inform the mercenary of his failure
-        state.common_obs.add_message(
-            f"Your target is not dead by day's 2 vote. You have failed your mission and are now a villager.",
-            idx_player=id_mercenary,
-        )
+        if state.do_text_obs:
+            state.common_obs.add_message(
+                f"Your target is not dead by day's 2 vote. You have failed your mission and are now a villager.",
+                idx_player=id_mercenary,
+            )
         # Change mercenary state to villager equivalent
         state.identities[id_mercenary].change_faction(FactionsWW.VILLAGE)
         # Remove the solo status of the mercenary
@@ -400,9 +483,8 @@ Good luck!
         """
         ids_players_with_role = [
             i
-            for i in range(self.n_players)
-            if (allow_dead_player or state.list_are_alive[i])
-            and isinstance(state.identities[i].role, RoleClass)
+            for i in (range(self.n_players) if allow_dead_player else state.get_list_id_players_alive())
+            if isinstance(state.identities[i].role, RoleClass)
         ]
         if return_list:
             return ids_players_with_role
@@ -432,9 +514,8 @@ Good luck!
         """
         ids_players_with_status = [
             i
-            for i in range(self.n_players)
-            if (state.list_are_alive[i] or allow_dead_player)
-            and state.identities[i].has_status(status)
+            for i in (range(self.n_players) if allow_dead_player else state.get_list_id_players_alive())
+            if state.identities[i].has_status(status)
         ]
         if return_list:
             return ids_players_with_status
@@ -452,6 +533,44 @@ Good luck!
         """
         return self.n_players
 
+    def clone_state(self, state: StateWW) -> StateWW:
+        return state.clone()
+
+    def sample_determinization(self, state: StateWW, idx_player: int) -> StateWW:
+        """Reshuffle the roles of the other players alive whose role is unknown to the player (see StateWW.known_roles), among them.
+        A wolf also knows the other wolves. The players whose role plays the current phase keep their role,
+        so that the actions of the players currently playing stay valid in the determinization.
+        """
+        state = state.clone()
+        is_wolf = state.identities[idx_player].has_status(StatusIsWolf)
+        list_ids_wolves_alive = state.get_list_id_wolves_alive()
+        id_phase_current = state.phase_manager.get_current_phase_id()
+        list_ids_hidden = [
+            id_player
+            for id_player in state.get_list_id_players_alive()
+            if id_player != idx_player
+            and state.known_roles[idx_player, id_player] == -1
+            and not (is_wolf and id_player in list_ids_wolves_alive)
+            and not any(
+                phase.get_id() == id_phase_current
+                for phase in state.identities[id_player].role.get_associated_phases()
+            )
+        ]
+        if len(list_ids_hidden) >= 2:
+            state.reshuffle_roles(list_ids_hidden)
+        return state
+
+    def get_players_factions(self, state: StateWW) -> List[str]:
+        """Return the faction of each player at the current time of the game.
+
+        Args:
+            state (StateWW): the current state of the game
+
+        Returns:
+            List[str]: the faction name of each player
+        """
+        return [str(identity.faction) for identity in state.identities]
+
     def render(self, state: StateWW) -> None:
         """Render the current state of the game.
 
@@ -1,9 +1,12 @@
 from dataclasses import dataclass
-from typing import List
-from boardgames.games.werewolves.factions import FactionsWW, LIST_FACTIONS_BY_PRIORITY
+from typing import TYPE_CHECKING, List, Optional, Type, Union
+from boardgames.games.werewolves.factions import FactionsWW, DICT_FACTION_TO_ID
 from boardgames.games.werewolves.roles.base_role import RoleWW
 from boardgames.games.werewolves.statutes.base_status import Status
 
+if TYPE_CHECKING:
+    from boardgames.games.werewolves.core import CoreWW
+
 
 @dataclass
 class Identity:
@@ -13,6 +16,9 @@ class Identity:
     - a faction (FactionsWW) that the player belongs to (can change during the game) and with which the player wins
     - a list of statutes (List[Status]) that the player has and that can change during the game.
     Statutes are markers associated to the player that can determine how it interacts with the game.
+    They are also stored as the bitmask bits_statutes (see Status.bits), so that has_status is a single integer operation.
+
+    Once the state of the game is created, the identity is bound to its array-backed core (CoreWW), where changes of faction are also written.
     """
 
     role: RoleWW
@@ -23,36 +29,93 @@ class Identity:
         self.role = role
         self.faction = self.role.get_initial_faction()
         self.statutes = self.role.get_initial_statutes()
+        self.bits_statutes = 0
+        for status in self.statutes:
+            self.bits_statutes |= status.bits
         self.id_player = id_player
         self.role.set_id_player(id_player)
+        self.core: Optional["CoreWW"] = None
+
+    def set_core(self, core: "CoreWW") -> None:
+        """Bind the identity to the core of the state of the game, which then holds its faction id.
+
+        Args:
+            core (CoreWW): the core of the state
+        """
+        self.core = core
+        core.set_faction(self.id_player, DICT_FACTION_TO_ID[self.faction])
 
-    def has_status(self, status: List[Status]) -> bool:
-        """Return whether the player has the given status or not.
+    def has_status(self, status: Union[Status, Type[Status]]) -> bool:
+        """Return whether the player has the given status or not. A status of a subclass of the class of status also counts.
 
         Args:
-            status (List[Status]): the status to check
+            status (Union[Status, Type[Status]]): the status to check, or its class
 
         Returns:
             bool: whether the player has the status
         """
-        return status in self.statutes
+        return self.bits_statutes & status.bit != 0
 
-    def remove_status(self, status: str) -> None:
+    def remove_status(self, status: Status) -> None:
         """Try to remove the status from the player. If the status is not present, do nothing.
 
         Args:
-            status (str): the status to remove
+            status (Status): the status to remove
         """
         if status in self.statutes:
             self.statutes.remove(status)
+            # The status may have been added several times, or its parent classes may be shared with other statuses
+            self.bits_statutes = 0
+            for status_remaining in self.statutes:
+                self.bits_statutes |= status_remaining.bits
 
-    def add_status(self, status: str) -> None:
+    def add_status(self, status: Status) -> None:
         """Add a status to the player.
 
         Args:
-            status (str): the status to add to the player
+            status (Status): the status to add to the player
         """
         self.statutes.append(status)
+        self.bits_statutes |= status.bits
+
+    def pop_statutes_of_role(self) -> List[Status]:
+        """Remove from the player the statutes given by its role (among its initial statutes, those it still has), and return them.
+
+        Returns:
+            List[Status]: the statutes removed
+        """
+        list_types_statutes_role = [type(status) for status in self.role.get_initial_statutes()]
+        statutes_role: List[Status] = []
+        statutes_kept: List[Status] = []
+        for status in self.statutes:
+            if type(status) in list_types_statutes_role:
+                list_types_statutes_role.remove(type(status))
+                statutes_role.append(status)
+            else:
+                statutes_kept.append(status)
+        self.statutes = statutes_kept
+        self.bits_statutes = 0
+        for status in self.statutes:
+            self.bits_statutes |= status.bits
+        return statutes_role
+
+    def set_role(self, role: RoleWW, statutes_role: List[Status]) -> None:
+        """Give another role to the player, with the statutes it gives (see pop_statutes_of_role).
+        If the player is still in the faction of its previous role, it joins the faction of the new role,
+        otherwise (e.g. a couple member) its faction is kept.
+
+        Args:
+            role (RoleWW): the new role
+            statutes_role (List[Status]): the statutes given by the new role
+        """
+        if self.faction == self.role.get_initial_faction():
+            self.faction = role.get_initial_faction()
+            if self.core is not None:
+                self.core.set_faction(self.id_player, DICT_FACTION_TO_ID[self.faction])
+        self.role = role
+        self.role.set_id_player(self.id_player)
+        for status in statutes_role:
+            self.add_status(status)
 
     def change_faction(self, faction: FactionsWW) -> None:
         """Change the faction of the player. Only change it if the new faction has higher or equal importance than the current one.
@@ -60,10 +123,11 @@ class Identity:
         Args:
             faction (FactionsWW): the new faction
         """
-        current_faction_priority = LIST_FACTIONS_BY_PRIORITY.index(self.faction)
-        new_faction_priority = LIST_FACTIONS_BY_PRIORITY.index(faction)
-        if new_faction_priority <= current_faction_priority:
+        id_faction = DICT_FACTION_TO_ID[faction]
+        if id_faction <= DICT_FACTION_TO_ID[self.faction]:
             self.faction = faction
+            if self.core is not None:
+                self.core.set_faction(self.id_player, id_faction)
 
     def __repr__(self):
         """The representation of an identity is its role name and its faction, as well as its status if any."""
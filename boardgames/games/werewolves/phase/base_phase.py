@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
 from boardgames.action_spaces import JointActionSpace
 from boardgames.types import (
@@ -14,6 +14,16 @@ from boardgames.types import (
 )
 
 
+class PhaseSignal(Enum):
+    """The signals a phase can return instead of a feedback."""
+
+    SKIP = "skip"
+
+
+# Returned by Phase.return_feedback when the phase has nothing to ask to the agents and has advanced to the next phase itself
+SKIP_PHASE = PhaseSignal.SKIP
+
+
 class Phase(ABC):
     """A phase of the game.
     It describes :
@@ -33,10 +43,12 @@ class Phase(ABC):
         if state.is_game_over():
             return state.step_return_victory_remaining_faction()
 
-        # Play second part and return feedback
-        phase = state.game_phases.get_current_phase()
-        deals_with_entering_new_night (irrelevant for the phase)
-        return phase.return_feedback(state)
+        # Play second part and return feedback, skipping the phases returning SKIP_PHASE
+        while True:
+            phase = state.game_phases.get_current_phase()
+            feedback = phase.return_feedback(state)
+            if feedback is not SKIP_PHASE:
+                return feedback
 
     Additionally, the name of the phase (get_name method) should appear in the list LIST_NAMES_PHASES_ORDERED in the order of the phases in the game.
     This will allow the game to know the order in which the phases should be played.
@@ -88,17 +100,22 @@ class Phase(ABC):
         pass
 
     @abstractmethod
-    def return_feedback(self, state: State) -> Tuple[
-        JointReward,
-        JointPlayingInformation,
-        JointObservation,
-        JointActionSpace,
-        TerminalSignal,
-        InfoDict,
+    def return_feedback(self, state: State) -> Union[
+        Tuple[
+            JointReward,
+            JointPlayingInformation,
+            JointObservation,
+            JointActionSpace,
+            TerminalSignal,
+            InfoDict,
+        ],
+        PhaseSignal,
     ]:
         """Play the second part of the phase and return the feedback to the agents.
         This method should (possibly) modify the state of the game.
         It should then return the feedback to the agents.
+        If the phase has nothing to ask to the agents, it should instead advance to the next phase and return SKIP_PHASE :
+        the game then plays the next phase, without recursion.
 
         Args:
             state (State): the current state of the game
@@ -127,6 +144,10 @@ class Phase(ABC):
     def __hash__(self):
         return hash(self.get_name())
 
+    def get_id(self) -> int:
+        """Get the id of the phase, i.e. its index in LIST_NAMES_PHASES_ORDERED (followed by LIST_NAMES_PHASES_INSERTED)."""
+        return DICT_NAME_PHASE_TO_ID[self.get_name()]
+
 
 LIST_NAMES_PHASES_ORDERED = [
     "Day Speech",
@@ -155,3 +176,15 @@ LIST_NAMES_PHASES_ORDERED = [
     "Fox Phase",
     "Sister Speech",
 ]
+
+# Phases that are not part of the cycle of phases but are inserted during the game (with PhasesManagerWW.insert_phase)
+LIST_NAMES_PHASES_INSERTED = [
+    "Hunter Phase",
+]
+
+DICT_NAME_PHASE_TO_ID = {
+    name_phase: id_phase
+    for id_phase, name_phase in enumerate(
+        LIST_NAMES_PHASES_ORDERED + LIST_NAMES_PHASES_INSERTED
+    )
+}
@@ -3,7 +3,7 @@ import random
 from typing import List, Tuple
 from boardgames.games.werewolves.causes_of_deaths.base_cause import CauseOfDeath
 from boardgames.games.werewolves.factions import FactionsWW
-from boardgames.games.werewolves.phase.base_phase import Phase
+from boardgames.games.werewolves.phase.base_phase import Phase, SKIP_PHASE
 from boardgames.games.werewolves.roles.base_role import RoleWW
 from boardgames.games.werewolves.state import CauseVote, StateWW, StatusIsWolf
 from boardgames.games.werewolves.statutes.base_status import Status
@@ -35,10 +35,11 @@ class StatusAngelActive(Status):
         # If angel dies on day 2 (turn 1), he wins the game
         if state.turn == 1:
             if cause == CauseVote():
-                state.common_obs.add_global_message(
-                    "The angel has been voted at the first vote. He wins the game.",
-                )
-                state.identities[id_player].role.is_win_condition_achieved = True
+                if state.do_text_obs:
+                    state.common_obs.add_global_message(
+                        "The angel has been voted at the first vote. He wins the game.",
+                    )
+                state.set_win_condition_achieved(id_player)
                 return False
         return True
     
@@ -62,23 +63,25 @@ class PhaseAngelCheck(Phase):
         # Skip phase at turn 0
         if state.turn <= 0:
             state.phase_manager.advance_phase()
-            return
+            return SKIP_PHASE
         # Check if the angel has been eliminated
-        state.common_obs.add_message(
-            "You have failed to be eliminated at the first vote. You are now a regular villager.",
-            idx_player=self.id_player,
-        )
-        state.common_obs.log(
-            f"[!] Angel {self.id_player} has failed to be eliminated at the first vote. He is now a regular villager.",
-            "INFO",
-        )
+        if state.do_text_obs:
+            state.common_obs.add_message(
+                "You have failed to be eliminated at the first vote. You are now a regular villager.",
+                idx_player=self.id_player,
+            )
+        if state.common_obs.do_log_infos:
+            state.common_obs.log(
+                f"[!] Angel {self.id_player} has failed to be eliminated at the first vote. He is now a regular villager.",
+                "INFO",
+            )
         # Change the angel into a villager
         state.identities[self.id_player].change_faction(FactionsWW.VILLAGE)
         state.identities[self.id_player].remove_status(StatusAngelActive())
         # Advance to the next phase
         state.phase_manager.advance_phase()
         state.phase_manager.remove_phase(self)
-        return
+        return SKIP_PHASE
         
     def is_day_phase(self) -> bool:
         return True
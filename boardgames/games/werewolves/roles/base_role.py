@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, List
+from typing import Any, List, Optional
 from boardgames.games.werewolves.causes_of_deaths.base_cause import CauseOfDeath
 from boardgames.games.werewolves.factions import FactionsWW
 from boardgames.games.werewolves.phase.base_phase import Phase
@@ -9,10 +9,38 @@ from boardgames.types import State
 
 class RoleWW(ABC):
     def __init__(self, **kwargs):
-        self.is_win_condition_achieved = False
+        self.win_condition_achieved = False
+        self.list_ids_win_condition_achieved: Optional[List[int]] = None  # the registry of the state, see set_win_condition_registry
         self.config = kwargs
         super().__init__()
 
+    @property
+    def is_win_condition_achieved(self) -> bool:
+        """Whether the win condition of the role is achieved. Setting it also updates the registry of the state,
+        which is the only place the victory check looks at.
+        """
+        return self.win_condition_achieved
+
+    @is_win_condition_achieved.setter
+    def is_win_condition_achieved(self, value: bool) -> None:
+        self.win_condition_achieved = value
+        registry = self.list_ids_win_condition_achieved
+        if registry is None:
+            return
+        if value and self.id_player not in registry:
+            registry.append(self.id_player)
+        elif not value and self.id_player in registry:
+            registry.remove(self.id_player)
+
+    def set_win_condition_registry(self, list_ids_win_condition_achieved: List[int]) -> None:
+        """Bind the role to the list of the players whose win condition is achieved, kept by the state of the game.
+
+        Args:
+            list_ids_win_condition_achieved (List[int]): the registry of the state
+        """
+        self.list_ids_win_condition_achieved = list_ids_win_condition_achieved
+        self.is_win_condition_achieved = self.win_condition_achieved
+
     def set_id_player(self, id_player: int):
         """Set the id of the player having this role."""
         self.id_player = id_player
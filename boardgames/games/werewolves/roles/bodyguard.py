@@ -12,6 +12,7 @@ from boardgames.games.werewolves.statutes.base_status import (
 )
 from boardgames.types import JointAction
 from boardgames.action_spaces import (
+    get_actions_player_ids,
     FiniteActionSpace,
     JointActionSpace,
     TextualActionSpace,
@@ -38,20 +39,14 @@ class StatusProtectionBodyguard(StatusBaseProtection):
         state: StateWW,
         id_player: int,
     ) -> Tuple[bool, Set[CauseOfDeath]]:
-        # Get the causes that need to be removed
-        causes_of_deaths = state.night_attacks.get(id_player, set())
-        causes_to_remove = []
-        for c in causes_of_deaths:
-            if isinstance(c, CauseWolfAttack):
+        # Remove the wolf attack, if any
+        if state.core.is_attacked_by(id_player, CauseWolfAttack()):
+            if state.common_obs.do_log_infos:
                 state.common_obs.log(
                     f"[!] Bodyguard protection was usefull for protection of player {id_player}.",
                     "INFO",
                 )
-                causes_to_remove.append(c)
-        # Remove the causes that need to be removed
-        for c in causes_to_remove:
-            if isinstance(c, CauseWolfAttack):
-                state.night_attacks[id_player].remove(c)
+            state.core.remove_attack(id_player, CauseWolfAttack())
         # Remove the protection status
         state.identities[id_player].remove_status(self)
 
@@ -68,15 +63,17 @@ class PhaseBodyguard(Phase):
         # Protect the player
         id_target_bodyguard: int = joint_action[self.id_player]
         self.id_last_player_protected = id_target_bodyguard
-        state.common_obs.add_message(
-            f"You have protected player {id_target_bodyguard}.",
-            idx_player=self.id_player,
-        )
+        if state.do_text_obs:
+            state.common_obs.add_message(
+                f"You have protected player {id_target_bodyguard}.",
+                idx_player=self.id_player,
+            )
         state.identities[id_target_bodyguard].add_status(StatusProtectionBodyguard())
-        state.common_obs.log(
-            f"[!] Bodyguard protected player {id_target_bodyguard}.",
-            "ACTION",
-        )
+        if state.common_obs.do_log_infos:
+            state.common_obs.log(
+                f"[!] Bodyguard protected player {id_target_bodyguard}.",
+                "ACTION",
+            )
         # Advance to the next phase
         state.phase_manager.advance_phase()
         return state
@@ -89,18 +86,21 @@ class PhaseBodyguard(Phase):
         TerminalSignal,
         InfoDict,
     ]:
+        ids_players_as_str = get_actions_player_ids(state.n_players)
         list_id_players_protected_candidates = [
-            str(i)
-            for i in range(state.n_players)
-            if state.list_are_alive[i]
-            and not state.identities[i].has_status(StatusProtectionBodyguard())
+            ids_players_as_str[i]
+            for i in state.get_list_id_players_alive()
+            if not state.identities[i].has_status(StatusProtectionBodyguard)
         ]
         # Inform the bodyguard of the players they can protect
-        state.common_obs.add_message(
-            f"Bodyguard, you can now choose a player to protect among the alive players : {list_id_players_protected_candidates}. You can't protect the same player as the previous night.",
-            idx_player=self.id_player,
+        if state.do_text_obs:
+            state.common_obs.add_message(
+                f"Bodyguard, you can now choose a player to protect among the alive players : {list_id_players_protected_candidates}. You can't protect the same player as the previous night.",
+                idx_player=self.id_player,
+            )
+        action_space = FiniteActionSpace(
+            actions=list_id_players_protected_candidates, all_actions=ids_players_as_str
         )
-        action_space = FiniteActionSpace(actions=list_id_players_protected_candidates)
         return state.get_return_feedback_one_player(
             id_player=self.id_player, action_space=action_space
         )
@@ -33,22 +33,16 @@ class StatusProtectionElder(StatusBaseProtection):
         state: StateWW,
         id_player: int,
     ) -> bool:
-        # Get the causes that need to be removed
-        causes_of_deaths = state.night_attacks.get(id_player, set())
-        causes_to_remove = []
-        for c in causes_of_deaths:
-            if isinstance(c, CauseWolfAttack):
+        # Remove the wolf attack, if any
+        if state.core.is_attacked_by(id_player, CauseWolfAttack()):
+            if state.common_obs.do_log_infos:
                 state.common_obs.log(
                     f"[!] Elder protection was usefull for protection of player {id_player}.",
                     "INFO",
                 )
-                causes_to_remove.append(c)
-                # Remove the protection status
-                state.identities[id_player].remove_status(self)
-        # Remove the causes that need to be removed
-        for c in causes_to_remove:
-            if isinstance(c, CauseWolfAttack):
-                state.night_attacks[id_player].remove(c)
+            state.core.remove_attack(id_player, CauseWolfAttack())
+            # Remove the protection status
+            state.identities[id_player].remove_status(self)
     
     
     
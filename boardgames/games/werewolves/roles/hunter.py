@@ -9,6 +9,7 @@ from boardgames.games.werewolves.state import StateWW, StatusIsWolf
 from boardgames.games.werewolves.statutes.base_status import Status
 from boardgames.types import JointAction
 from boardgames.action_spaces import (
+    get_actions_player_ids,
     FiniteActionSpace,
     JointActionSpace,
     TextualActionSpace,
@@ -42,17 +43,19 @@ class PhaseHunter(Phase):
 
     def play_action(self, state: StateWW, joint_action: JointAction):
         id_target_hunter: int = joint_action[self.id_player]
-        state.common_obs.add_message(
-            f"You have eliminated player {id_target_hunter}.",
-            idx_player=self.id_player,
-        )
-        state.common_obs.add_global_message(
-            f"The Hunter has decided to eliminate player {id_target_hunter}."
-        )
-        state.common_obs.log(
-            f"Hunter {self.id_player} has eliminated player {id_target_hunter}.",
-            "ACTION",
-        )
+        if state.do_text_obs:
+            state.common_obs.add_message(
+                f"You have eliminated player {id_target_hunter}.",
+                idx_player=self.id_player,
+            )
+            state.common_obs.add_global_message(
+                f"The Hunter has decided to eliminate player {id_target_hunter}."
+            )
+        if state.common_obs.do_log_infos:
+            state.common_obs.log(
+                f"Hunter {self.id_player} has eliminated player {id_target_hunter}.",
+                "ACTION",
+            )
         state.apply_death_consequences(id_target_hunter, CauseHunterShot())
         # Advance to the next phase
         state.phase_manager.advance_phase()
@@ -68,15 +71,19 @@ class PhaseHunter(Phase):
         InfoDict,
     ]:
         list_id_players_target_candidate = state.get_list_id_players_alive()
-        state.common_obs.add_message(
-            f"Hunter, you are dead, but can shot a final bullet before leaving the village. Choose a player to kill among the alive players : {list_id_players_target_candidate}.",
-            idx_player=self.id_player,
-        )
-        state.common_obs.add_global_message(
-            f"The Hunter is dead. Before leaving, he will be able to eliminate a player right before the night phase.",
-            except_idx=self.id_player,
+        if state.do_text_obs:
+            state.common_obs.add_message(
+                f"Hunter, you are dead, but can shot a final bullet before leaving the village. Choose a player to kill among the alive players : {list_id_players_target_candidate}.",
+                idx_player=self.id_player,
+            )
+            state.common_obs.add_global_message(
+                f"The Hunter is dead. Before leaving, he will be able to eliminate a player right before the night phase.",
+                except_idx=self.id_player,
+            )
+        action_space = FiniteActionSpace(
+            actions=list_id_players_target_candidate,
+            all_actions=get_actions_player_ids(state.n_players, as_str=False),
         )
-        action_space = FiniteActionSpace(actions=list_id_players_target_candidate)
         return state.get_return_feedback_one_player(id_player=self.id_player, action_space=action_space
         )
 
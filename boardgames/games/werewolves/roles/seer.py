@@ -8,6 +8,7 @@ from boardgames.games.werewolves.state import StateWW, StatusIsWolf
 from boardgames.games.werewolves.statutes.base_status import Status
 from boardgames.types import JointAction
 from boardgames.action_spaces import (
+    get_actions_player_ids,
     FiniteActionSpace,
     JointActionSpace,
     TextualActionSpace,
@@ -39,9 +40,15 @@ class PhaseSeer(Phase):
         role_name_target_seer = state.identities[
             id_target_seer
         ].role.get_appearance_name()
-        state.common_obs.add_message(
-            f"You have investigated player {id_target_seer}. You see their role is {role_name_target_seer}.",
-            idx_player=self.id_player,
+        if state.do_text_obs:
+            state.common_obs.add_message(
+                f"You have investigated player {id_target_seer}. You see their role is {role_name_target_seer}.",
+                idx_player=self.id_player,
+            )
+        state.reveal_role(
+            id_target_seer,
+            list_idx_observers=[self.id_player],
+            role_name=role_name_target_seer,
         )
         # Advance to the next phase
         state.phase_manager.advance_phase()
@@ -57,11 +64,15 @@ class PhaseSeer(Phase):
     ]:
 
         list_id_targets = state.get_list_id_players_alive()
-        state.common_obs.add_message(
-            f"Seer, you can now choose a player to investigate the role among the alive players : {list_id_targets}.",
-            idx_player=self.id_player,
+        if state.do_text_obs:
+            state.common_obs.add_message(
+                f"Seer, you can now choose a player to investigate the role among the alive players : {list_id_targets}.",
+                idx_player=self.id_player,
+            )
+        action_space = FiniteActionSpace(
+            actions=list_id_targets,
+            all_actions=get_actions_player_ids(state.n_players, as_str=False),
         )
-        action_space = FiniteActionSpace(actions=list_id_targets)
         return state.get_return_feedback_one_player(
             id_player=self.id_player, action_space=action_space
         )
@@ -38,13 +38,15 @@ class StatusVillageFoolProtection(Status):
             # Remove the vote right
             state.identities[id_player].add_status(StatusCannotVote())
             # Inform the village fool and the village
-            state.common_obs.add_message(
-                "You have been voted by the village for this day. Thanks to your role, you are still alive but can't vote anymore.",
-                idx_player=id_player,
-            )
-            state.common_obs.add_global_message(
-                f"Player {id_player} has been voted by the village but is the Village Fool. They are still alive but can't vote anymore."
-            )
+            if state.do_text_obs:
+                state.common_obs.add_message(
+                    "You have been voted by the village for this day. Thanks to your role, you are still alive but can't vote anymore.",
+                    idx_player=id_player,
+                )
+                state.common_obs.add_global_message(
+                    f"Player {id_player} has been voted by the village but is the Village Fool. They are still alive but can't vote anymore."
+                )
+            state.reveal_role(id_player)
             # Return False to prevent the death of the player
             return False
         else:
@@ -34,10 +34,11 @@ class StatusModelWildChild(Status):
     
     def apply_death_consequences(self, state : StateWW, id_player: int, cause: CauseOfDeath):
         # If the model is eliminated, the Wild Child switches sides
-        state.common_obs.log(
-            f"[!] Wild Child {self.id_wild_child}'s model was eliminated.",
-            "INFO",
-        )
+        if state.common_obs.do_log_infos:
+            state.common_obs.log(
+                f"[!] Wild Child {self.id_wild_child}'s model was eliminated.",
+                "INFO",
+            )
         state.turn_player_into_wolf(self.id_wild_child)
 
 
@@ -84,11 +85,13 @@ class RoleWildChild(RoleWW):
             [i for i in range(state.n_players) if i != self.id_player]
         )
         state.identities[id_player_model].add_status(StatusModelWildChild(id_wild_child=self.id_player))
-        state.common_obs.log(
-            f"[!] Wild Child {self.id_player} was assigned player {id_player_model} as a model.",
-            "INFO",
-        )
-        state.common_obs.add_message(
-            f"Your model was chosen to be player {id_player_model}.",
-            idx_player=self.id_player,
-        )
+        if state.common_obs.do_log_infos:
+            state.common_obs.log(
+                f"[!] Wild Child {self.id_player} was assigned player {id_player_model} as a model.",
+                "INFO",
+            )
+        if state.do_text_obs:
+            state.common_obs.add_message(
+                f"Your model was chosen to be player {id_player_model}.",
+                idx_player=self.id_player,
+            )
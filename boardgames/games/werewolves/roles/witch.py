@@ -3,7 +3,7 @@ import random
 from typing import List, Tuple
 from boardgames.games.werewolves.causes_of_deaths.base_cause import CauseOfDeath
 from boardgames.games.werewolves.factions import FactionsWW
-from boardgames.games.werewolves.phase.base_phase import Phase
+from boardgames.games.werewolves.phase.base_phase import Phase, SKIP_PHASE
 from boardgames.games.werewolves.roles.base_role import RoleWW
 from boardgames.games.werewolves.state import CauseWolfAttack, StateWW, StatusIsWolf
 from boardgames.games.werewolves.statutes.base_status import Status
@@ -41,38 +41,41 @@ class PhaseWitch(Phase):
         action_witch: str = joint_action[self.id_player]
         role_witch: "RoleWitch" = state.identities[self.id_player].role
         if action_witch == "Do nothing":
-            state.common_obs.add_message(
-                "You have decided to not use any potion this night. ",
-                idx_player=self.id_player,
-            )
+            if state.do_text_obs:
+                state.common_obs.add_message(
+                    "You have decided to not use any potion this night. ",
+                    idx_player=self.id_player,
+                )
         elif action_witch == "Save":
-            assert state.night_attacks, "No player to save."
+            ids_wolf_victims = state.get_ids_wolf_victims()
+            assert len(ids_wolf_victims) > 0, "No player to save."
             role_witch.has_save_potion = False
-            id_player_victim = state.get_ids_wolf_victims()[0]
-            for cause_of_death_wolf in [
-                CauseWolfAttack(),
-            ]:
-                state.night_attacks[id_player_victim].remove(cause_of_death_wolf)
-            state.common_obs.add_message(
-                f"You have chosen to use your save potion on player {id_player_victim}.",
-                idx_player=self.id_player,
-            )
-            state.common_obs.log(
-                f"[!] Witch saved player {id_player_victim} from the wolves.",
-                "ACTION",
-            )
+            id_player_victim = ids_wolf_victims[0]
+            state.core.remove_attack(id_player_victim, CauseWolfAttack())
+            if state.do_text_obs:
+                state.common_obs.add_message(
+                    f"You have chosen to use your save potion on player {id_player_victim}.",
+                    idx_player=self.id_player,
+                )
+            if state.common_obs.do_log_infos:
+                state.common_obs.log(
+                    f"[!] Witch saved player {id_player_victim} from the wolves.",
+                    "ACTION",
+                )
         elif action_witch.startswith("Kill"):
             role_witch.has_kill_potion = False
             id_target_witch = int(action_witch.split(" ")[1])
-            state.night_attacks[id_target_witch].add(CauseKillPotion())
-            state.common_obs.add_message(
-                f"You have chosen to use your kill potion on player {id_target_witch}.",
-                idx_player=self.id_player,
-            )
-            state.common_obs.log(
-                f"[!] Witch killed player {id_target_witch}.",
-                "ACTION",
-            )
+            state.core.add_attack(id_target_witch, CauseKillPotion())
+            if state.do_text_obs:
+                state.common_obs.add_message(
+                    f"You have chosen to use your kill potion on player {id_target_witch}.",
+                    idx_player=self.id_player,
+                )
+            if state.common_obs.do_log_infos:
+                state.common_obs.log(
+                    f"[!] Witch killed player {id_target_witch}.",
+                    "ACTION",
+                )
         else:
             raise ValueError(f"Invalid action for the witch : {action_witch}.")
         # Advance to the next phase
@@ -90,21 +93,22 @@ class PhaseWitch(Phase):
         role_witch: "RoleWitch" = state.identities[self.id_player].role
         # If the witch has no more potions, skip the phase
         if not role_witch.has_save_potion and not role_witch.has_kill_potion:
+            if state.do_text_obs:
+                state.common_obs.add_message(
+                    "You have no more potions to use this night. ",
+                    idx_player=self.id_player,
+                )
+            state.phase_manager.advance_phase()
+            return SKIP_PHASE
+        # Inform the witch its turn is starting
+        if state.do_text_obs:
             state.common_obs.add_message(
-                "You have no more potions to use this night. ",
+                (
+                    f"Witch, you can now use one of your potions if you have any. "
+                    f"You can also choose to do nothing and keep your potions for later use with action 'Do nothing'. "
+                ),
                 idx_player=self.id_player,
             )
-            state.phase_manager.advance_phase()
-            phase = state.phase_manager.get_current_phase()
-            return phase.return_feedback(state)
-        # Inform the witch its turn is starting
-        state.common_obs.add_message(
-            (
-                f"Witch, you can now use one of your potions if you have any. "
-                f"You can also choose to do nothing and keep your potions for later use with action 'Do nothing'. "
-            ),
-            idx_player=self.id_player,
-        )
         list_actions = ["Do nothing"]
         # Get the wolf victim and inform the witch of it
         ids_wolf_victims = state.get_ids_wolf_victims()
@@ -113,11 +117,12 @@ class PhaseWitch(Phase):
         ), "There should be at most one wolf victim. (Not implemented yet)"
         if len(ids_wolf_victims) == 1:
             id_wolf_victim = ids_wolf_victims[0]
-            state.common_obs.add_message(
-                f"You see the victim of the wolves is player {id_wolf_victim}. You can choose to save them by consuming your healing potion with action 'Save'.",
-                idx_player=self.id_player,
-            )
-        else:
+            if state.do_text_obs:
+                state.common_obs.add_message(
+                    f"You see the victim of the wolves is player {id_wolf_victim}. You can choose to save them by consuming your healing potion with action 'Save'.",
+                    idx_player=self.id_player,
+                )
+        elif state.do_text_obs:
             state.common_obs.add_message(
                 f"You see there is no victim of the wolves this night.",
                 idx_player=self.id_player,
@@ -128,10 +133,9 @@ class PhaseWitch(Phase):
         # Propose the witch to choose a player to kill (if the witch has the death potion)
         if role_witch.has_kill_potion:
             list_actions_kill = []
-            for i in range(state.n_players):
+            for i in state.get_list_id_players_alive():
                 if (
-                    state.list_are_alive[i]
-                    and (i != self.id_player)
+                    (i != self.id_player)
                     and (
                         i not in ids_wolf_victims
                     )  # maybe remove this line to authorize the witch to kill the wolf victim, which in some case may survive the wolf attack (usefull in very rare cases)
@@ -139,12 +143,13 @@ class PhaseWitch(Phase):
                     list_actions_kill.append(f"Kill {i}")
             if len(list_actions_kill) > 0:
                 list_actions.extend(list_actions_kill)
-                state.common_obs.add_message(
-                    (
-                        f"You can choose to kill a player with action 'Kill <player_id>' by consuming your killing potion. "
-                    ),
-                    idx_player=self.id_player,
-                )
+                if state.do_text_obs:
+                    state.common_obs.add_message(
+                        (
+                            f"You can choose to kill a player with action 'Kill <player_id>' by consuming your killing potion. "
+                        ),
+                        idx_player=self.id_player,
+                    )
         # Return feedback to the witch
         action_space = FiniteActionSpace(actions=list_actions)
         return state.get_return_feedback_one_player(
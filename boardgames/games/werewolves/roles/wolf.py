@@ -8,6 +8,7 @@ from boardgames.games.werewolves.state import CauseWolfAttack, StateWW, StatusIs
 from boardgames.games.werewolves.statutes.base_status import Status
 from boardgames.types import JointAction
 from boardgames.action_spaces import (
+    get_actions_player_ids,
     FiniteActionSpace,
     JointActionSpace,
     TextualActionSpace,
@@ -36,15 +37,16 @@ class PhaseNightWolfSpeech(Phase):
             joint_action[id_wolf_speaking] is not None
         ), f"Player {id_wolf_speaking} must speak."
         list_id_wolves = state.get_list_id_wolves_alive()
-        state.common_obs.add_specific_message(
-            text=f"[Private Wolf Chat] Player {id_wolf_speaking} says : {joint_action[id_wolf_speaking]}",
-            list_idx_player=list_id_wolves,
-            except_idx=id_wolf_speaking,
-        )
-        state.common_obs.add_message(
-            text=f"[Private Wolf Chat] You say : {joint_action[id_wolf_speaking]}",
-            idx_player=id_wolf_speaking,
-        )
+        if state.do_text_obs:
+            state.common_obs.add_specific_message(
+                text=f"[Private Wolf Chat] Player {id_wolf_speaking} says : {joint_action[id_wolf_speaking]}",
+                list_idx_player=list_id_wolves,
+                except_idx=id_wolf_speaking,
+            )
+            state.common_obs.add_message(
+                text=f"[Private Wolf Chat] You say : {joint_action[id_wolf_speaking]}",
+                idx_player=id_wolf_speaking,
+            )
 
         # # Send partial message to the little girl
         # if RoleLittleGirl() in [
@@ -68,10 +70,11 @@ class PhaseNightWolfSpeech(Phase):
         # Check if all wolves have spoken
         if state.idx_speech_wolf >= len(state.order_speech_wolf):
             # Announcing the end of the night wolf speech
-            state.common_obs.add_specific_message(
-                "All wolves have spoken, now is the time to choose your target.",
-                list_idx_player=list_id_wolves,
-            )
+            if state.do_text_obs:
+                state.common_obs.add_specific_message(
+                    "All wolves have spoken, now is the time to choose your target.",
+                    list_idx_player=list_id_wolves,
+                )
             # Move to the next phase
             state.phase_manager.advance_phase()
             # Reset the speech variables for good measure
@@ -92,16 +95,17 @@ class PhaseNightWolfSpeech(Phase):
         if len(state.order_speech_wolf) == 0:
             breakpoint()
         id_wolf_speaking = state.order_speech_wolf[state.idx_speech_wolf]
-        list_id_wolves_alive = state.get_list_id_wolves_alive()
-        state.common_obs.add_specific_message(
-            f"[Private Wolf Chat] Player {id_wolf_speaking} is now speaking.",
-            list_idx_player=list_id_wolves_alive,
-            except_idx=id_wolf_speaking,
-        )
-        state.common_obs.add_message(
-            text="[Private Wolf Chat] You are now speaking. Please express yourself about the current situation with the other wolves.",
-            idx_player=id_wolf_speaking,
-        )
+        if state.do_text_obs:
+            list_id_wolves_alive = state.get_list_id_wolves_alive()
+            state.common_obs.add_specific_message(
+                f"[Private Wolf Chat] Player {id_wolf_speaking} is now speaking.",
+                list_idx_player=list_id_wolves_alive,
+                except_idx=id_wolf_speaking,
+            )
+            state.common_obs.add_message(
+                text="[Private Wolf Chat] You are now speaking. Please express yourself about the current situation with the other wolves.",
+                idx_player=id_wolf_speaking,
+            )
         return state.get_return_feedback_one_player(
             id_player=id_wolf_speaking,
             action_space=TextualActionSpace(
@@ -121,7 +125,7 @@ class PhaseNightWolfVote(Phase):
     def play_action(self, state: StateWW, joint_action: JointAction) -> StateWW:
 
         report_attack = ""
-        attack_count = defaultdict(int)
+        attacks = [-1] * state.n_players
         list_id_wolves_alive = state.get_list_id_wolves_alive()
         # Count the votes
         for id_player, id_target in enumerate(joint_action):
@@ -129,34 +133,35 @@ class PhaseNightWolfVote(Phase):
                 assert (
                     id_player in list_id_wolves_alive
                 ), f"Player {id_player} is not an alive wolf but has chosen to attack player {id_target}."
-                report_attack += f"Wolf {id_player} voted for player {id_target}.\n"
-                attack_count[id_target] += 1
-        state.common_obs.add_specific_message(
-            text=f"[Private Wolf Chat] The wolves have voted for their target : \n{report_attack}",
-            list_idx_player=list_id_wolves_alive,
-        )
-        most_attacked_players = [
-            id_player
-            for id_player, count in attack_count.items()
-            if count == max(attack_count.values())
-        ]
+                if state.do_text_obs:
+                    report_attack += f"Wolf {id_player} voted for player {id_target}.\n"
+                attacks[id_player] = id_target
+        if state.do_text_obs:
+            state.common_obs.add_specific_message(
+                text=f"[Private Wolf Chat] The wolves have voted for their target : \n{report_attack}",
+                list_idx_player=list_id_wolves_alive,
+            )
+        most_attacked_players = state.core.get_ids_most_voted(attacks)
         # If there is a draw, pick a player randomly among the tied players
         if len(most_attacked_players) > 1:
             id_target_final: int = random.choice(most_attacked_players)
+            if state.do_text_obs:
+                state.common_obs.add_specific_message(
+                    f"[Private Wolf Chat] There is a draw in the votes of the wolves. Eliminated player is picked randomly among the tied players : {id_target_final}.",
+                    list_idx_player=list_id_wolves_alive,
+                )
+        else:
+            id_target_final: int = most_attacked_players[0]
+        if state.do_text_obs:
             state.common_obs.add_specific_message(
-                f"[Private Wolf Chat] There is a draw in the votes of the wolves. Eliminated player is picked randomly among the tied players : {id_target_final}.",
+                f"[Private Wolf Chat] The wolves have chosen their target : player {id_target_final}.",
                 list_idx_player=list_id_wolves_alive,
             )
-        else:
-            id_target_final: int = most_attacked_players[0]
-        state.common_obs.add_specific_message(
-            f"[Private Wolf Chat] The wolves have chosen their target : player {id_target_final}.",
-            list_idx_player=list_id_wolves_alive,
-        )
-        state.common_obs.log(
-            f"The wolves have chosen their target : player {id_target_final}.",
-            "ACTION",
-        )
+        if state.common_obs.do_log_infos:
+            state.common_obs.log(
+                f"The wolves have chosen their target : player {id_target_final}.",
+                "ACTION",
+            )
         # Check if the target is protected
         attack_fails = False
         # if state.identities[id_target_final].have_status(
@@ -179,7 +184,7 @@ class PhaseNightWolfVote(Phase):
         #     attack_fails = True
         # # Add the target to the list of deaths
         if not attack_fails:
-            state.night_attacks[id_target_final].add(CauseWolfAttack())
+            state.core.add_attack(id_target_final, CauseWolfAttack())
         # Advance to the next phase
         state.phase_manager.advance_phase()
         return state
@@ -192,21 +197,27 @@ class PhaseNightWolfVote(Phase):
         TerminalSignal,
         InfoDict,
     ]:
+        ids_players_as_str = get_actions_player_ids(state.n_players)
         list_id_villagers_alive_as_str = [
-            str(i) for i in range(state.n_players) if state.list_are_alive[i]
+            ids_players_as_str[i] for i in state.get_list_id_players_alive()
         ]
         list_id_wolves_alive = state.get_list_id_wolves_alive()
-        state.common_obs.add_specific_message(
-            f"[Private Wolf Chat] The wolves must now choose their target. Pick a player to eliminate among the villagers : {list_id_villagers_alive_as_str}.",
-            list_idx_player=list_id_wolves_alive,
-        )
+        if state.do_text_obs:
+            state.common_obs.add_specific_message(
+                f"[Private Wolf Chat] The wolves must now choose their target. Pick a player to eliminate among the villagers : {list_id_villagers_alive_as_str}.",
+                list_idx_player=list_id_wolves_alive,
+            )
         rewards = [0.0] * state.n_players
-        list_is_playing = [i in list_id_wolves_alive for i in range(state.n_players)]
+        list_is_playing = state.empty_list_except(
+            idx=list_id_wolves_alive, value=True, fill=False
+        )
         list_obs = (
             state.common_obs
         )  # this include non playing player but should not be a problem
         list_action_spaces = [
-            FiniteActionSpace(actions=list_id_villagers_alive_as_str)
+            FiniteActionSpace(
+                actions=list_id_villagers_alive_as_str, all_actions=ids_players_as_str
+            )
         ] * state.n_players  # same
         return (
             rewards,
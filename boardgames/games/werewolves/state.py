@@ -7,16 +7,20 @@ import random
 from time import sleep
 from typing import Any, Dict, List, Optional, Set, Tuple, Type, Union
 
+import numpy as np
 from regex import P
 from boardgames.common_obs import CommonObs
 from boardgames.games.werewolves.causes_of_deaths.base_cause import CauseOfDeath
+from boardgames.games.werewolves.core import CoreWW
 from boardgames.games.werewolves.factions import FactionsWW
 from boardgames.games.werewolves.identity import Identity
 from boardgames.games.werewolves.phase.base_phase import (
     Phase,
     LIST_NAMES_PHASES_ORDERED,
+    SKIP_PHASE,
 )
 from boardgames.games.werewolves.roles.base_role import RoleWW
+from boardgames.games.werewolves.structured_obs import StructuredObservationsWW
 from boardgames.games.werewolves.statutes.base_status import (
     Status,
     StatusBaseProtection,
@@ -36,6 +40,7 @@ from boardgames.types import (
     AgentID,
 )
 from boardgames.action_spaces import (
+    get_actions_player_ids,
     ActionsSpace,
     JointActionSpace,
     FiniteActionSpace,
@@ -86,14 +91,15 @@ class PhaseDaySpeech(Phase):
         assert (
             joint_action[id_player_speaking] is not None
         ), f"Player {id_player_speaking} must speak."
-        state.common_obs.add_global_message(
-            text=f"Player {id_player_speaking} says : {joint_action[id_player_speaking]}",
-            except_idx=id_player_speaking,
-        )
-        state.common_obs.add_message(
-            text=f"You say : {joint_action[id_player_speaking]}",
-            idx_player=id_player_speaking,
-        )
+        if state.do_text_obs:
+            state.common_obs.add_global_message(
+                text=f"Player {id_player_speaking} says : {joint_action[id_player_speaking]}",
+                except_idx=id_player_speaking,
+            )
+            state.common_obs.add_message(
+                text=f"You say : {joint_action[id_player_speaking]}",
+                idx_player=id_player_speaking,
+            )
 
         # Move to the next speaker
         state.idx_speech += 1
@@ -101,9 +107,10 @@ class PhaseDaySpeech(Phase):
         # Check if all players have spoken
         if state.idx_speech >= len(state.order_speech):
             # Announcing the end of the day speech
-            state.common_obs.add_global_message(
-                "All players have spoken, the day is over."
-            )
+            if state.do_text_obs:
+                state.common_obs.add_global_message(
+                    "All players have spoken, the day is over."
+                )
             # Move to the next phase
             state.phase_manager.advance_phase()
             if state.turn == 0:
@@ -137,13 +144,14 @@ class PhaseDaySpeech(Phase):
             state.start_new_day()
 
         id_player_speaking = state.order_speech[state.idx_speech]
-        state.common_obs.add_global_message(
-            f"Player {id_player_speaking} is now speaking."
-        )
-        state.common_obs.add_message(
-            text="You are now speaking. Please express yourself about the current situation.",
-            idx_player=id_player_speaking,
-        )
+        if state.do_text_obs:
+            state.common_obs.add_global_message(
+                f"Player {id_player_speaking} is now speaking."
+            )
+            state.common_obs.add_message(
+                text="You are now speaking. Please express yourself about the current situation.",
+                idx_player=id_player_speaking,
+            )
         return state.get_return_feedback_one_player(
             id_player=id_player_speaking,
             action_space=TextualActionSpace(
@@ -162,10 +170,6 @@ class PhaseDayVote(Phase):
 
     def play_action(self, state: "StateWW", joint_action: JointAction):
         report_vote = ""
-        vote_count: Dict[int, int] = defaultdict(int)
-        list_id_players_alive = [
-            i for i in range(state.n_players) if state.list_are_alive[i]
-        ]
         # If a player has a Crow malus, add 2 votes against them and remove the malus status
         # for id_player in list_id_players_alive:
         #     if state.identities[id_player].have_status(Status.HAS_CROW_MALUS):
@@ -175,36 +179,39 @@ class PhaseDayVote(Phase):
         #         )
         #         state.identities[id_player].remove_status(Status.HAS_CROW_MALUS)
         # Count the votes
+        votes = [-1] * state.n_players
         for id_player, id_target in enumerate(joint_action):
             if id_target is not None:
-                assert (
-                    id_player in list_id_players_alive
-                ), f"Player {id_player} is not an alive player but has chosen to vote for player {id_target}."
-                assert (
-                    id_target in list_id_players_alive
-                ), f"Player {id_player} cannot vote for a dead player but player {id_target} is dead."
-                report_vote += f"Player {id_player} voted for player {id_target}.\n"
-                vote_count[id_target] += 1
-        state.common_obs.add_global_message(
-            text=f"The players have voted the following : \n{report_vote}",
-        )
-        most_voted_players = [
-            id_player
-            for id_player, count in vote_count.items()
-            if count == max(vote_count.values())
-        ]
+                assert state.list_are_alive[
+                    id_player
+                ], f"Player {id_player} is not an alive player but has chosen to vote for player {id_target}."
+                assert state.list_are_alive[
+                    id_target
+                ], f"Player {id_player} cannot vote for a dead player but player {id_target} is dead."
+                if state.do_text_obs:
+                    report_vote += f"Player {id_player} voted for player {id_target}.\n"
+                votes[id_player] = id_target
+        state.vote_history.append(votes)
+        if state.do_text_obs:
+            state.common_obs.add_global_message(
+                text=f"The players have voted the following : \n{report_vote}",
+            )
+        most_voted_players = state.core.get_ids_most_voted(votes)
         # If there is a draw, pick a player randomly among the tied players
         if len(most_voted_players) > 1:
             id_target_final = random.choice(most_voted_players)
-            state.common_obs.add_global_message(
-                f"There is a draw in the votes. Eliminated player is picked randomly among the tied players : {id_target_final}."
-            )
+            if state.do_text_obs:
+                state.common_obs.add_global_message(
+                    f"There is a draw in the votes. Eliminated player is picked randomly among the tied players : {id_target_final}."
+                )
         else:
             id_target_final = most_voted_players[0]
-            state.common_obs.add_global_message(
-                f"The most voted player will be eliminated : {id_target_final}."
-            )
-        state.common_obs.log(f"Player {id_target_final} is eliminated by the vote.")
+            if state.do_text_obs:
+                state.common_obs.add_global_message(
+                    f"The most voted player will be eliminated : {id_target_final}."
+                )
+        if state.common_obs.do_log_infos:
+            state.common_obs.log(f"Player {id_target_final} is eliminated by the vote.")
         # Eliminate the player and apply consequences
         state.apply_death_consequences(id_target_final, CauseVote())
         # Advance to the next phase
@@ -218,32 +225,28 @@ class PhaseDayVote(Phase):
         TerminalSignal,
         InfoDict,
     ]:
+        list_id_players_alive = state.get_list_id_players_alive()
         list_id_players_voting = [
             i
-            for i in range(state.n_players)
-            if (
-                state.list_are_alive[i]
-                and not state.identities[i].has_status(StatusCannotVote())
-            )
+            for i in list_id_players_alive
+            if not state.identities[i].has_status(StatusCannotVote)
         ]
         rewards = [0.0] * state.n_players
-        list_is_playing = [i in list_id_players_voting for i in range(state.n_players)]
+        list_is_playing = state.empty_list_except(
+            idx=list_id_players_voting, value=True, fill=False
+        )
         list_obs = state.common_obs
-        list_action_spaces = []
-        for i in range(state.n_players):
-            if not state.list_are_alive[i]:
-                list_action_spaces.append(None)
-            else:
-                list_id_other_players_alive_as_str = [
-                    str(j)
-                    for j in range(state.n_players)
-                    if j != i and state.list_are_alive[j]
-                ]
-                list_action_spaces.append(
-                    FiniteActionSpace(
-                        actions=list_id_other_players_alive_as_str,  # Player i cannot vote for dead players and himself
-                    )
-                )
+        list_action_spaces = [None] * state.n_players
+        ids_players_as_str = get_actions_player_ids(state.n_players)
+        for i in list_id_players_alive:
+            list_id_other_players_alive_as_str = [
+                ids_players_as_str[j] for j in list_id_players_alive if j != i
+            ]
+            list_action_spaces[i] = FiniteActionSpace(
+                actions=list_id_other_players_alive_as_str,  # Player i cannot vote for dead players and himself
+                all_actions=ids_players_as_str,
+            )
+            if state.do_text_obs:
                 state.common_obs.add_message(
                     f"The vote of day {state.turn+1} will now take place. Pick a player to eliminate among the remaining other players : {list_id_other_players_alive_as_str}.",
                     idx_player=i,
@@ -281,51 +284,74 @@ class PhaseAnnouncementNight(Phase):
         # Check if this is a new night (in that case announce the night and initialize night variables)
         if state.phase_manager.get_first_night_phase() is None:
             # No more nights, continuing the game
-            state.night_attacks = defaultdict(set)
+            state.core.reset_attacks()
             state.common_obs.log("[!] No more nights, continuing the game.")
         else:
             # New night, announce the night and initialize night variables
-            state.common_obs.add_global_message(
-                f"The composition of the remaining players is :\n{state.get_compo_listing()}"
-            )
-            state.common_obs.add_global_message(
-                f"The village is now going to sleep for night {state.turn+1}."
-            )
+            if state.do_text_obs:
+                state.common_obs.add_global_message(
+                    f"The composition of the remaining players is :\n{state.get_compo_listing()}"
+                )
+                state.common_obs.add_global_message(
+                    f"The village is now going to sleep for night {state.turn+1}."
+                )
             # Initialize night variables
-            state.night_attacks = defaultdict(set)
-            state.common_obs.log(f"[!] New night, initializing night variables.")
+            state.core.reset_attacks()
+            if state.common_obs.do_log_infos:
+                state.common_obs.log(f"[!] New night, initializing night variables.")
         # Advance to the next phase
         state.phase_manager.advance_phase()
-        return
+        return SKIP_PHASE
 
 
 # Define the manager of phases
 class PhasesManagerWW:
-    """Manager of the phases of the Werewolves game. It is responsible for the order of the phases and the transitions between them."""
+    """Manager of the phases of the Werewolves game. It is responsible for the order of the phases and the transitions between them.
+
+    The cycle of phases is compiled at the creation of the game into a schedule :
+        - list_phases (List[Phase]) : the phases of the cycle, in order : the base phases followed by the phases of the roles in the composition
+        - list_ids_phases (List[int]) : the id of each phase (see Phase.get_id), and dict_id_phase_to_idx the index of each id in the schedule
+        - are_active (List[bool]) : whether each phase is still played. Removing a phase only deactivates it.
+        - list_idx_next (List[int]) : the successor table, i.e. the index of the next active phase after each phase, recomputed when a phase is removed
+    Phases inserted during the game (e.g. the Hunter Phase) are not part of the cycle : they are played once, right after the current phase of the cycle,
+    and are kept in list_phases_inserted until the next phase of the cycle is reached.
+    """
 
     def __init__(self, list_roles: List[RoleWW], state: "StateWW") -> None:
-        # Initialize the list of phases as the two base phases
+        # Initialize the list of phases as the base phases
         self.state = state
         self.list_phases: List[Phase] = [
             PhaseDaySpeech(),
             PhaseDayVote(),
             PhaseAnnouncementNight(),
         ]
-        # Collect the phases associated with the roles in the composition
-        set_phases_from_roles: Set[Phase] = set()
+        # Collect the phases associated with the roles in the composition, and the number of players having each of them
+        dict_id_phase_to_phase: Dict[int, Phase] = {}
+        self.n_holders_by_id_phase: Dict[int, int] = defaultdict(int)
         for role in list_roles:
             phases_associated = role.get_associated_phases()
             assert all(
                 [p.get_name() in LIST_NAMES_PHASES_ORDERED for p in phases_associated]
             ), f"Names of the phases associated with role {role} ({phases_associated}) should be in LIST_NAMES_PHASES_ORDERED. Please add them in LIST_NAMES_PHASES_ORDERED."
-            set_phases_from_roles.update(phases_associated)
-        # Extend the list of phases with the phases associated with the roles in the order of the list of phases
-        for name_phase in LIST_NAMES_PHASES_ORDERED:
-            for phase in set_phases_from_roles:
-                if phase.get_name() == name_phase:
-                    self.list_phases.append(phase)
+            for phase in phases_associated:
+                id_phase = phase.get_id()
+                dict_id_phase_to_phase.setdefault(id_phase, phase)
+                self.n_holders_by_id_phase[id_phase] += 1
+        # Extend the list of phases with the phases associated with the roles, in the order of LIST_NAMES_PHASES_ORDERED
+        for id_phase in sorted(dict_id_phase_to_phase):
+            self.list_phases.append(dict_id_phase_to_phase[id_phase])
+        # Compile the schedule
+        self.list_ids_phases: List[int] = [phase.get_id() for phase in self.list_phases]
+        self.dict_id_phase_to_idx: Dict[int, int] = {
+            id_phase: idx for idx, id_phase in enumerate(self.list_ids_phases)
+        }
+        self.are_active: List[bool] = [True] * len(self.list_phases)
+        self.list_idx_next: List[int] = []
+        self.idx_first_night_phase_active: Optional[int] = None
+        self.list_phases_inserted: List[Phase] = []
         # Initialize the indexes
         self.idx_current_phase = 0
+        self.idx_current_phase_inserted = -1  # the index of the current phase in list_phases_inserted, or -1 if the current phase is in the cycle
         self.idx_first_night_phase = len(
             [phase for phase in self.list_phases if phase.is_day_phase()]
         )
@@ -335,86 +361,159 @@ class PhasesManagerWW:
                 for i in range(self.idx_first_night_phase)
             ]
         ), f"The phases should be dividedd in n day phases followed by m night phases, with n+m = len(list_phases), but the first {self.idx_first_night_phase} phases are not day phases : {[phase.get_name() for phase in self.list_phases[:self.idx_first_night_phase]]}."
+        self.compile_successors()
+
+    def compile_successors(self) -> None:
+        """Recompute the successor table and the first active night phase from the active phases."""
+        n_phases = len(self.list_phases)
+        self.list_idx_next = [0] * n_phases
+        idx_next_active = next(idx for idx in range(n_phases) if self.are_active[idx])
+        for idx in reversed(range(n_phases)):
+            self.list_idx_next[idx] = idx_next_active
+            if self.are_active[idx]:
+                idx_next_active = idx
+        self.idx_first_night_phase_active = next(
+            (
+                idx
+                for idx in range(self.idx_first_night_phase, n_phases)
+                if self.are_active[idx]
+            ),
+            None,
+        )
+
+    def rebuild_phases_of_roles(self, list_roles: List[RoleWW]) -> None:
+        """Replace the phases of the roles in the cycle by the phases associated with the given roles, e.g. after the roles were reshuffled
+        among the players, since these phases may hold the id of the player having the role. The schedule (the ids of the phases,
+        which of them are active and the current position) is kept, the roles being the same up to a permutation.
+
+        Args:
+            list_roles (List[RoleWW]): the role of each player, in the order of the players
+        """
+        dict_id_phase_to_phase: Dict[int, Phase] = {}
+        for role in list_roles:
+            for phase in role.get_associated_phases():
+                dict_id_phase_to_phase.setdefault(phase.get_id(), phase)
+        for idx, id_phase in enumerate(self.list_ids_phases):
+            if id_phase in dict_id_phase_to_phase:
+                self.list_phases[idx] = dict_id_phase_to_phase[id_phase]
 
     def advance_phase(self) -> None:
-        """Advance to the next phase in the list of phases."""
-        idx_previous_phase = deepcopy(self.idx_current_phase)
-        self.idx_current_phase = (self.idx_current_phase + 1) % len(self.list_phases)
-        self.state.common_obs.log(
-            f"{self.list_phases[idx_previous_phase]} --> {self.list_phases[self.idx_current_phase]}"
-        )
+        """Advance to the next phase : the next inserted phase if any, else the next active phase of the cycle."""
+        phase_previous = self.get_current_phase()
+        if self.idx_current_phase_inserted + 1 < len(self.list_phases_inserted):
+            self.idx_current_phase_inserted += 1
+        else:
+            self.list_phases_inserted = []
+            self.idx_current_phase_inserted = -1
+            self.idx_current_phase = self.list_idx_next[self.idx_current_phase]
+        if self.state.common_obs.do_log_infos:
+            self.state.common_obs.log(f"{phase_previous} --> {self.get_current_phase()}")
 
     def remove_phase(self, phase: Phase) -> None:
-        """Remove a phase from the list of phases. Also modifies the phase indexes so that it still points to the same phase.
+        """Remove a phase : an inserted phase is removed from the inserted phases, and a phase of the cycle is deactivated.
 
         Args:
             phase (Phase): the phase to remove
         """
-        assert (
-            self.list_phases.count(phase) <= 1
-        ), f"Phase {phase} to remove should be present only 0 or 1 times, but it is present {self.list_phases.count(phase)} times."
-        if self.list_phases.count(phase) == 0:
-            self.state.common_obs.log(
-                f"Attempting removing phase {phase}... but it is not present in the list of phases."
-            )
-            return  # nothing to do
-        else:
-            self.state.common_obs.log(f"Attempting removing phase {phase}... REMOVED.")
-            idx_phase_to_remove = self.list_phases.index(phase)
+        idx_phase_inserted = next(
+            (idx for idx, p in enumerate(self.list_phases_inserted) if p is phase), -1
+        )
+        if idx_phase_inserted != -1:
             assert (
-                idx_phase_to_remove != self.idx_current_phase
+                idx_phase_inserted != self.idx_current_phase_inserted
             ), f"Can't remove the current phase {phase}"
-            self.list_phases.pop(idx_phase_to_remove)
-            # Update the index of the current phase and the first night phase
-            if idx_phase_to_remove <= self.idx_current_phase:
-                self.idx_current_phase -= 1
-            if phase.is_day_phase():
-                self.idx_first_night_phase -= 1
+            self.list_phases_inserted.pop(idx_phase_inserted)
+            if idx_phase_inserted < self.idx_current_phase_inserted:
+                self.idx_current_phase_inserted -= 1
+            if self.state.common_obs.do_log_infos:
+                self.state.common_obs.log(f"Attempting removing phase {phase}... REMOVED.")
+            return
+        idx_phase_to_remove = self.dict_id_phase_to_idx.get(phase.get_id())
+        if idx_phase_to_remove is None or not self.are_active[idx_phase_to_remove]:
+            if self.state.common_obs.do_log_infos:
+                self.state.common_obs.log(
+                    f"Attempting removing phase {phase}... but it is not present in the list of phases."
+                )
+            return  # nothing to do
+        assert not (
+            idx_phase_to_remove == self.idx_current_phase
+            and self.idx_current_phase_inserted == -1
+        ), f"Can't remove the current phase {phase}"
+        if self.state.common_obs.do_log_infos:
+            self.state.common_obs.log(f"Attempting removing phase {phase}... REMOVED.")
+        self.are_active[idx_phase_to_remove] = False
+        self.compile_successors()
+
+    def remove_phases_of_dead_role(self, role: RoleWW) -> None:
+        """Remove the phases associated with the role of a player who died, if no other player alive has them.
+
+        Args:
+            role (RoleWW): the role of the dead player
+        """
+        for phase in role.get_associated_phases():
+            id_phase = phase.get_id()
+            self.n_holders_by_id_phase[id_phase] -= 1
+            if self.n_holders_by_id_phase[id_phase] <= 0:
+                self.remove_phase(phase)
 
     def insert_phase(self, phase: Phase) -> None:
-        """Insert a phase in the list of phases at the next index. Also modifies the first night phase index if necessary.
+        """Insert a phase right after the current phase. It will be played once, before the next phase of the cycle.
 
         Args:
             phase (Phase): the phase to insert
         """
-        idx_next_phase = (self.idx_current_phase + 1) % len(self.list_phases)
-        self.list_phases.insert(idx_next_phase, phase)
-        self.state.common_obs.log(
-            f"[!] Inserted phase {phase} at index {idx_next_phase} (after current phase {self.list_phases[self.idx_current_phase]})."
-        )
-        # Update the index of the first night phase
-        if phase.is_day_phase():
-            self.idx_first_night_phase += 1
+        self.list_phases_inserted.insert(self.idx_current_phase_inserted + 1, phase)
+        if self.state.common_obs.do_log_infos:
+            self.state.common_obs.log(
+                f"[!] Inserted phase {phase} after current phase {self.get_current_phase()}."
+            )
 
     def get_current_phase(self) -> Phase:
         """Get the current phase."""
+        if self.idx_current_phase_inserted != -1:
+            return self.list_phases_inserted[self.idx_current_phase_inserted]
         return self.list_phases[self.idx_current_phase]
 
+    def get_current_phase_id(self) -> int:
+        """Get the id of the current phase, i.e. its index in LIST_NAMES_PHASES_ORDERED (followed by LIST_NAMES_PHASES_INSERTED)."""
+        if self.idx_current_phase_inserted != -1:
+            return self.list_phases_inserted[self.idx_current_phase_inserted].get_id()
+        return self.list_ids_phases[self.idx_current_phase]
+
+    def get_current_position(self) -> Tuple[int, int]:
+        """Get the position of the current phase : its index in the cycle, and its index among the inserted phases (-1 if it is in the cycle)."""
+        return self.idx_current_phase, self.idx_current_phase_inserted
+
     def set_current_phase(self, phase: Phase) -> None:
-        """Set the current phase to a specific phase."""
+        """Set the current phase to a specific phase of the cycle."""
+        idx_phase = self.dict_id_phase_to_idx.get(phase.get_id())
         assert (
-            phase in self.list_phases
+            idx_phase is not None and self.are_active[idx_phase]
         ), f"Phase {phase} should be in the list of phases."
-        self.state.common_obs.log(
-            f"[!] Set current phase to {phase} (was {self.list_phases[self.idx_current_phase]})."
-        )
+        if self.state.common_obs.do_log_infos:
+            self.state.common_obs.log(
+                f"[!] Set current phase to {phase} (was {self.get_current_phase()})."
+            )
         # Update the index of the current phase
-        self.idx_current_phase = self.list_phases.index(phase)
+        self.list_phases_inserted = []
+        self.idx_current_phase_inserted = -1
+        self.idx_current_phase = idx_phase
 
     def get_first_night_phase(self) -> Optional[Phase]:
         """Get the first night phase.
-        The first night phase is the first phase in the list of phases that is a night phase (the list of phases is divided in day phases followed by night phases).
+        The first night phase is the first active phase in the cycle that is a night phase (the cycle is divided in day phases followed by night phases).
 
         If there is no night phase but the game continue because there is still more than 2 factions alive, return None.
         """
-        if self.idx_first_night_phase == len(self.list_phases):
+        if self.idx_first_night_phase_active is None:
             return None
-        return self.list_phases[self.idx_first_night_phase]
+        return self.list_phases[self.idx_first_night_phase_active]
 
     def __repr__(self):
-        return (
-            f"[{self.list_phases} at phase {self.list_phases[self.idx_current_phase]}]"
-        )
+        list_phases_active = [
+            phase for phase, is_active in zip(self.list_phases, self.are_active) if is_active
+        ]
+        return f"[{list_phases_active} at phase {self.get_current_phase()}]"
 
 
 # Define elementary statutes
@@ -433,9 +532,10 @@ class StateWW(State):
         - the phase manager
         - the list of alive players
         - variables related to speeches
-        - the night attacks, an object active the night that keeps track of the attacks
+        - the array-backed core (CoreWW) holding the alive players, the factions ids and the night attacks, so that they are queried with integer operations
         - the common observation, which manage the observation of each player
         - other game variables such as the turn, the index of the subphase...
+        - the structured information (known roles, vote history) used by the "structured" observation mode
     """
 
     def __init__(
@@ -444,6 +544,7 @@ class StateWW(State):
         list_roles: List[Type],
         identities: List[Identity],
         compo: Dict[Type, Dict],
+        role_name_to_id_role: Dict[str, int] = None,
         **kwargs,
     ) -> None:
         self.n_players = n_players
@@ -452,54 +553,98 @@ class StateWW(State):
         self.config = kwargs
 
         # Initialize common observation
+        observation_mode = kwargs.get("observation_mode", "text")
+        assert observation_mode in [
+            "text",
+            "structured",
+        ], f"observation_mode must be 'text' or 'structured', but is {observation_mode}."
+        self.do_text_obs = observation_mode == "text"
         log_dir = kwargs.get("log_dir", None)
         run_name = kwargs["run_name"]
         if log_dir is not None:
-            log_file = f"{log_dir}/{run_name}.log"
-            log_file_last = f"{log_dir}/last.log"
-            list_log_files = [log_file, log_file_last]
+            list_log_files = [f"{log_dir}/{run_name}.log"]
+            # The shared file last.log is only written by single-game runs (see run.py), since other games would recreate it while it is written
+            if kwargs.get("do_log_last", False):
+                list_log_files.append(f"{log_dir}/last.log")
             config_log = kwargs.get("config_log", {})
+        else:
+            list_log_files = None
+            config_log = {}
+        if self.do_text_obs:
             self.common_obs = CommonObs(
                 n_players=self.n_players,
                 list_log_files=list_log_files,
                 config_log=config_log,
             )
         else:
-            self.common_obs = CommonObs(n_players=self.n_players)
+            self.common_obs = StructuredObservationsWW(
+                state=self,
+                n_players=self.n_players,
+                list_log_files=list_log_files,
+                config_log=config_log,
+            )
+
+        # Initialize structured information : known_roles[i, j] is the id of the role of player j as known by player i (-1 if unknown)
+        if role_name_to_id_role is None:
+            role_name_to_id_role = {
+                name: id_role
+                for id_role, name in enumerate(
+                    sorted({identity.role.get_name() for identity in identities})
+                )
+            }
+        self.role_name_to_id_role = role_name_to_id_role
+        self.known_roles = np.full((n_players, n_players), -1, dtype=np.int16)
+        self.vote_history: List[List[int]] = []
+        self.vote_history_array = np.zeros((0, n_players), dtype=np.int16)  # cache of vote_history as an array, rebuilt when a vote is added
 
         # Initialize WW game variables
         self.phase_manager = PhasesManagerWW(list_roles=list_roles, state=self)
         self.done = False
         self.turn = 0
         self.idx_subphase = 0
-        self.list_are_alive: List[bool] = [True] * self.n_players
+        self.core = CoreWW(
+            n_players=self.n_players,
+            factions=[identity.faction for identity in self.identities],
+        )
+        self.list_ids_win_condition_achieved: List[int] = []  # the players whose role's win condition is achieved, kept up to date by the roles
+        for identity in self.identities:
+            identity.set_core(self.core)
+            identity.role.set_win_condition_registry(self.list_ids_win_condition_achieved)
+            if identity.has_status(StatusIsWolf):
+                self.core.add_wolf(identity.id_player)
+        self.list_are_alive: np.ndarray = self.core.are_alive  # the same array, written through by apply_death_consequences
         self.order_speech = None
         self.idx_speech = None
         self.order_speech_wolf = None
         self.idx_speech_wolf = None
-        self.night_attacks: Dict[int, Set[CauseOfDeath]] = None
 
         # Send first messages
-        self.common_obs.add_global_message("The game has started.")
-        description_compo_listing = self.get_compo_listing()
-        self.common_obs.add_global_message(
-            f"The composition of the game is : \n{description_compo_listing}"
-        )
-        for id_player, identity in enumerate(self.identities):
-            self.common_obs.add_message(
-                text=(
-                    f"You are player {id_player}. "
-                    f"Your role is {identity.role.get_name()}, you win with the faction {identity.faction}. "
-                    f"\nDescription of your role : {identity.role.get_textual_description()}"
-                ),
-                idx_player=id_player,
+        if self.do_text_obs:
+            self.common_obs.add_global_message("The game has started.")
+            description_compo_listing = self.get_compo_listing()
+            self.common_obs.add_global_message(
+                f"The composition of the game is : \n{description_compo_listing}"
             )
+            for id_player, identity in enumerate(self.identities):
+                self.common_obs.add_message(
+                    text=(
+                        f"You are player {id_player}. "
+                        f"Your role is {identity.role.get_name()}, you win with the faction {identity.faction}. "
+                        f"\nDescription of your role : {identity.role.get_textual_description()}"
+                    ),
+                    idx_player=id_player,
+                )
+        for id_player in range(self.n_players):
+            self.reveal_role(id_player, list_idx_observers=[id_player])
         # Inform the wolf players of their identity
         list_id_wolves = self.get_list_id_wolves_alive()
-        self.common_obs.add_specific_message(
-            f"[Private Wolf Chat] You see the wolves are composed of : {list_id_wolves}.",
-            list_idx_player=list_id_wolves,
-        )
+        if self.do_text_obs:
+            self.common_obs.add_specific_message(
+                f"[Private Wolf Chat] You see the wolves are composed of : {list_id_wolves}.",
+                list_idx_player=list_id_wolves,
+            )
+        for id_wolf in list_id_wolves:
+            self.reveal_role(id_wolf, list_idx_observers=list_id_wolves)
         # Initialize the couple
         if self.config["do_couple"]:
             self.couple = random.sample(range(self.n_players), 2)
@@ -514,6 +659,7 @@ class StateWW(State):
                     ),
                     idx_player=id1,
                 )
+                self.reveal_role(id2, list_idx_observers=[id1])
         else:
             self.couple = None
 
@@ -613,14 +759,12 @@ class StateWW(State):
             state (StateWW): the current state of the game
         """
         # Start a new day speech
-        self.common_obs.add_global_message(
-            f"Day {self.turn+1} has started. Players will now be able to speak in a random order before the vote.",
-        )
+        if self.do_text_obs:
+            self.common_obs.add_global_message(
+                f"Day {self.turn+1} has started. Players will now be able to speak in a random order before the vote.",
+            )
         # Define the order of speech
-        list_id_players_alive = [
-            i for i in range(self.n_players) if self.list_are_alive[i]
-        ]
-        self.order_speech = list_id_players_alive.copy()
+        self.order_speech = self.get_list_id_players_alive()
         random.shuffle(self.order_speech)  # TODO : uncomment this line
         self.idx_speech = 0
 
@@ -632,10 +776,11 @@ class StateWW(State):
         """
         # Start a new day speech
         list_id_wolves_alive = self.get_list_id_wolves_alive()
-        self.common_obs.add_specific_message(
-            f"[Private Wolf Chat] Night {self.turn+1} has started. You and the other wolves will now be able to speak in private, in a random order, before choosing your target. You must choose wisely.",
-            list_idx_player=list_id_wolves_alive,
-        )
+        if self.do_text_obs:
+            self.common_obs.add_specific_message(
+                f"[Private Wolf Chat] Night {self.turn+1} has started. You and the other wolves will now be able to speak in private, in a random order, before choosing your target. You must choose wisely.",
+                list_idx_player=list_id_wolves_alive,
+            )
         # Define the order of speech
         self.order_speech_wolf = list_id_wolves_alive.copy()
         random.shuffle(self.order_speech_wolf)
@@ -647,28 +792,32 @@ class StateWW(State):
         Args:
             state (StateWW): the current state of the game
         """
-        self.common_obs.add_global_message(
-            f"Night {self.turn} is over. The village awaken."
-        )
+        if self.do_text_obs:
+            self.common_obs.add_global_message(
+                f"Night {self.turn} is over. The village awaken."
+            )
         # if (
         #     self.night_attacks == RoleJudge.ABSENT_NIGHT_INDICATOR
         # ):  # happens if Judge decided to create a 2nd vote
         # pass
         # Protection statuses are applied first
         for id_player in self.get_list_id_players_alive():
-            for status in self.identities[id_player].statutes:
+            if not self.identities[id_player].has_status(StatusBaseProtection):
+                continue
+            for status in list(self.identities[id_player].statutes):  # protections can remove themselves
                 if isinstance(status, StatusBaseProtection):
                     status.apply_protection_status(self, id_player)
-        if sum(len(causes) for causes in self.night_attacks.values()) == 0:
-            self.common_obs.add_global_message("No one has died during the night.")
+        list_ids_attacked = self.core.get_ids_attacked()
+        if len(list_ids_attacked) == 0:
+            if self.do_text_obs:
+                self.common_obs.add_global_message("No one has died during the night.")
         else:
-            items = list(self.night_attacks.items())
-            random.shuffle(items)  # Randomize the order of the deaths to avoid bias
+            random.shuffle(list_ids_attacked)  # Randomize the order of the deaths to avoid bias
             # Then the deaths are applied
-            for id_player, causes in self.night_attacks.items():
-                for cause in causes:
+            for id_player in list_ids_attacked:
+                for cause in self.core.get_causes_attacks(id_player):
                     self.apply_death_consequences(id_player, cause)
-        self.night_attacks = None  # Reset the night deaths for good measure
+        self.core.reset_attacks()  # Reset the night deaths for good measure
 
     def apply_death_consequences(
         self,
@@ -692,9 +841,10 @@ class StateWW(State):
         """
         # Skip if the player is already dead
         if not self.list_are_alive[id_player]:
-            self.common_obs.log(
-                f"[!] Player {id_player} was supposed to die but is already dead."
-            )
+            if self.common_obs.do_log_infos:
+                self.common_obs.log(
+                    f"[!] Player {id_player} was supposed to die but is already dead."
+                )
             return
 
         role_eliminated_player = self.identities[id_player].role
@@ -706,54 +856,54 @@ class StateWW(State):
             self, id_player, cause
         ):
             is_death_confirmed = False
-            self.common_obs.log(
-                f"[!] Player {id_player} was supposed to die but their role {role_eliminated_player} prevented it."
-            )
+            if self.common_obs.do_log_infos:
+                self.common_obs.log(
+                    f"[!] Player {id_player} was supposed to die but their role {role_eliminated_player} prevented it."
+                )
         if not cause.apply_death_announcement_and_confirm(self, id_player):
             is_death_confirmed = False
-            self.common_obs.log(
-                f"[!] Player {id_player} was supposed to die but the cause of death {cause} prevented it."
-            )
+            if self.common_obs.do_log_infos:
+                self.common_obs.log(
+                    f"[!] Player {id_player} was supposed to die but the cause of death {cause} prevented it."
+                )
         for status in statutes_eliminated_player:
             if not status.apply_death_announcement_and_confirm(self, id_player, cause):
                 is_death_confirmed = False
-                self.common_obs.log(
-                    f"[!] Player {id_player} was supposed to die but their status {status} prevented it."
-                )
+                if self.common_obs.do_log_infos:
+                    self.common_obs.log(
+                        f"[!] Player {id_player} was supposed to die but their status {status} prevented it."
+                    )
         if not is_death_confirmed:
             return
 
         # Kill the player
-        self.list_are_alive[id_player] = False
-        self.common_obs.log(
-            f"Player {id_player} has died of {cause}. Role : {role_eliminated_player}."
-        )
+        self.core.kill(id_player)
+        if self.common_obs.do_log_infos:
+            self.common_obs.log(
+                f"Player {id_player} has died of {cause}. Role : {role_eliminated_player}."
+            )
 
         # Remove the phase associated with the role of the player if no other alive roles have it
-        for phase in role_eliminated_player.get_associated_phases():
-            if not any(
-                phase in self.identities[i].role.get_associated_phases()
-                and self.list_are_alive[i]
-                for i in range(self.n_players)
-            ):
-                self.phase_manager.remove_phase(phase)
+        self.phase_manager.remove_phases_of_dead_role(role_eliminated_player)
 
         # Inform the board and the player of the death
-        if not cause.is_day_cause_of_death():
+        if self.do_text_obs:
+            if not cause.is_day_cause_of_death():
+                self.common_obs.add_global_message(
+                    f"Player {id_player} has died during the night."
+                )
+            else:
+                message_cause_of_death = cause.get_message_on_death(self, id_player)
+                self.common_obs.add_global_message(message_cause_of_death)
+
             self.common_obs.add_global_message(
-                f"Player {id_player} has died during the night."
+                f"The role of player {id_player} was {role_eliminated_player}."
             )
-        else:
-            message_cause_of_death = cause.get_message_on_death(self, id_player)
-            self.common_obs.add_global_message(message_cause_of_death)
-
-        self.common_obs.add_global_message(
-            f"The role of player {id_player} was {role_eliminated_player}."
-        )
-        self.common_obs.add_message(
-            f"You have been eliminated from the game.",
-            idx_player=id_player,
-        )
+            self.common_obs.add_message(
+                f"You have been eliminated from the game.",
+                idx_player=id_player,
+            )
+        self.reveal_role(id_player)
 
         # Deal with special cases of consequences of the death
         role_eliminated_player.apply_death_consequences(self, id_player, cause)
@@ -762,31 +912,106 @@ class StateWW(State):
             status.apply_death_consequences(self, id_player, cause)
         return
 
+    def reveal_role(
+        self,
+        id_player: int,
+        list_idx_observers: Optional[List[int]] = None,
+        role_name: Optional[str] = None,
+    ):
+        """Register in the structured information that some players now know the role of a player.
+
+        Args:
+            id_player (int): the player whose role is revealed
+            list_idx_observers (Optional[List[int]], optional): the players that see the role, or None for all players. Defaults to None.
+            role_name (Optional[str], optional): the role name seen by the observers, if different from the true role name (e.g. appearance name). Defaults to None.
+        """
+        if role_name is None:
+            role_name = self.identities[id_player].role.get_name()
+        id_role = self.role_name_to_id_role.get(role_name, -1)
+        if list_idx_observers is None:
+            self.known_roles[:, id_player] = id_role
+        else:
+            self.known_roles[list_idx_observers, id_player] = id_role
+
     def turn_player_into_wolf(self, id_player: int):
-        self.common_obs.log(f"[!] Player {id_player} is turned into a wolf.")
+        if self.common_obs.do_log_infos:
+            self.common_obs.log(f"[!] Player {id_player} is turned into a wolf.")
         list_ids_wolves_alive = self.get_list_id_wolves_alive()
-        self.common_obs.add_specific_message(
-            f"Player {id_player} has joined the wolves.",
-            list_ids_wolves_alive,
-        )
+        if self.do_text_obs:
+            self.common_obs.add_specific_message(
+                f"Player {id_player} has joined the wolves.",
+                list_ids_wolves_alive,
+            )
         self.identities[id_player].change_faction(FactionsWW.WEREWOLVES)
         self.identities[id_player].add_status(StatusIsWolf())
-        self.common_obs.add_message(
-            f"You joined the wolves. You see the other wolves are composed of players {', '.join([str(i) for i in list_ids_wolves_alive])}.",
-            idx_player=id_player,
-        )
+        self.core.add_wolf(id_player)
+        if self.do_text_obs:
+            self.common_obs.add_message(
+                f"You joined the wolves. You see the other wolves are composed of players {', '.join([str(i) for i in list_ids_wolves_alive])}.",
+                idx_player=id_player,
+            )
+
+    def reshuffle_roles(self, list_ids_players: List[int]) -> None:
+        """Randomly permute the roles of some players alive among them, e.g. to sample a determinization of the state.
+        Each role moves with its internal state (e.g. the potions of the Witch) and the statutes it gives, while the statutes and factions
+        acquired during the game (e.g. couple, protections) stay with the players. The core, the registry of win conditions, the known roles
+        and the phases of the roles (which hold the id of their player) are updated accordingly. The roles of the players alive are only permuted,
+        so the schedule itself (active phases, counts of holders, current position) stays valid.
+
+        Args:
+            list_ids_players (List[int]): the ids of the players whose roles are permuted, who must be alive
+        """
+        list_roles = [self.identities[id_player].role for id_player in list_ids_players]
+        list_statutes_roles = [
+            self.identities[id_player].pop_statutes_of_role() for id_player in list_ids_players
+        ]
+        permutation = list(range(len(list_ids_players)))
+        random.shuffle(permutation)
+        for id_player, idx_role in zip(list_ids_players, permutation):
+            identity = self.identities[id_player]
+            identity.set_role(list_roles[idx_role], list_statutes_roles[idx_role])
+            if identity.has_status(StatusIsWolf):
+                self.core.add_wolf(id_player)
+            else:
+                self.core.remove_wolf(id_player)
+        # Rebuild the phases of the roles, which may hold the id of the player having the role
+        self.list_roles = [identity.role for identity in self.identities]
+        self.phase_manager.rebuild_phases_of_roles(self.list_roles)
+        # Update the registry of win conditions with the new ids of the roles
+        self.list_ids_win_condition_achieved.clear()
+        for identity in self.identities:
+            identity.role.set_win_condition_registry(self.list_ids_win_condition_achieved)
+        # Players only know their own new role, and the wolves know each other
+        list_ids_wolves = self.get_list_id_wolves_alive()
+        for id_player in list_ids_players:
+            self.known_roles[:, id_player] = -1
+            self.reveal_role(id_player, list_idx_observers=[id_player])
+            if id_player in list_ids_wolves:
+                self.reveal_role(id_player, list_idx_observers=list_ids_wolves)
+                for id_wolf in list_ids_wolves:
+                    self.reveal_role(id_wolf, list_idx_observers=[id_player])
+
+    def clone(self) -> "StateWW":
+        """Return a copy of the state that can be stepped independently.
+        The game data (identities, roles, statutes, phases, alive players...) is deep-copied, while the config is shared
+        and the common observation is cloned without its logger.
+        """
+        memo = {
+            id(self.config): self.config,
+            id(self.role_name_to_id_role): self.role_name_to_id_role,
+        }
+        return deepcopy(self, memo)
 
     # ===== Getter/Checker methods =====
 
     def get_feedback_eventual_victory(self) -> Optional[Tuple]:
         # Start by checking win conditions
-        identities_alive = {
-            i: self.identities[i] for i in self.get_list_id_players_alive()
-        }
         winning_factions_by_conditions = []
-        for i, identity in identities_alive.items():
-            # Unsure the current player faction is the same as the faction of its role
-            if identity.role.is_win_condition_achieved and (
+        for i in self.list_ids_win_condition_achieved:
+            identity = self.identities[i]
+            # Unsure the player is alive and its current faction is the same as the faction of its role
+            assert identity.role.is_win_condition_achieved, f"Player {i} is registered as having achieved its win condition, but its role has not."
+            if self.core.are_alive[i] and (
                 identity.faction == identity.role.get_initial_faction()
             ):
                 winning_factions_by_conditions.append(
@@ -802,18 +1027,14 @@ class StateWW(State):
             )
         else:
             # Multiple factions have won, they each get +1 reward.
-            self.common_obs.add_global_message(
-                f"Multiple factions have won the game together : {', '.join(winning_factions_by_conditions)}."
-            )
+            if self.do_text_obs:
+                self.common_obs.add_global_message(
+                    f"Multiple factions have won the game together : {', '.join(winning_factions_by_conditions)}."
+                )
             return self.step_return_victory_of_faction(winning_factions_by_conditions)
 
         # Check if the game is over for faction reasons
-        set_factions_alive = {
-            self.identities[i].faction
-            for i in range(self.n_players)
-            if self.list_are_alive[i]
-        }
-        if len(set_factions_alive) <= 1:
+        if self.core.get_n_factions_alive() <= 1:
             return self.step_return_victory_remaining_faction()
 
         # Else, return None (the game is not over)
@@ -855,13 +1076,50 @@ class StateWW(State):
             {},
         )
 
+    def get_structured_obs(self, id_player: int) -> Dict[str, Any]:
+        """Return the observation of a player in the "structured" observation mode.
+
+        Args:
+            id_player (int): the id of the player
+
+        Returns:
+            Dict[str, Any]: a dictionnary with the following keys :
+                - "id_player" (int) : the id of the player
+                - "turn" (int) : the current turn
+                - "id_phase" (int) : the id of the current phase (see PhasesManagerWW.get_current_phase_id)
+                - "alive" (np.ndarray) : the boolean mask of alive players, of shape (n_players,)
+                - "known_roles" (np.ndarray) : the id of the role of each player as known by the player (-1 if unknown), of shape (n_players,)
+                - "vote_history" (np.ndarray) : the target of each player at each day vote (-1 if no vote), of shape (n_votes, n_players)
+        """
+        return {
+            "id_player": id_player,
+            "turn": self.turn,
+            "id_phase": self.phase_manager.get_current_phase_id(),
+            "alive": self.core.are_alive.copy(),
+            "known_roles": self.known_roles[id_player].copy(),
+            "vote_history": self.get_vote_history_array(),
+        }
+
+    def get_vote_history_array(self) -> np.ndarray:
+        """Return the vote history as a read-only array of shape (n_votes, n_players), rebuilt only when a vote was added since the last call.
+
+        Returns:
+            np.ndarray: the target of each player at each day vote (-1 if no vote)
+        """
+        if self.vote_history_array.shape[0] != len(self.vote_history):
+            self.vote_history_array = np.array(self.vote_history, dtype=np.int16).reshape(
+                -1, self.n_players
+            )
+            self.vote_history_array.flags.writeable = False
+        return self.vote_history_array
+
     def get_list_id_players_alive(self) -> List[int]:
         """Return the list of the ids of the players that are still alive in the game.
 
         Returns:
             List[int]: the list of the ids of alive players
         """
-        return [i for i in range(self.n_players) if self.list_are_alive[i]]
+        return self.core.get_ids_alive()
 
     def get_list_id_wolves_alive(self) -> List[int]:
         """Return the list of the ids of the wolves that are still alive in the game.
@@ -869,20 +1127,18 @@ class StateWW(State):
         Returns:
             List[int]: the list of the ids of alive wolves
         """
-        return [
-            i
-            for i in range(self.n_players)
-            if (
-                self.identities[i].has_status(StatusIsWolf()) and self.list_are_alive[i]
-            )
-        ]
+        return self.core.get_ids_wolves_alive()
+
+    def set_win_condition_achieved(self, id_player: int) -> None:
+        """Register that the win condition of the role of a player is achieved : its faction will win at the next victory check if the player is still alive.
+
+        Args:
+            id_player (int): the id of the player
+        """
+        self.identities[id_player].role.is_win_condition_achieved = True  # registered in list_ids_win_condition_achieved by the role
 
     def get_ids_wolf_victims(self) -> List[int]:
-        ids_wolf_victims = [
-            id_player
-            for id_player, causes in self.night_attacks.items()
-            if CauseWolfAttack() in causes
-        ]
+        ids_wolf_victims = self.core.get_ids_attacked(CauseWolfAttack())
         assert (
             len(ids_wolf_victims) <= 1
         ), "There should be at most one wolf victim. (Not implemented yet)"
@@ -897,36 +1153,33 @@ class StateWW(State):
             Tuple: the .step() returns
         """
         set_factions_alive = {
-            self.identities[i].faction
-            for i in range(self.n_players)
-            if self.list_are_alive[i]
+            self.identities[i].faction for i in self.get_list_id_players_alive()
         }
         # If all players are dead, it is a draw
         if len(set_factions_alive) == 0:
-            assert all(
-                not self.list_are_alive[i] for i in range(self.n_players)
-            ), "All players should be dead."
-            self.common_obs.add_global_message(
-                "All players are dead. The game is a draw."
-            )
+            assert not self.core.are_alive.any(), "All players should be dead."
+            if self.do_text_obs:
+                self.common_obs.add_global_message(
+                    "All players are dead. The game is a draw."
+                )
             self.common_obs.log("[!] All players are dead. The game is a draw.")
             return self.step_return_victory_of_faction(
-                self,
                 None,
             )
         elif len(set_factions_alive) == 1:
             faction_winner = set_factions_alive.pop()
             assert all(
                 self.identities[i].faction == faction_winner
-                for i in range(self.n_players)
-                if self.list_are_alive[i]
+                for i in self.get_list_id_players_alive()
             ), f"All alive players should be in the same faction : {faction_winner}."
-            self.common_obs.log(
-                f"[!] All players alive are in the faction {faction_winner}. The game is won by the {faction_winner}."
-            )
-            self.common_obs.add_global_message(
-                f"All players alive are in the faction {faction_winner}. The game is won by the {faction_winner}."
-            )
+            if self.common_obs.do_log_infos:
+                self.common_obs.log(
+                    f"[!] All players alive are in the faction {faction_winner}. The game is won by the {faction_winner}."
+                )
+            if self.do_text_obs:
+                self.common_obs.add_global_message(
+                    f"All players alive are in the faction {faction_winner}. The game is won by the {faction_winner}."
+                )
             return self.step_return_victory_of_faction(
                 faction_winner,
             )
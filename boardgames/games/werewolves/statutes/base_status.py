@@ -1,12 +1,49 @@
 from abc import ABC, abstractmethod
+from copy import deepcopy
 from enum import Enum
-from typing import Set
+from typing import Dict, List, Set, Type
 
 from boardgames.games.werewolves.causes_of_deaths.base_cause import CauseOfDeath
 from boardgames.types import State
 
 
+# Registry of the classes of statuses : each class gets its own bit, so that the statuses of a player are stored as an int bitmask
+LIST_STATUS_CLASSES_REGISTERED: List[Type["Status"]] = []
+# The unique instance of each stateless class of status
+DICT_STATUS_CLASS_TO_INSTANCE: Dict[Type["Status"], "Status"] = {}
+
+
 class Status(ABC):
+    """A status of a player. Each subclass gets at its definition an integer bit (the class attribute bit), used by Identity to store statuses as a bitmask.
+    The class attribute bits is its bit and the bits of its parent classes, so that a player having a status also has the statuses of its parent classes
+    (e.g. identity.has_status(StatusBaseProtection) is True for a player protected by the bodyguard).
+
+    Statuses that don't define __init__ are stateless : they are interned, i.e. StatusIsWolf() always returns the same instance,
+    so that checks like identity.has_status(StatusIsWolf()) don't allocate. Statuses defining __init__ (e.g. with the id of another player) are regular objects.
+    """
+
+    bit: int = 0
+    bits: int = 0
+    is_interned: bool = False
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.bit = 1 << len(LIST_STATUS_CLASSES_REGISTERED)
+        cls.bits = cls.bit
+        for parent in cls.__mro__[1:]:
+            if issubclass(parent, Status):
+                cls.bits |= parent.bit
+        LIST_STATUS_CLASSES_REGISTERED.append(cls)
+        cls.is_interned = cls.__init__ is object.__init__
+
+    def __new__(cls, *args, **kwargs) -> "Status":
+        if not cls.is_interned:
+            return super().__new__(cls)
+        instance = DICT_STATUS_CLASS_TO_INSTANCE.get(cls)
+        if instance is None:
+            instance = super().__new__(cls)
+            DICT_STATUS_CLASS_TO_INSTANCE[cls] = instance
+        return instance
 
     @abstractmethod
     def get_name(self) -> str:
@@ -70,7 +107,20 @@ class Status(ABC):
         """By default, two statuses are equal if they have the same name.
         This method can be overriden if needed.
         """
-        return self.get_name() == other.get_name()
+        return self is other or self.get_name() == other.get_name()
+
+    def __hash__(self) -> int:
+        return hash(self.get_name())
+
+    def __deepcopy__(self, memo: Dict[int, object]) -> "Status":
+        """Interned statuses are shared by all states, so copying a state doesn't copy them."""
+        if type(self).is_interned:
+            return self
+        clone = type(self).__new__(type(self))
+        memo[id(self)] = clone
+        for key, value in self.__dict__.items():
+            setattr(clone, key, deepcopy(value, memo))
+        return clone
 
 
 class StatusBaseProtection(Status):
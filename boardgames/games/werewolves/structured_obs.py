@@ -0,0 +1,61 @@
+from copy import deepcopy
+from typing import Any, Dict, List, Optional, Union
+
+from boardgames.common_obs import CommonObs
+
+
+class StructuredObservationsWW(CommonObs):
+    """The observations of the Werewolves game in the "structured" observation mode.
+
+    Instead of accumulating English messages, the observation of a player is a dictionnary of numeric arrays
+    built from the state when the observation is read (see StateWW.get_structured_obs).
+    All message methods are no-ops, so the text of the messages is never stored nor joined.
+    Logging of infos (with .log()) still works as in CommonObs.
+    """
+
+    def __init__(
+        self,
+        state: Any,
+        n_players: int = 5,
+        list_log_files: List[str] = None,
+        config_log: Dict[str, Union[str, int]] = {},
+    ) -> None:
+        super().__init__(
+            n_players=n_players,
+            list_log_files=list_log_files,
+            config_log=config_log,
+        )
+        self.state = state
+
+    def add_message(self, text: str, idx_player: int, do_log: bool = True):
+        pass
+
+    def add_specific_message(
+        self,
+        text: str,
+        list_idx_player: List[int],
+        except_idx: Union[None, int, List[int]] = None,
+        do_log: bool = True,
+    ):
+        pass
+
+    def add_global_message(
+        self, text: str, except_idx: Union[None, int, List[int]] = None, do_log: bool = True
+    ):
+        pass
+
+    def reset(self, idx_player: int):
+        pass
+
+    # ==== List interface ====
+    def get_obs(self, idx_player: int) -> Dict[str, Any]:
+        """Return the structured observation of a player, computed from the current state."""
+        return self.state.get_structured_obs(idx_player)
+
+    def __setitem__(self, idx: int, text: Optional[str]) -> None:
+        pass
+
+    def __deepcopy__(self, memo: Dict[int, object]) -> "StructuredObservationsWW":
+        clone = super().__deepcopy__(memo)
+        clone.state = deepcopy(self.state, memo)
+        return clone
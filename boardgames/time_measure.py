@@ -1,20 +1,126 @@
-from collections import defaultdict
+import threading
 import time
-from typing import Any, Callable, Dict, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 
 def timeit(func: Callable[..., Any]) -> Callable[..., Union[Any, float]]:
     """A wrapper function to return the result of the function and the time it took to execute it."""
 
     def time_measured_func(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = func(*args, **kwargs)
-        end_time = time.time()
+        end_time = time.perf_counter()
         return result, end_time - start_time
 
     return time_measured_func
 
 
+class StageStats:
+    """The runtime statistics of a stage : cumulative time, number of calls, last call and a histogram of the durations.
+
+    The histogram has fixed log-scale buckets (8 buckets per power of 2, so a relative error of at most ~6% on the percentiles),
+    so that two histograms, e.g. measured in different threads or processes, are merged by adding the counts of their buckets.
+    All durations are in nanoseconds.
+    """
+
+    __slots__ = ("cum_ns", "n_calls", "last_ns", "time_end_last_ns", "histogram")
+
+    n_bits_sub_buckets: int = 3  # 2**3 buckets per power of 2
+
+    def __init__(self) -> None:
+        self.cum_ns: int = 0
+        self.n_calls: int = 0
+        self.last_ns: Optional[int] = None
+        self.time_end_last_ns: int = 0  # used to know which last call is the most recent when merging
+        self.histogram: Dict[int, int] = {}
+
+    def add(self, duration_ns: int, time_end_ns: int, n_calls: int = 1) -> None:
+        """Add a measure of the stage.
+
+        Args:
+            duration_ns (int): the duration of the measure
+            time_end_ns (int): the end time of the measure (perf_counter_ns)
+            n_calls (int, optional): the number of calls to the stage the measure covers. Defaults to 1.
+        """
+        self.cum_ns += duration_ns
+        self.n_calls += n_calls
+        self.last_ns = duration_ns
+        self.time_end_last_ns = time_end_ns
+        idx_bucket = self.get_idx_bucket(duration_ns // n_calls if n_calls > 1 else duration_ns)
+        self.histogram[idx_bucket] = self.histogram.get(idx_bucket, 0) + n_calls
+
+    def merge(self, other: "StageStats") -> "StageStats":
+        """Merge the statistics of another measure of the same stage into this one (in place).
+
+        Args:
+            other (StageStats): the other statistics
+
+        Returns:
+            StageStats: self
+        """
+        self.cum_ns += other.cum_ns
+        self.n_calls += other.n_calls
+        if other.last_ns is not None and other.time_end_last_ns >= self.time_end_last_ns:
+            self.last_ns = other.last_ns
+            self.time_end_last_ns = other.time_end_last_ns
+        for idx_bucket, count in other.histogram.items():
+            self.histogram[idx_bucket] = self.histogram.get(idx_bucket, 0) + count
+        return self
+
+    def copy(self) -> "StageStats":
+        return StageStats().merge(self)
+
+    def get_percentile(self, q: float) -> float:
+        """Return an estimation of a percentile of the durations of the calls.
+
+        Args:
+            q (float): the percentile, between 0 and 100
+
+        Returns:
+            float: the estimated percentile, in nanoseconds (0 if there are no calls)
+        """
+        n_calls_total = sum(self.histogram.values())
+        if n_calls_total == 0:
+            return 0
+        rank = q / 100 * n_calls_total
+        n_calls_cum = 0
+        for idx_bucket in sorted(self.histogram):
+            n_calls_cum += self.histogram[idx_bucket]
+            if n_calls_cum >= rank:
+                return self.get_bucket_value(idx_bucket)
+        return self.get_bucket_value(max(self.histogram))
+
+    @classmethod
+    def get_idx_bucket(cls, duration_ns: int) -> int:
+        """Return the index of the bucket of a duration : durations are exact below 2**(n_bits_sub_buckets+1) ns,
+        then each power of 2 is split in 2**n_bits_sub_buckets buckets.
+        """
+        shift = max(0, duration_ns.bit_length() - cls.n_bits_sub_buckets - 1)
+        return (shift << cls.n_bits_sub_buckets) + (duration_ns >> shift)
+
+    @classmethod
+    def get_bucket_value(cls, idx_bucket: int) -> float:
+        """Return the duration represented by a bucket, i.e. the middle of the bucket."""
+        shift = max(0, (idx_bucket >> cls.n_bits_sub_buckets) - 1)
+        mantissa = idx_bucket - (shift << cls.n_bits_sub_buckets)
+        return (mantissa << shift) + ((1 << shift) - 1) / 2
+
+
+class NullRuntimeMeter:
+    """The context manager returned by RuntimeMeter when it is disabled. It does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+NULL_RUNTIME_METER = NullRuntimeMeter()
+
+
 class RuntimeMeter:
     """A context manager class to measure the time of various stages of the code take.
 
@@ -30,12 +136,110 @@ class RuntimeMeter:
 
     training_time = RuntimeMeter.get_runtime("train")
     eval_time = RuntimeMeter.get_runtime("eval")
+
+    Times are measured with perf_counter_ns. Each thread accumulates its measures in its own statistics, without locking,
+    and the statistics of all threads are merged when they are read.
+    Statistics measured in other processes can be exported with RuntimeMeter.export_stats() and merged with RuntimeMeter.merge_stats().
+    When disabled with RuntimeMeter.set_enabled(False), RuntimeMeter(...) returns a shared no-op context manager,
+    so that the cost of a measured stage is only the cost of the call.
     """
 
-    stage_name_to_cum_runtime: Dict[str, float] = defaultdict(lambda: 0)
-    stage_name_to_last_runtime: Dict[str, float] = defaultdict(lambda: None)
-    stage_name_to_num_calls: Dict[str, int] = defaultdict(lambda: 0)
+    is_enabled: bool = True
+    # The statistics of each thread, registered once per thread
+    thread_local = threading.local()
+    list_thread_stage_name_to_stats: List[Dict[str, StageStats]] = []
+    lock_registry = threading.Lock()
+    # The statistics merged from other processes
+    merged_stage_name_to_stats: Dict[str, StageStats] = {}
+
+    def __new__(cls, stage_name: str, n_calls: int = 1):
+        if not cls.is_enabled:
+            return NULL_RUNTIME_METER
+        return super().__new__(cls)
+
+    def __init__(self, stage_name: str, n_calls: int = 1):
+        """Initialize the RuntimeMeter.
+
+        Args:
+            stage_name (str): a string identifying the stage.
+            n_calls (int, optional): the number of calls to the stage. Defaults to 1.
+        """
+        self.stage_name = stage_name
+        self.n_calls = n_calls
+
+    def __enter__(self):
+        self.start_time = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end_time = time.perf_counter_ns()
+        stage_name_to_stats = RuntimeMeter.get_thread_stats()
+        stats = stage_name_to_stats.get(self.stage_name)
+        if stats is None:
+            stats = stage_name_to_stats[self.stage_name] = StageStats()
+        stats.add(end_time - self.start_time, end_time, self.n_calls)
+
+    # ==== Storage ====
+    @staticmethod
+    def get_thread_stats() -> Dict[str, StageStats]:
+        """Return the statistics of the current thread, registering them at the first call of the thread."""
+        try:
+            return RuntimeMeter.thread_local.stage_name_to_stats
+        except AttributeError:
+            stage_name_to_stats: Dict[str, StageStats] = {}
+            with RuntimeMeter.lock_registry:
+                RuntimeMeter.list_thread_stage_name_to_stats.append(stage_name_to_stats)
+            RuntimeMeter.thread_local.stage_name_to_stats = stage_name_to_stats
+            return stage_name_to_stats
+
+    @staticmethod
+    def set_enabled(is_enabled: bool) -> None:
+        """Enable or disable the measures. Statistics already measured are kept."""
+        RuntimeMeter.is_enabled = is_enabled
+
+    @staticmethod
+    def reset() -> None:
+        """Clear the statistics of all threads and the statistics merged from other processes."""
+        with RuntimeMeter.lock_registry:
+            for stage_name_to_stats in RuntimeMeter.list_thread_stage_name_to_stats:
+                stage_name_to_stats.clear()
+            RuntimeMeter.merged_stage_name_to_stats.clear()
+
+    @staticmethod
+    def export_stats() -> Dict[str, StageStats]:
+        """Return a snapshot of the statistics of all threads (and of the statistics already merged), merged by stage.
+        It can be pickled, e.g. to be sent from a worker process to the main process.
+
+        Returns:
+            Dict[str, StageStats]: a dictionnary mapping the stage names to their statistics.
+        """
+        with RuntimeMeter.lock_registry:
+            list_stage_name_to_stats = list(RuntimeMeter.list_thread_stage_name_to_stats)
+        list_stage_name_to_stats.append(RuntimeMeter.merged_stage_name_to_stats)
+        stage_name_to_stats_merged: Dict[str, StageStats] = {}
+        for stage_name_to_stats in list_stage_name_to_stats:
+            for stage_name, stats in list(stage_name_to_stats.items()):
+                if stage_name in stage_name_to_stats_merged:
+                    stage_name_to_stats_merged[stage_name].merge(stats)
+                else:
+                    stage_name_to_stats_merged[stage_name] = stats.copy()
+        return stage_name_to_stats_merged
+
+    @staticmethod
+    def merge_stats(stage_name_to_stats: Dict[str, StageStats]) -> None:
+        """Merge statistics exported by RuntimeMeter.export_stats() (e.g. in another process) into the statistics of this process.
 
+        Args:
+            stage_name_to_stats (Dict[str, StageStats]): the statistics to merge.
+        """
+        with RuntimeMeter.lock_registry:
+            for stage_name, stats in stage_name_to_stats.items():
+                if stage_name in RuntimeMeter.merged_stage_name_to_stats:
+                    RuntimeMeter.merged_stage_name_to_stats[stage_name].merge(stats)
+                else:
+                    RuntimeMeter.merged_stage_name_to_stats[stage_name] = stats.copy()
+
+    # ==== Getters ====
     @staticmethod
     def get_stage_runtime(stage_name: str) -> float:
         """Return the cumulative time taken by the stage.
@@ -49,11 +253,11 @@ class RuntimeMeter:
             float: the cumulative time taken by the stage.
         """
         if stage_name == "total":
-            return sum(RuntimeMeter.stage_name_to_cum_runtime.values())
-        elif stage_name not in RuntimeMeter.stage_name_to_cum_runtime:
+            return RuntimeMeter.get_total_runtime()
+        stats = RuntimeMeter.export_stats().get(stage_name)
+        if stats is None:
             return 0
-        else:
-            return RuntimeMeter.stage_name_to_cum_runtime[stage_name]
+        return stats.cum_ns / 1e9
 
     @staticmethod
     def get_averaged_stage_runtime(stage_name: str) -> float:
@@ -61,29 +265,46 @@ class RuntimeMeter:
 
         Args:
             stage_name (str): the name of the stage, as it was used in the context manager.
-                        
+
         Returns:
             float: the average time taken by the stage.
         """
-        if stage_name not in RuntimeMeter.stage_name_to_cum_runtime:
+        stats = RuntimeMeter.export_stats().get(stage_name)
+        if stats is None or stats.n_calls == 0:
             return 0
-        return (
-            RuntimeMeter.stage_name_to_cum_runtime[stage_name]
-            / RuntimeMeter.stage_name_to_num_calls[stage_name]
-        )
+        return stats.cum_ns / stats.n_calls / 1e9
 
     @staticmethod
-    def get_last_stage_runtime(stage_name: str) -> float:
+    def get_last_stage_runtime(stage_name: str) -> Optional[float]:
         """Return the time taken by the last call to the stage.
 
         Args:
             stage_name (str): the name of the stage, as it was used in the context manager.
 
         Returns:
-            float: the time taken by the last call to the stage.
+            Optional[float]: the time taken by the last call to the stage, or None if the stage was never called.
+        """
+        stats = RuntimeMeter.export_stats().get(stage_name)
+        if stats is None or stats.last_ns is None:
+            return None
+        return stats.last_ns / 1e9
+
+    @staticmethod
+    def get_stage_percentile(stage_name: str, q: float) -> float:
+        """Return an estimation of a percentile of the time taken by the calls to the stage.
+
+        Args:
+            stage_name (str): the name of the stage, as it was used in the context manager.
+            q (float): the percentile, between 0 and 100 (e.g. 95 for the p95).
+
+        Returns:
+            float: the estimated percentile of the time taken by the stage.
         """
-        return RuntimeMeter.stage_name_to_last_runtime[stage_name]
-    
+        stats = RuntimeMeter.export_stats().get(stage_name)
+        if stats is None:
+            return 0
+        return stats.get_percentile(q) / 1e9
+
     @staticmethod
     def get_runtimes() -> Dict[str, float]:
         """Return a dictionnary mapping the stage names to the cumulative time taken by the stage.
@@ -91,7 +312,10 @@ class RuntimeMeter:
         Returns:
             Dict[str, float]: the dictionnary mapping the stage names to the cumulative time taken by the stage.
         """
-        return dict(RuntimeMeter.stage_name_to_cum_runtime)
+        return {
+            stage_name: stats.cum_ns / 1e9
+            for stage_name, stats in RuntimeMeter.export_stats().items()
+        }
 
     @staticmethod
     def get_average_runtimes() -> Dict[str, float]:
@@ -101,10 +325,10 @@ class RuntimeMeter:
             Dict[str, float]: the dictionnary mapping the stage names to the average time taken by the stage.
         """
         return {
-            stage_name: RuntimeMeter.get_averaged_stage_runtime(stage_name)
-            for stage_name in RuntimeMeter.stage_name_to_cum_runtime
+            stage_name: stats.cum_ns / max(stats.n_calls, 1) / 1e9
+            for stage_name, stats in RuntimeMeter.export_stats().items()
         }
-    
+
     @staticmethod
     def get_last_runtimes() -> Dict[str, float]:
         """Return a dictionnary mapping the stage names to the time taken by the last call to the stage.
@@ -112,8 +336,11 @@ class RuntimeMeter:
         Returns:
             Dict[str, float]: the dictionnary mapping the stage names to the time taken by the last call to the stage.
         """
-        return dict(RuntimeMeter.stage_name_to_last_runtime)
-    
+        return {
+            stage_name: (stats.last_ns / 1e9 if stats.last_ns is not None else None)
+            for stage_name, stats in RuntimeMeter.export_stats().items()
+        }
+
     @staticmethod
     def get_total_runtime() -> float:
         """Return the total time taken by all stages.
@@ -121,43 +348,35 @@ class RuntimeMeter:
         Returns:
             float: the total time taken by all stages.
         """
-        return sum(RuntimeMeter.stage_name_to_cum_runtime.values())
-
-    def __init__(self, stage_name: str, n_calls: int = 1):
-        """Initialize the RuntimeMeter.
-
-        Args:
-            stage_name (str): a string identifying the stage.
-            n_calls (int, optional): the number of calls to the stage. Defaults to 1.
-        """
-        self.stage_name = stage_name
-        self.n_calls = n_calls
+        return sum(stats.cum_ns for stats in RuntimeMeter.export_stats().values()) / 1e9
 
-    def __enter__(self):
-        self.start_time = time.time()
-        return self
 
-    def __exit__(self, exc_type, exc_value, traceback):
-        self.stage_name_to_cum_runtime[self.stage_name] += time.time() - self.start_time
-        self.stage_name_to_last_runtime[self.stage_name] = time.time() - self.start_time
-        self.stage_name_to_num_calls[self.stage_name] += self.n_calls
-
-
-def get_runtime_metrics():
+def get_runtime_metrics(
+    stage_name_to_stats: Optional[Dict[str, StageStats]] = None,
+    percentiles: List[float] = [50, 95, 99],
+) -> Dict[str, float]:
     """Return the metrics of the runtimes.
 
+    Args:
+        stage_name_to_stats (Optional[Dict[str, StageStats]], optional): the statistics to compute the metrics of. Defaults to None (the statistics of the RuntimeMeter).
+        percentiles (List[float], optional): the percentiles of the runtimes to compute. Defaults to [50, 95, 99].
+
     Returns:
-        Dict[str, float]: a dictionnary mapping the stage names to the cumulative and averaged time taken by the stage.
+        Dict[str, float]: a dictionnary mapping the stage names to the cumulative, averaged, last and percentiles of the time taken by the stage.
     """
+    if stage_name_to_stats is None:
+        stage_name_to_stats = RuntimeMeter.export_stats()
     dict_runtime_metrics = {}
-    for stage_name in RuntimeMeter.stage_name_to_cum_runtime:
-        dict_runtime_metrics[f"runtime/{stage_name}"] = RuntimeMeter.get_stage_runtime(stage_name)
-        dict_runtime_metrics[f"runtime/{stage_name}_avg"] = RuntimeMeter.get_averaged_stage_runtime(stage_name)
-        time_last_call = RuntimeMeter.get_last_stage_runtime(stage_name)
-        if time_last_call is not None:
-            dict_runtime_metrics[f"runtime/{stage_name}_last"] = time_last_call
+    for stage_name, stats in stage_name_to_stats.items():
+        dict_runtime_metrics[f"runtime/{stage_name}"] = stats.cum_ns / 1e9
+        dict_runtime_metrics[f"runtime/{stage_name}_avg"] = stats.cum_ns / max(stats.n_calls, 1) / 1e9
+        if stats.last_ns is not None:
+            dict_runtime_metrics[f"runtime/{stage_name}_last"] = stats.last_ns / 1e9
+        for q in percentiles:
+            dict_runtime_metrics[f"runtime/{stage_name}_p{q:g}"] = stats.get_percentile(q) / 1e9
     return dict_runtime_metrics
-    
+
+
 if __name__ == "__main__":
     import time
     import random
@@ -176,4 +395,5 @@ if __name__ == "__main__":
 
     print(RuntimeMeter.get_stage_runtime("foo"))
     print(RuntimeMeter.get_stage_runtime("bar"))
-    print(RuntimeMeter.get_stage_runtime("total"))
\ No newline at end of file
+    print(RuntimeMeter.get_stage_runtime("total"))
+    print(RuntimeMeter.get_stage_percentile("bar", 99))
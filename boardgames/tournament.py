@@ -0,0 +1,266 @@
+from collections import defaultdict
+import random
+from time import perf_counter
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from boardgames.agents.base_agents import BaseAgent
+from boardgames.agents.base_planning_agents import BasePlanningAgent
+from boardgames.agents.base_text_agents import BaseTextAgent
+from boardgames.agents.joint_act import act_jointly
+from boardgames.games.base_game import BaseGame
+from boardgames.games.base_text_game import BaseTextBasedGame
+from boardgames.games import game_name_to_GameClass
+from boardgames.time_measure import RuntimeMeter, get_runtime_metrics
+from boardgames.utils import instantiate_class
+
+
+def get_chunk_seeds(seed: int, n_chunks: int) -> List[int]:
+    """Derive one seed per chunk of games from the seed of the run.
+    The seed of a chunk only depends on the seed of the run and on the index of the chunk,
+    so results do not depend on the number of workers nor on the order in which chunks are processed.
+
+    Args:
+        seed (int): the seed of the run
+        n_chunks (int): the number of chunks
+
+    Returns:
+        List[int]: the seed of each chunk
+    """
+    seed_sequences = np.random.SeedSequence(seed).spawn(n_chunks)
+    return [int(ss.generate_state(1)[0]) for ss in seed_sequences]
+
+
+def create_game_and_agents(
+    config: Dict, seed: int, run_name: str
+) -> Tuple[BaseGame, List[BaseAgent]]:
+    """Instantiate the game and the agents from the (resolved) config, as done in run.py.
+
+    Args:
+        config (Dict): the run config
+        seed (int): the seed given to the game
+        run_name (str): the run name given to the game
+
+    Returns:
+        BaseGame: the game
+        List[BaseAgent]: the agent of each player
+    """
+    config_game = dict(config["game"]["config"])
+    if not config.get("do_game_logs", True):
+        config_game["log_dir"] = None
+    GameClass = game_name_to_GameClass[config["game"]["name"]]
+    game = GameClass(**config_game, seed=seed, run_name=run_name)
+    n_players = game.get_n_players()
+    agents: List[BaseAgent] = [
+        instantiate_class(**config["agents"]["configs_agents"][i])
+        for i in range(n_players)
+    ]
+    agents_text_based = [agent for agent in agents if isinstance(agent, BaseTextAgent)]
+    if len(agents_text_based) > 0:
+        assert isinstance(
+            game, BaseTextBasedGame
+        ), "The game must be text-based to use text-based agents."
+        game_context = game.get_game_context()
+        for agent in agents_text_based:
+            agent.set_game_context(game_context)
+    for idx_agent, agent in enumerate(agents):
+        if isinstance(agent, BasePlanningAgent):
+            agent.set_game(game, idx_player=idx_agent)
+    return game, agents
+
+
+def play_game(game: BaseGame, agents: List[BaseAgent]) -> Tuple[List[float], Any, int, Dict]:
+    """Play a full game without rendering, with the same loop as run.py.
+
+    Args:
+        game (BaseGame): the game
+        agents (List[BaseAgent]): the agent of each player
+
+    Returns:
+        List[float]: the final rewards of each player
+        State: the final state of the game
+        int: the number of steps of the game
+        Dict: the final info dict
+    """
+    n_players = game.get_n_players()
+    with RuntimeMeter("game.reset"):
+        state, list_is_playing_agents, list_obs, list_action_spaces, info = game.reset()
+    done = False
+    n_steps = 0
+    while not done:
+        for idx_agent in range(n_players):
+            if list_is_playing_agents[idx_agent] and isinstance(
+                agents[idx_agent], BasePlanningAgent
+            ):
+                agents[idx_agent].observe_state(
+                    state=state,
+                    list_is_playing=list_is_playing_agents,
+                    list_action_spaces=list_action_spaces,
+                )
+        list_actions = act_jointly(
+            agents=agents,
+            list_is_playing=list_is_playing_agents,
+            list_obs=list_obs,
+            list_action_spaces=list_action_spaces,
+        )
+        with RuntimeMeter("game.step"):
+            (
+                rewards,
+                next_state,
+                next_list_is_playing_agents,
+                next_list_obs,
+                next_list_action_spaces,
+                done,
+                info,
+            ) = game.step(state, list_actions)
+        for idx_agent in range(n_players):
+            next_is_playing = next_list_is_playing_agents[idx_agent]
+            with RuntimeMeter("agent.learn"):
+                agents[idx_agent].learn(
+                    is_playing=list_is_playing_agents[idx_agent],
+                    observation=list_obs[idx_agent],
+                    action_space=list_action_spaces[idx_agent],
+                    action=list_actions[idx_agent],
+                    reward=rewards[idx_agent],
+                    next_is_playing=next_is_playing,
+                    next_observation=(
+                        next_list_obs[idx_agent] if (next_is_playing or done) else None
+                    ),
+                    next_action_space=(
+                        next_list_action_spaces[idx_agent] if next_is_playing else None
+                    ),
+                    done=done,
+                )
+        state = next_state
+        list_obs = next_list_obs
+        list_action_spaces = next_list_action_spaces
+        list_is_playing_agents = next_list_is_playing_agents
+        n_steps += 1
+    return rewards, state, n_steps, info
+
+
+def get_empty_results() -> Dict[str, Any]:
+    """Return the neutral element of merge_results."""
+    return {
+        "n_games": 0,
+        "n_steps_sum": 0,
+        "n_steps_min": float("inf"),
+        "n_steps_max": 0,
+        "faction_to_n_players": defaultdict(int),
+        "faction_to_sum_rewards": defaultdict(float),
+        "faction_to_n_players_won": defaultdict(int),
+        "faction_to_n_games_won": defaultdict(int),
+        "result_to_n_games": defaultdict(int),
+        "runtime_games": 0.0,
+        "runtime_stats": {},
+    }
+
+
+def play_games_chunk(config: Dict, idx_chunk: int, seed: int, n_games: int) -> Dict[str, Any]:
+    """Play a chunk of games in the current process and return the aggregated statistics.
+    This is the function executed by the workers of the process pool.
+
+    Args:
+        config (Dict): the (resolved) run config
+        idx_chunk (int): the index of the chunk
+        seed (int): the seed of the chunk
+        n_games (int): the number of games to play
+
+    Returns:
+        Dict[str, Any]: the aggregated statistics of the chunk, that can be merged with merge_results
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    # Worker processes are reused across chunks, so the runtime statistics of the previous chunks are cleared
+    RuntimeMeter.set_enabled(config.get("do_measure_runtime", True))
+    RuntimeMeter.reset()
+    game, agents = create_game_and_agents(
+        config, seed=seed, run_name=f"{config['run_name']}_chunk{idx_chunk}"
+    )
+    results = get_empty_results()
+    time_start = perf_counter()
+    for _ in range(n_games):
+        rewards, state, n_steps, info = play_game(game, agents)
+        results["n_games"] += 1
+        results["n_steps_sum"] += n_steps
+        results["n_steps_min"] = min(results["n_steps_min"], n_steps)
+        results["n_steps_max"] = max(results["n_steps_max"], n_steps)
+        factions = game.get_players_factions(state)
+        factions_won = set()
+        for faction, reward in zip(factions, rewards):
+            results["faction_to_n_players"][faction] += 1
+            results["faction_to_sum_rewards"][faction] += reward
+            if reward > 0:
+                results["faction_to_n_players_won"][faction] += 1
+                factions_won.add(faction)
+        for faction in factions_won:
+            results["faction_to_n_games_won"][faction] += 1
+        if "result" in info:
+            results["result_to_n_games"][info["result"]] += 1
+    results["runtime_games"] = perf_counter() - time_start
+    results["runtime_stats"] = RuntimeMeter.export_stats()
+    return results
+
+
+def merge_results(results: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge the statistics of a chunk into the statistics of the run (in place).
+
+    Args:
+        results (Dict[str, Any]): the statistics of the run, modified in place
+        other (Dict[str, Any]): the statistics of a chunk
+
+    Returns:
+        Dict[str, Any]: the merged statistics
+    """
+    results["n_games"] += other["n_games"]
+    results["n_steps_sum"] += other["n_steps_sum"]
+    results["n_steps_min"] = min(results["n_steps_min"], other["n_steps_min"])
+    results["n_steps_max"] = max(results["n_steps_max"], other["n_steps_max"])
+    for key in [
+        "faction_to_n_players",
+        "faction_to_sum_rewards",
+        "faction_to_n_players_won",
+        "faction_to_n_games_won",
+        "result_to_n_games",
+    ]:
+        for name, value in other[key].items():
+            results[key][name] += value
+    results["runtime_games"] += other["runtime_games"]
+    for stage_name, stats in other["runtime_stats"].items():
+        if stage_name in results["runtime_stats"]:
+            results["runtime_stats"][stage_name].merge(stats)
+        else:
+            results["runtime_stats"][stage_name] = stats.copy()
+    return results
+
+
+def get_results_metrics(results: Dict[str, Any]) -> Dict[str, float]:
+    """Return the metrics of the merged statistics, in the format used for logging.
+
+    Args:
+        results (Dict[str, Any]): the merged statistics
+
+    Returns:
+        Dict[str, float]: a dictionnary mapping metric names to values
+    """
+    n_games = max(results["n_games"], 1)
+    metrics = {
+        "tournament/n_games": results["n_games"],
+        "tournament/game_length_avg": results["n_steps_sum"] / n_games,
+        "tournament/game_length_min": results["n_steps_min"],
+        "tournament/game_length_max": results["n_steps_max"],
+        "tournament/runtime_games": results["runtime_games"],
+    }
+    for faction, n_players in results["faction_to_n_players"].items():
+        metrics[f"tournament/reward_avg/{faction}"] = (
+            results["faction_to_sum_rewards"][faction] / n_players
+        )
+        metrics[f"tournament/win_rate_players/{faction}"] = (
+            results["faction_to_n_players_won"][faction] / n_players
+        )
+        metrics[f"tournament/win_rate_games/{faction}"] = (
+            results["faction_to_n_games_won"][faction] / n_games
+        )
+    metrics.update(get_runtime_metrics(results["runtime_stats"]))
+    return metrics
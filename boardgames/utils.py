@@ -107,6 +107,11 @@ def instantiate_class(**kwargs) -> Any:
 import ast
 
 def str_to_literal(s):
+    # Fast paths for the most frequent cases : no action (None), non string actions, and player ids (e.g. "3")
+    if not isinstance(s, str):
+        return s
+    if s.isdigit() and s.isascii() and (len(s) == 1 or s[0] != "0"):
+        return int(s)
     try:
         # Safely evaluate the string as a Python literal
         result = ast.literal_eval(s)
@@ -114,5 +119,5 @@ def str_to_literal(s):
             return result
         else:
             return s
-    except (ValueError, SyntaxError) as e:
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
         return s
\ No newline at end of file
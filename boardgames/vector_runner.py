@@ -0,0 +1,324 @@
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+import numpy as np
+
+from boardgames.agents.base_agents import BaseAgent
+from boardgames.agents.joint_act import group_seats_by_agent
+from boardgames.games.base_game import BaseGame
+from boardgames.time_measure import RuntimeMeter
+from boardgames.types import Observation, Action, State
+from boardgames.action_spaces import ActionsSpace
+
+
+class VectorGameRunner:
+    """Hold N independent games and step them in lockstep.
+
+    All the returns are the returns of BaseGame.reset/step batched over the games, i.e. lists of size n_games
+    whose elements are what the corresponding game returned.
+    If do_auto_reset is True, a game that is over is immediately reset : the returned done and rewards are the ones of the final step,
+    while the returned state, playing information, observations and action spaces are the ones of the new game.
+    The final state and observations of the finished game are then available in the info dict under the keys
+    "final_state", "final_observations" and "final_rewards".
+
+    runner = VectorGameRunner.from_config(WerewolvesGame, n_games=100, config_game=config["game"]["config"], run_name=run_name)
+    states, list_is_playing, list_obs, list_action_spaces, infos = runner.reset()
+    while True:
+        list_idx_game_player, batch_obs, batch_action_spaces = runner.get_batch_playing(list_is_playing, list_obs, list_action_spaces)
+        batch_actions = policy(batch_obs, batch_action_spaces)
+        list_joint_actions = runner.build_joint_actions(list_idx_game_player, batch_actions)
+        # or, with agents (one per seat, shared by all games) : list_joint_actions = runner.act(agents, list_is_playing, list_obs, list_action_spaces)
+        rewards, states, list_is_playing, list_obs, list_action_spaces, dones, infos = runner.step(list_joint_actions)
+    """
+
+    def __init__(self, games: List[BaseGame], do_auto_reset: bool = True) -> None:
+        """Initialize the runner.
+
+        Args:
+            games (List[BaseGame]): the games to run, they must be distinct instances
+            do_auto_reset (bool, optional): whether to reset a game as soon as it is over. Defaults to True.
+        """
+        assert len(games) > 0, "The runner needs at least one game."
+        assert len(set(id(game) for game in games)) == len(
+            games
+        ), "The games must be distinct instances."
+        self.games = games
+        self.n_games = len(games)
+        self.do_auto_reset = do_auto_reset
+        self.states: List[State] = [None] * self.n_games
+        self.list_dones: List[bool] = [True] * self.n_games
+        self.list_n_games_played: List[int] = [0] * self.n_games
+
+    @classmethod
+    def from_config(
+        cls,
+        GameClass: Type[BaseGame],
+        n_games: int,
+        config_game: Dict[str, Any],
+        seed: Optional[int] = None,
+        run_name: str = "vector_run",
+        do_auto_reset: bool = True,
+    ) -> "VectorGameRunner":
+        """Create a runner of n_games instances of the same game class, with the same config.
+        Each game gets a distinct run name so that games writing logs do not write in the same files,
+        and a distinct seed derived from seed, so that the games are independent but the run is reproducible.
+
+        Args:
+            GameClass (Type[BaseGame]): the class of the game
+            n_games (int): the number of games to run in lockstep
+            config_game (Dict[str, Any]): the config of the game, as in config["game"]["config"]
+            seed (Optional[int], optional): the seed from which the seed of each game is derived. Defaults to None (games are not seeded).
+            run_name (str, optional): the base run name. Defaults to "vector_run".
+            do_auto_reset (bool, optional): whether to reset a game as soon as it is over. Defaults to True.
+
+        Returns:
+            VectorGameRunner: the runner
+        """
+        if seed is None:
+            seeds_games = [None] * n_games
+        else:
+            seeds_games = [
+                int(seed_sequence.generate_state(1)[0])
+                for seed_sequence in np.random.SeedSequence(seed).spawn(n_games)
+            ]
+        games = [
+            GameClass(**config_game, seed=seeds_games[idx_game], run_name=f"{run_name}_game{idx_game}")
+            for idx_game in range(n_games)
+        ]
+        return cls(games=games, do_auto_reset=do_auto_reset)
+
+    def reset(self) -> Tuple[
+        List[State],
+        List[List[bool]],
+        List[List[Observation]],
+        List[List[ActionsSpace]],
+        List[Dict],
+    ]:
+        """Reset all the games.
+
+        Returns:
+            List[State]: the initial state of each game
+            List[List[bool]]: the list of players playing, for each game
+            List[List[Observation]]: the initial observations of each player, for each game
+            List[List[ActionsSpace]]: the action spaces of each player, for each game
+            List[Dict]: the info dict of each game
+        """
+        list_is_playing, list_obs, list_action_spaces, infos = [], [], [], []
+        for idx_game in range(self.n_games):
+            state, is_playing, obs, action_spaces, info = self.reset_game(idx_game)
+            list_is_playing.append(is_playing)
+            list_obs.append(obs)
+            list_action_spaces.append(action_spaces)
+            infos.append(info)
+        return list(self.states), list_is_playing, list_obs, list_action_spaces, infos
+
+    def reset_game(
+        self, idx_game: int
+    ) -> Tuple[State, List[bool], List[Observation], List[ActionsSpace], Dict]:
+        """Reset a single game of the runner.
+
+        Args:
+            idx_game (int): the index of the game to reset
+
+        Returns:
+            Tuple[State, List[bool], List[Observation], List[ActionsSpace], Dict]: the returns of the game's reset()
+        """
+        state, is_playing, obs, action_spaces, info = self.games[idx_game].reset()
+        self.states[idx_game] = state
+        self.list_dones[idx_game] = False
+        return state, is_playing, obs, action_spaces, info
+
+    def step(self, list_joint_actions: List[List[Action]]) -> Tuple[
+        List[List[float]],
+        List[State],
+        List[List[bool]],
+        List[List[Observation]],
+        List[List[ActionsSpace]],
+        List[bool],
+        List[Dict],
+    ]:
+        """Step all the games that are not over.
+        Games that are over (only possible if do_auto_reset is False) are not stepped and return null rewards,
+        no playing player and done=True.
+
+        Args:
+            list_joint_actions (List[List[Action]]): the joint action of each game
+
+        Returns:
+            List[List[float]]: the rewards of each player, for each game
+            List[State]: the next state of each game
+            List[List[bool]]: the next list of players playing, for each game
+            List[List[Observation]]: the next observations of each player, for each game
+            List[List[ActionsSpace]]: the next action spaces of each player, for each game
+            List[bool]: whether each game is over after this step
+            List[Dict]: the info dict of each game
+        """
+        assert (
+            len(list_joint_actions) == self.n_games
+        ), f"Expected {self.n_games} joint actions, got {len(list_joint_actions)}."
+        list_rewards, list_is_playing, list_obs, list_action_spaces, dones, infos = (
+            [],
+            [],
+            [],
+            [],
+            [],
+            [],
+        )
+        for idx_game, (game, joint_action) in enumerate(
+            zip(self.games, list_joint_actions)
+        ):
+            n_players = game.get_n_players()
+            # Games over and not reset are frozen
+            if self.list_dones[idx_game]:
+                list_rewards.append([0.0] * n_players)
+                list_is_playing.append([False] * n_players)
+                list_obs.append([None] * n_players)
+                list_action_spaces.append([None] * n_players)
+                dones.append(True)
+                infos.append({})
+                continue
+            (
+                rewards,
+                state,
+                is_playing,
+                obs,
+                action_spaces,
+                done,
+                info,
+            ) = game.step(self.states[idx_game], joint_action)
+            self.states[idx_game] = state
+            if done:
+                self.list_dones[idx_game] = True
+                self.list_n_games_played[idx_game] += 1
+                if self.do_auto_reset:
+                    info = dict(info)
+                    info["final_state"] = state
+                    info["final_observations"] = obs
+                    info["final_rewards"] = rewards
+                    _, is_playing, obs, action_spaces, _ = self.reset_game(idx_game)
+            list_rewards.append(rewards)
+            list_is_playing.append(is_playing)
+            list_obs.append(obs)
+            list_action_spaces.append(action_spaces)
+            dones.append(done)
+            infos.append(info)
+        return (
+            list_rewards,
+            list(self.states),
+            list_is_playing,
+            list_obs,
+            list_action_spaces,
+            dones,
+            infos,
+        )
+
+    # ======================== Batching helpers ========================
+
+    def get_batch_playing(
+        self,
+        list_is_playing: List[List[bool]],
+        list_obs: List[List[Observation]],
+        list_action_spaces: List[List[ActionsSpace]],
+    ) -> Tuple[List[Tuple[int, int]], List[Observation], List[ActionsSpace]]:
+        """Flatten the playing seats of all games into a single batch.
+
+        Args:
+            list_is_playing (List[List[bool]]): the list of players playing, for each game
+            list_obs (List[List[Observation]]): the observations of each player, for each game
+            list_action_spaces (List[List[ActionsSpace]]): the action spaces of each player, for each game
+
+        Returns:
+            List[Tuple[int, int]]: the (idx_game, idx_player) of each element of the batch
+            List[Observation]: the observation of each element of the batch
+            List[ActionsSpace]: the action space of each element of the batch
+        """
+        list_idx_game_player, batch_obs, batch_action_spaces = [], [], []
+        for idx_game, is_playing in enumerate(list_is_playing):
+            for idx_player, is_playing_player in enumerate(is_playing):
+                if is_playing_player:
+                    list_idx_game_player.append((idx_game, idx_player))
+                    batch_obs.append(list_obs[idx_game][idx_player])
+                    batch_action_spaces.append(
+                        list_action_spaces[idx_game][idx_player]
+                    )
+        return list_idx_game_player, batch_obs, batch_action_spaces
+
+    def build_joint_actions(
+        self,
+        list_idx_game_player: List[Tuple[int, int]],
+        batch_actions: List[Action],
+    ) -> List[List[Action]]:
+        """Build the joint action of each game from a batch of actions, with None for non-playing players.
+
+        Args:
+            list_idx_game_player (List[Tuple[int, int]]): the (idx_game, idx_player) of each element of the batch
+            batch_actions (List[Action]): the action of each element of the batch
+
+        Returns:
+            List[List[Action]]: the joint action of each game
+        """
+        list_joint_actions = [
+            [None] * game.get_n_players() for game in self.games
+        ]
+        for (idx_game, idx_player), action in zip(list_idx_game_player, batch_actions):
+            list_joint_actions[idx_game][idx_player] = action
+        return list_joint_actions
+
+    def act(
+        self,
+        agents: Union[List[BaseAgent], List[List[BaseAgent]]],
+        list_is_playing: List[List[bool]],
+        list_obs: List[List[Observation]],
+        list_action_spaces: List[List[ActionsSpace]],
+    ) -> List[List[Action]]:
+        """Return the joint action of each game, grouping the playing seats of all games by agent instance :
+        each distinct agent is called once, with act_batch on all the seats it plays in all the games.
+
+        Args:
+            agents (Union[List[BaseAgent], List[List[BaseAgent]]]): the agent of each seat, shared by all games, or the agents of each game
+            list_is_playing (List[List[bool]]): the list of players playing, for each game
+            list_obs (List[List[Observation]]): the observations of each player, for each game
+            list_action_spaces (List[List[ActionsSpace]]): the action spaces of each player, for each game
+
+        Returns:
+            List[List[Action]]: the joint action of each game
+        """
+        list_agents = agents if isinstance(agents[0], list) else [agents] * self.n_games
+        list_idx_game_player, batch_obs, batch_action_spaces = self.get_batch_playing(
+            list_is_playing, list_obs, list_action_spaces
+        )
+        batch_agents = [
+            list_agents[idx_game][idx_player] for idx_game, idx_player in list_idx_game_player
+        ]
+        batch_actions: List[Action] = [None] * len(list_idx_game_player)
+        for agent, list_idx_batch in group_seats_by_agent(
+            batch_agents, list(range(len(list_idx_game_player)))
+        ):
+            with RuntimeMeter("agent.act"):
+                actions = agent.act_batch(
+                    observations=[batch_obs[idx] for idx in list_idx_batch],
+                    action_spaces=[batch_action_spaces[idx] for idx in list_idx_batch],
+                )
+            assert len(actions) == len(
+                list_idx_batch
+            ), f"act_batch of {agent} returned {len(actions)} actions for {len(list_idx_batch)} observations."
+            for idx_batch, action in zip(list_idx_batch, actions):
+                batch_actions[idx_batch] = action
+        return self.build_joint_actions(list_idx_game_player, batch_actions)
+
+    def get_n_games(self) -> int:
+        """Return the number of games run in lockstep.
+
+        Returns:
+            int: the number of games
+        """
+        return self.n_games
+
+    def render(self, idx_game: Optional[int] = None) -> None:
+        """Render the games (or only one of them).
+
+        Args:
+            idx_game (Optional[int], optional): the index of the game to render, or None to render all games. Defaults to None.
+        """
+        list_idx_games = range(self.n_games) if idx_game is None else [idx_game]
+        for idx in list_idx_games:
+            self.games[idx].render(self.states[idx])
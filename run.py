@@ -20,10 +20,13 @@ import numpy as np
 
 # Project imports
 from boardgames.agents.base_text_agents import BaseTextAgent
+from boardgames.agents.base_planning_agents import BasePlanningAgent
 from boardgames.games.base_text_game import BaseTextBasedGame
 from boardgames.types import Observation, Action, State, AgentID, JointReward
 from boardgames.agents.base_agents import BaseAgent
-from boardgames.time_measure import RuntimeMeter
+from boardgames.agents.joint_act import JointActor, act_jointly
+from boardgames.agents.llm_cache import get_caches_metrics
+from boardgames.time_measure import RuntimeMeter, get_runtime_metrics
 from boardgames.utils import instantiate_class, try_get_seed
 from boardgames.hydra_utils import register_resolvers
 from boardgames.games import game_name_to_GameClass
@@ -44,6 +47,17 @@ def main(config: DictConfig):
     do_wandb: bool = config["do_wandb"]
     do_tb: bool = config["do_tb"]
     do_tqdm: bool = config["do_tqdm"]
+    do_cprofile: bool = config.get("do_cprofile", False)
+    log_runtime_every_n_steps: int = config.get("log_runtime_every_n_steps", 10)
+    do_concurrent_act: bool = config.get("do_concurrent_act", True)
+    max_concurrent_acts: int = config.get("max_concurrent_acts", None)
+
+    RuntimeMeter.set_enabled(config.get("do_measure_runtime", True))
+
+    # Start the profiler if required. It has a significant overhead, so it is disabled by default.
+    if do_cprofile:
+        profiler = cProfile.Profile()
+        profiler.enable()
 
     # Set the seeds
     seed = try_get_seed(config)
@@ -67,7 +81,7 @@ def main(config: DictConfig):
     # Create the game
     print("Creating the game...")
     GameClass = game_name_to_GameClass[game_name]
-    game = GameClass(**config["game"]["config"], seed=seed, run_name=run_name)
+    game = GameClass(**config["game"]["config"], seed=seed, run_name=run_name, do_log_last=True)
     n_players = game.get_n_players()
 
     # Get the agents
@@ -86,39 +100,63 @@ def main(config: DictConfig):
         game_context = game.get_game_context()
         for agent in agents_text_based:
             agent.set_game_context(game_context)
+    for idx_agent, agent in enumerate(agents):
+        if isinstance(agent, BasePlanningAgent):
+            agent.set_game(game, idx_player=idx_agent)
+
+    if do_concurrent_act:
+        joint_actor = JointActor(max_concurrent_acts=max_concurrent_acts)
 
     # Game loop
     print("\nStarting the game loop...")
-    state, list_is_playing_agents, list_obs, list_action_spaces, info = game.reset()
+    with RuntimeMeter("game.reset"):
+        state, list_is_playing_agents, list_obs, list_action_spaces, info = game.reset()
     done = False
-    game.render(state)
+    with RuntimeMeter("render"):
+        game.render(state)
+    step = 0
     while not done:
-        list_actions = []
-        # Play each agent
+        # Give the state to the planning agents
+        for idx_agent in range(n_players):
+            if list_is_playing_agents[idx_agent] and isinstance(
+                agents[idx_agent], BasePlanningAgent
+            ):
+                agents[idx_agent].observe_state(
+                    state=state,
+                    list_is_playing=list_is_playing_agents,
+                    list_action_spaces=list_action_spaces,
+                )
+        # Play each agent, concurrently if enabled
+        if do_concurrent_act:
+            list_actions = joint_actor.act(
+                agents=agents,
+                list_is_playing=list_is_playing_agents,
+                list_obs=list_obs,
+                list_action_spaces=list_action_spaces,
+            )
+        else:
+            list_actions = act_jointly(
+                agents=agents,
+                list_is_playing=list_is_playing_agents,
+                list_obs=list_obs,
+                list_action_spaces=list_action_spaces,
+            )
         for idx_agent in range(n_players):
             if list_is_playing_agents[idx_agent]:
-                # Get the agent and corresponding observation and actions available
-                agent: BaseAgent = agents[idx_agent]
-                action_space = list_action_spaces[idx_agent]
-                obs = list_obs[idx_agent]
-                # Agent acts
-                action = agent.act(observation=obs, action_space=action_space)
                 assert (
-                    action in action_space
-                ), f"Invalid action : '{action}' for agent {idx_agent}. Action space: {action_space}"
-                list_actions.append(action)
-            else:
-                list_actions.append(None)
+                    list_actions[idx_agent] in list_action_spaces[idx_agent]
+                ), f"Invalid action : '{list_actions[idx_agent]}' for agent {idx_agent}. Action space: {list_action_spaces[idx_agent]}"
         # Step the game
-        (
-            rewards,
-            next_state,
-            next_list_is_playing_agents,
-            next_list_obs,
-            next_list_action_spaces,
-            done,
-            info,
-        ) = game.step(state, list_actions)
+        with RuntimeMeter("game.step"):
+            (
+                rewards,
+                next_state,
+                next_list_is_playing_agents,
+                next_list_obs,
+                next_list_action_spaces,
+                done,
+                info,
+            ) = game.step(state, list_actions)
         # Learn each agent
         for idx_agent in range(n_players):
             agent = agents[idx_agent]
@@ -134,21 +172,33 @@ def main(config: DictConfig):
             next_action_space = (
                 next_list_action_spaces[idx_agent] if next_is_playing else None
             )  # Possibly let this even if not next_is_playing for optimizing learning
-            agent.learn(
-                is_playing=is_playing,
-                observation=obs,
-                action_space=action_space,
-                action=action,
-                reward=reward,
-                next_is_playing=next_is_playing,
-                next_observation=next_observation,
-                next_action_space=next_action_space,
-                done=done,
-            )
+            with RuntimeMeter("agent.learn"):
+                agent.learn(
+                    is_playing=is_playing,
+                    observation=obs,
+                    action_space=action_space,
+                    action=action,
+                    reward=reward,
+                    next_is_playing=next_is_playing,
+                    next_observation=next_observation,
+                    next_action_space=next_action_space,
+                    done=done,
+                )
         # Logging
-        game.render(next_state)
+        with RuntimeMeter("render"):
+            game.render(next_state)
         if len(info) != 0:
             print(f"INFO: {info}")
+        step += 1
+        if (done or step % log_runtime_every_n_steps == 0) and (do_tb or do_wandb):
+            metrics_runtime = get_runtime_metrics()
+            metrics_runtime.update(get_caches_metrics())
+            metrics_runtime.update(game.get_metrics())
+            if do_tb:
+                for metric_name, metric_value in metrics_runtime.items():
+                    tb_writer.add_scalar(metric_name, metric_value, global_step=step)
+            if do_wandb:
+                wandb.log(metrics_runtime, step=step)
         # Update the state of the loop
         state = next_state
         list_obs = next_list_obs
@@ -156,18 +206,28 @@ def main(config: DictConfig):
         list_is_playing_agents = next_list_is_playing_agents
 
     print("Game over!")
+    if do_concurrent_act:
+        joint_actor.close()
     print(f"Rewards: {rewards}")
+    metrics_caches = get_caches_metrics()
+    if len(metrics_caches) > 0:
+        print(f"LLM cache : {metrics_caches}")
 
     # Finish the WandB run.
     if do_wandb:
         run.finish()
+    if do_tb:
+        tb_writer.close()
+
+    # Dump the profile stats
+    if do_cprofile:
+        profiler.disable()
+        profiler.dump_stats("logs/profile_stats.prof")
+        print("\nProfile stats dumped to logs/profile_stats.prof")
+        print(
+            "You can visualize the profile stats using snakeviz by running 'snakeviz logs/profile_stats.prof'"
+        )
 
 
 if __name__ == "__main__":
-    with cProfile.Profile() as pr:
-        main()
-    pr.dump_stats("logs/profile_stats.prof")
-    print("\nProfile stats dumped to profile_stats.prof")
-    print(
-        "You can visualize the profile stats using snakeviz by running 'snakeviz logs/profile_stats.prof'"
-    )
+    main()